@@ -0,0 +1,229 @@
+import json
+import math
+import random
+import unicodedata
+from typing import Iterable
+from utils import *
+
+
+# ----------------------------- Constants ----------------------------- #
+
+# Characters easily confused with each other when read or typed
+AMBIGUOUS_CHARACTERS = '0O1lI|'
+
+# Class masks are stored in one byte (the 'B' field of the binary export)
+MAX_ALPHABET_CLASSES = 8
+
+# Sampling modes `Alphabet.generate_password()` supports
+ALPHABET_SAMPLING_MODES = ('class_first', 'uniform')
+
+
+def normalize_characters(characters: Iterable[str], exclude: str = '') -> tuple[str, ...]:
+    """
+    NFC-normalizes, deduplicates and filters a set of characters.
+
+    Characters that still span several code points after normalization
+    (e.g. a letter with a combining mark that has no precomposed form) are
+    kept as one unit, so every entry is one user-perceived character.
+
+    Args:
+        characters (Iterable[str]): The raw characters (a string or a list).
+        exclude (str, optional): Characters to drop after normalization.
+
+    Returns:
+        tuple[str, ...]: The unique characters, in first-seen order.
+    """
+    excluded = set(unicodedata.normalize('NFC', exclude))
+    seen = {}
+    for char in characters:
+        char = unicodedata.normalize('NFC', char)
+        if char and char not in excluded:
+            seen.setdefault(char, None)
+    return tuple(seen)
+
+
+class Alphabet:
+    """
+    Set of named character classes compiled into indexed lookup tables.
+
+    Compilation happens once: every class becomes a tuple (O(1) random
+    access, whatever its size), every character maps to its class bits, and
+    the pool size of every class combination is precomputed. Generation and
+    analysis then never depend on the alphabet size.
+
+    Class bit `i` is the i-th class in definition order, so the default
+    alphabet uses the same bits as `calculate_password_class_mask()`.
+
+    Args:
+        classes (dict[str, Iterable[str]]): Class name -> its characters.
+        exclude (str, optional): Characters removed from every class.
+
+    Raises:
+        ValueError: If more than `MAX_ALPHABET_CLASSES` classes are left.
+    """
+
+    def __init__(self, classes: dict[str, Iterable[str]], exclude: str = '') -> None:
+        self.classes = {
+            name: normalize_characters(characters, exclude)
+            for name, characters in classes.items()
+        }
+        self.classes = {name: chars for name, chars in self.classes.items() if chars}
+        self.class_names = tuple(self.classes)
+        if len(self.class_names) > MAX_ALPHABET_CLASSES:
+            raise ValueError(f"An alphabet has at most {MAX_ALPHABET_CLASSES} classes, got {len(self.class_names)}")
+        self.char_to_mask: dict[str, int] = {}
+        for bit, name in enumerate(self.class_names):
+            for char in self.classes[name]:
+                self.char_to_mask[char] = self.char_to_mask.get(char, 0) | 1 << bit
+        self._max_char_length = max((len(char) for char in self.char_to_mask), default=1)
+        self.pool_sizes = {name: len(chars) for name, chars in self.classes.items()}
+        self._pool_size_by_mask: dict[int, int] = {}
+        self._union_by_mask: dict[int, tuple[str, ...]] = {}
+
+    def enabled_classes(self, settings: PasswordSettings) -> tuple[str, ...]:
+        """
+        Return the classes enabled by the settings.
+
+        Classes without a matching settings flag (custom class names) are
+        always enabled.
+        """
+        return tuple(name for name in self.class_names if settings.get(name, True))
+
+    def get_class_mask(self, class_names: Iterable[str]) -> int:
+        """Return the bit mask of the given class names."""
+        return sum(1 << self.class_names.index(name) for name in class_names)
+
+    def pool_size(self, class_mask: int) -> int:
+        """Return the number of distinct characters in a class combination (cached)."""
+        if class_mask not in self._pool_size_by_mask:
+            self._pool_size_by_mask[class_mask] = len(self.union(class_mask))
+        return self._pool_size_by_mask[class_mask]
+
+    def union(self, class_mask: int) -> tuple[str, ...]:
+        """Return the deduplicated characters of a class combination (cached)."""
+        if class_mask not in self._union_by_mask:
+            chars = (
+                char
+                for bit, name in enumerate(self.class_names) if class_mask >> bit & 1
+                for char in self.classes[name]
+            )
+            self._union_by_mask[class_mask] = normalize_characters(chars)
+        return self._union_by_mask[class_mask]
+
+    def generate_password(
+        self,
+        settings: PasswordSettings,
+        rng: random.Random | None = None,
+        sampling: str = DEFAULT_SAMPLING_MODE,
+    ) -> str:
+        """
+        Generates a password from this alphabet.
+
+        Args:
+            settings (PasswordSettings): Length and enabled classes.
+            rng (random.Random | None, optional): The random generator to draw from.
+            sampling (str, optional): 'class_first' or 'uniform' (see `SAMPLING_MODES`).
+
+        Raises:
+            IndexError: If no class is enabled.
+            ValueError: If the sampling mode is not supported.
+
+        Returns:
+            str: The generated password.
+        """
+        choice = (rng or get_thread_rng()).choice
+        enabled = self.enabled_classes(settings)
+        if not enabled:
+            raise IndexError('No character class enabled')
+        password_length = settings['password_length']
+
+        if sampling == 'uniform':
+            pool = self.union(self.get_class_mask(enabled))
+            return ''.join([choice(pool) for _ in range(password_length)])
+        if sampling == 'class_first':
+            pools = [self.classes[name] for name in enabled]
+            return ''.join([choice(choice(pools)) for _ in range(password_length)])
+        raise ValueError(f"Unsupported sampling mode for alphabets: {sampling}")
+
+    def split_characters(self, password: str) -> list[str]:
+        """
+        Splits an NFC-normalized password into this alphabet's characters.
+
+        Multi-codepoint entries are matched longest first, so each counts as
+        one character; code points outside the alphabet stand alone.
+        """
+        password = unicodedata.normalize('NFC', password)
+        if self._max_char_length == 1:
+            return list(password)
+        chars = []
+        index = 0
+        while index < len(password):
+            for size in range(min(self._max_char_length, len(password) - index), 0, -1):
+                char = password[index:index + size]
+                if size == 1 or char in self.char_to_mask:
+                    break
+            chars.append(char)
+            index += size
+        return chars
+
+    def calculate_class_mask(self, password: str) -> int:
+        """Return the class bit mask of the characters present in a password."""
+        return self._chars_class_mask(self.split_characters(password))
+
+    def _chars_class_mask(self, chars: Iterable[str]) -> int:
+        class_mask = 0
+        for char in set(chars):
+            class_mask |= self.char_to_mask.get(char, 0)
+        return class_mask
+
+    def calculate_entropy(self, password: str) -> float:
+        """
+        Calculates password entropy using this alphabet's pool sizes.
+
+        The counterpart of `calculate_password_entropy()`:
+        length * log2(size of the pool of the classes present), the length
+        counted in alphabet characters.
+        """
+        chars = self.split_characters(password)
+        pool_size = self.pool_size(self._chars_class_mask(chars))
+        return len(chars) * math.log2(pool_size) if pool_size else 0.0
+
+
+def load_alphabet(path: str) -> Alphabet:
+    """
+    Loads and compiles an alphabet definition from a JSON file.
+
+    The file looks like::
+
+        {
+            "classes": {"lowercase": "abcdefghijkmnpqrstuvwxyz", "digit": "23456789"},
+            "exclude": "0O1l",
+            "exclude_ambiguous": true
+        }
+
+    Class values may be strings or lists of characters.
+
+    Args:
+        path (str): The JSON file.
+
+    Raises:
+        ValueError: If the file defines no usable class.
+
+    Returns:
+        Alphabet: The compiled alphabet.
+    """
+    with open(path, encoding='utf-8') as file:
+        definition = json.load(file)
+
+    exclude = definition.get('exclude', '')
+    if definition.get('exclude_ambiguous'):
+        exclude += AMBIGUOUS_CHARACTERS
+
+    alphabet = Alphabet(definition.get('classes', {}), exclude)
+    if not alphabet.classes:
+        raise ValueError(f"Alphabet file defines no character class: {path}")
+    return alphabet
+
+
+# The built-in classes, compiled like any loaded alphabet
+DEFAULT_ALPHABET = Alphabet(CHARACTER_CLASSES)
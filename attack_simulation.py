@@ -0,0 +1,335 @@
+import sys
+import math
+import time
+import argparse
+import itertools
+import numpy as np
+from typing import Sequence
+from utils import *
+
+
+# ----------------------------- Constants ----------------------------- #
+
+# Scaled-down character classes keeping the shape of the real ones (two
+# letter classes, a smaller digit class and a one-character class), so the
+# whole key space of short passwords can be enumerated.
+REDUCED_CLASSES = {
+    'uppercase': 'ABC',
+    'lowercase': 'abc',
+    'digit': '01',
+    'minus': '-',
+}
+DEFAULT_SIMULATION_LENGTHS = (3, 4, 5, 6)
+DEFAULT_EXTRAPOLATION_LENGTHS = (8, 12, 16, 20, 30)
+DEFAULT_TARGETS = 2000
+DEFAULT_TOLERANCE = 0.1
+DEFAULT_GUESS_RATE = 1e10
+ENUMERATION_CHUNK = 1 << 18
+
+# Candidates are compared as up to 8 character codes packed into one uint64
+MAX_SIMULATION_LENGTH = 8
+
+
+def sample_targets(
+    sizes: Sequence[int],
+    length: int,
+    count: int,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Draws passwords the way 'class_first' sampling does: a class uniformly
+    per position, then a character of that class uniformly.
+
+    Args:
+        sizes (Sequence[int]): Number of characters of every class.
+        length (int): Password length.
+        count (int): Number of passwords.
+        rng (np.random.Generator): The random generator to draw from.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Class index and character code of every
+            position, both of shape (count, length). Codes number the
+            characters of all classes consecutively.
+    """
+    sizes_array = np.asarray(sizes)
+    offsets = np.concatenate(([0], np.cumsum(sizes_array)[:-1]))
+    classes = rng.integers(0, len(sizes), size=(count, length))
+    within = (rng.random((count, length)) * sizes_array[classes]).astype(np.int64)
+    return classes, offsets[classes] + within
+
+
+def estimate_entropy(classes: np.ndarray, sizes: Sequence[int]) -> np.ndarray:
+    """
+    The estimate of `calculate_password_entropy()`: length * log2 of the
+    summed size of the classes present in each password.
+    """
+    present = np.zeros((classes.shape[0], len(sizes)), dtype=bool)
+    np.put_along_axis(present, classes, True, axis=1)
+    pool = present @ np.asarray(sizes)
+    return classes.shape[1] * np.log2(pool)
+
+
+def pack_codes(codes: np.ndarray) -> np.ndarray:
+    """Pack rows of character codes (< 256, at most 8 per row) into uint64 keys."""
+    padded = np.zeros((codes.shape[0], MAX_SIMULATION_LENGTH), dtype=np.uint8)
+    padded[:, :codes.shape[1]] = codes
+    return padded.view('<u8').ravel()
+
+
+def enumerate_candidates(
+    pools: Sequence[np.ndarray],
+    targets: np.ndarray,
+    found: dict[int, int],
+    offset: int,
+) -> int:
+    """
+    Tries every candidate of a per-position pool product, in order, against
+    the packed target passwords, recording the guess number of every hit.
+
+    Args:
+        pools (Sequence[np.ndarray]): The character codes tried at every position.
+        targets (np.ndarray): Sorted unique packed targets.
+        found (dict[int, int]): Packed target -> guess number, updated in place.
+        offset (int): Guesses spent before this enumeration.
+
+    Returns:
+        int: The number of candidates of the product.
+    """
+    total = math.prod(len(pool) for pool in pools)
+    for start in range(0, total, ENUMERATION_CHUNK):
+        index = np.arange(start, min(start + ENUMERATION_CHUNK, total), dtype=np.int64)
+        codes = np.empty((len(index), len(pools)), dtype=np.uint8)
+        for position in range(len(pools) - 1, -1, -1):
+            index, digit = np.divmod(index, len(pools[position]))
+            codes[:, position] = pools[position][digit]
+        keys = pack_codes(codes)
+        for hit in np.flatnonzero(np.isin(keys, targets)):
+            found.setdefault(int(keys[hit]), offset + start + int(hit) + 1)
+        if len(found) == len(targets):
+            break
+    return total
+
+
+def measure_brute_force(codes: np.ndarray, sizes: Sequence[int]) -> np.ndarray:
+    """
+    Guesses-to-crack of every target under lexicographic brute force over the
+    union of all classes.
+
+    Returns:
+        np.ndarray: The guess number at which every target was found.
+    """
+    keys = pack_codes(codes)
+    targets = np.unique(keys)
+    found: dict[int, int] = {}
+    pool = np.arange(sum(sizes), dtype=np.uint8)
+    enumerate_candidates([pool] * codes.shape[1], targets, found, 0)
+    return np.array([found[int(key)] for key in keys], dtype=np.float64)
+
+
+def measure_mask_attack(classes: np.ndarray, codes: np.ndarray, sizes: Sequence[int]) -> np.ndarray:
+    """
+    Guesses-to-crack of every target under the optimal mask attack: every
+    class pattern is equally likely, so masks are tried smallest key space
+    first, each one exhausted before the next.
+
+    Returns:
+        np.ndarray: The guess number at which every target was found.
+    """
+    length = classes.shape[1]
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    class_pools = [np.arange(start, start + size, dtype=np.uint8) for start, size in zip(offsets, sizes)]
+    masks = sorted(itertools.product(range(len(sizes)), repeat=length),
+                   key=lambda mask: math.prod(sizes[c] for c in mask))
+
+    keys = pack_codes(codes)
+    targets = np.unique(keys)
+    found: dict[int, int] = {}
+    spent = 0
+    for mask in masks:
+        pools = [class_pools[c] for c in mask]
+        spent += enumerate_candidates(pools, targets, found, spent)
+        if len(found) == len(targets):
+            break
+    return np.array([found[int(key)] for key in keys], dtype=np.float64)
+
+
+def expected_brute_force_guesses(sizes: Sequence[int], length: int) -> float:
+    """Exact expected guesses of lexicographic brute force against 'class_first' passwords."""
+    pool = sum(sizes)
+    mean_code = sum(
+        code / (len(sizes) * size)
+        for start, size in zip(itertools.accumulate([0, *sizes]), sizes)
+        for code in range(start, start + size)
+    )
+    return 1 + mean_code * (pool ** length - 1) / (pool - 1)
+
+
+def expected_mask_attack_guesses(sizes: Sequence[int], length: int) -> float:
+    """
+    Exact expected guesses of the optimal mask attack against 'class_first' passwords.
+
+    Masks are grouped by how many positions use each distinct class size,
+    so the cost grows with the number of such compositions, not with the
+    (classes ** length) masks.
+
+    Args:
+        sizes (Sequence[int]): Number of characters of every class.
+        length (int): Password length.
+
+    Returns:
+        float: The expected guess number.
+    """
+    multiplicity: dict[int, int] = {}
+    for size in sizes:
+        multiplicity[size] = multiplicity.get(size, 0) + 1
+    distinct = sorted(multiplicity)
+
+    groups: dict[int, int] = {}
+    for split in itertools.combinations(range(length + len(distinct) - 1), len(distinct) - 1):
+        counts = [b - a - 1 for a, b in zip((-1, *split), (*split, length + len(distinct) - 1))]
+        masks = math.factorial(length)
+        keyspace = 1
+        for size, count in zip(distinct, counts):
+            masks = masks // math.factorial(count) * multiplicity[size] ** count
+            keyspace *= size ** count
+        groups[keyspace] = groups.get(keyspace, 0) + masks
+
+    total = 0
+    before = 0
+    for keyspace in sorted(groups):
+        masks = groups[keyspace]
+        total += 2 * masks * before + keyspace * masks * (masks - 1) + masks * (keyspace + 1)
+        before += masks * keyspace
+    return total / (2 * len(sizes) ** length)
+
+
+def effective_bits(expected_guesses: float) -> float:
+    """Entropy of the uniform key space needing the same expected guesses."""
+    return math.log2(2 * expected_guesses - 1)
+
+
+def run_simulation(
+    lengths: Sequence[int] = DEFAULT_SIMULATION_LENGTHS,
+    targets: int = DEFAULT_TARGETS,
+    seed: int | None = None,
+) -> list[dict]:
+    """
+    Cracks sampled passwords over `REDUCED_CLASSES` and compares the measured
+    guesses with the exact model and with the entropy estimate.
+
+    Args:
+        lengths (Sequence[int], optional): Password lengths to simulate (<= 8).
+        targets (int, optional): Passwords cracked per length.
+        seed (int | None, optional): Seed of the target sampling.
+
+    Returns:
+        list[dict]: Per length: estimated bits, measured and modelled mean
+            guesses of both attacks, their relative errors and guesses/sec.
+    """
+    sizes = [len(chars) for chars in REDUCED_CLASSES.values()]
+    rng = np.random.default_rng(seed)
+    reports = []
+    for length in lengths:
+        if length > MAX_SIMULATION_LENGTH:
+            raise ValueError(f"Simulated lengths are limited to {MAX_SIMULATION_LENGTH}")
+        classes, codes = sample_targets(sizes, length, targets, rng)
+
+        start = time.perf_counter()
+        brute_force = measure_brute_force(codes, sizes)
+        mask_attack = measure_mask_attack(classes, codes, sizes)
+        elapsed = time.perf_counter() - start
+
+        brute_force_model = expected_brute_force_guesses(sizes, length)
+        mask_attack_model = expected_mask_attack_guesses(sizes, length)
+        reports.append({
+            'length': length,
+            'estimated_bits': float(estimate_entropy(classes, sizes).mean()),
+            'brute_force_guesses': float(brute_force.mean()),
+            'brute_force_model': brute_force_model,
+            'brute_force_error': abs(brute_force.mean() / brute_force_model - 1),
+            'mask_attack_guesses': float(mask_attack.mean()),
+            'mask_attack_model': mask_attack_model,
+            'mask_attack_error': abs(mask_attack.mean() / mask_attack_model - 1),
+            'guesses_per_second': (brute_force.max() + mask_attack.max()) / elapsed,
+        })
+    return reports
+
+
+def extrapolate_strength(
+    lengths: Sequence[int] = DEFAULT_EXTRAPOLATION_LENGTHS,
+    settings: PasswordSettings | None = None,
+    samples: int = DEFAULT_TARGETS,
+    guess_rate: float = DEFAULT_GUESS_RATE,
+) -> list[dict]:
+    """
+    Applies the validated mask-attack model to the real character classes.
+
+    Args:
+        lengths (Sequence[int], optional): Password lengths to report.
+        settings (PasswordSettings | None, optional): Enabled classes; all by default.
+        samples (int, optional): Generated passwords averaged for the estimate.
+        guess_rate (float, optional): Attacker guesses per second.
+
+    Returns:
+        list[dict]: Per length: the mean `calculate_password_entropy()` and its
+            label, the effective bits under the mask attack and their label,
+            and the expected time to crack in seconds.
+    """
+    settings = settings or {'password_length': DEFAULT_PASSWORD_LENGTH,
+                            **{option: True for option in PASSWORD_OPTIONS}}
+    sizes = [len(CHARACTER_CLASSES[option]) for option in PASSWORD_OPTIONS if settings[option]]
+    reports = []
+    for length in lengths:
+        length_settings: PasswordSettings = {**settings, 'password_length': length}
+        estimated = sum(
+            calculate_password_entropy(random_password_generator(length_settings)) for _ in range(samples)
+        ) / samples
+        guesses = expected_mask_attack_guesses(sizes, length)
+        bits = effective_bits(guesses)
+        reports.append({
+            'length': length,
+            'estimated_bits': estimated,
+            'estimated_label': evaluate_password_strength(estimated)['label'],
+            'effective_bits': bits,
+            'effective_label': evaluate_password_strength(bits)['label'],
+            'seconds_to_crack': guesses / guess_rate,
+        })
+    return reports
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Mask-attack simulation of the strength labels')
+    parser.add_argument('--lengths', type=int, nargs='+', default=list(DEFAULT_SIMULATION_LENGTHS))
+    parser.add_argument('--targets', type=int, default=DEFAULT_TARGETS)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='largest accepted relative error between measured and modelled guesses')
+    parser.add_argument('--guess-rate', type=float, default=DEFAULT_GUESS_RATE,
+                        help='attacker guesses per second for the time-to-crack column')
+    arguments = parser.parse_args()
+
+    print(f'Simulation over {REDUCED_CLASSES}')
+    failed = False
+    for report in run_simulation(arguments.lengths, arguments.targets, arguments.seed):
+        failed |= max(report['brute_force_error'], report['mask_attack_error']) > arguments.tolerance
+        print(
+            f"length {report['length']}: estimate {report['estimated_bits']:5.2f} bits | "
+            f"brute force {effective_bits(report['brute_force_guesses']):5.2f} bits "
+            f"(model {effective_bits(report['brute_force_model']):5.2f}, error {report['brute_force_error']:.1%}) | "
+            f"mask attack {effective_bits(report['mask_attack_guesses']):5.2f} bits "
+            f"(model {effective_bits(report['mask_attack_model']):5.2f}, error {report['mask_attack_error']:.1%}) | "
+            f"{report['guesses_per_second']:,.0f} guesses/sec"
+        )
+
+    print(f'\nExtrapolation to the real classes, {arguments.guess_rate:.0e} guesses/sec')
+    for report in extrapolate_strength(guess_rate=arguments.guess_rate):
+        print(
+            f"length {report['length']:>2}: estimate {report['estimated_bits']:6.2f} bits {report['estimated_label']:<14} "
+            f"mask attack {report['effective_bits']:6.2f} bits {report['effective_label']:<14} "
+            f"{report['seconds_to_crack']:.3g} s to crack"
+        )
+
+    if failed:
+        print(f'Measured guesses differ from the model by more than {arguments.tolerance:.0%}')
+        sys.exit(1)
@@ -0,0 +1,304 @@
+import os
+import csv
+import json
+import time
+import argparse
+from array import array
+from typing import Sequence, TypedDict
+from utils import *
+from profiling import add_profile_arguments, profile_phase, start_profiling_from_arguments, stop_profiling
+from exporters import BINARY_MAGIC, BINARY_RECORD_HEADER, BINARY_VERSION, CSV_FIELDS, EXPORT_BUFFER_SIZE, guess_export_format
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# ----------------------------- Constants ----------------------------- #
+
+# Time slice of one `step()`, short enough for the Tk loop to stay responsive
+AUDIT_CHUNK_SECONDS = 0.02
+
+# Records scored between two clock reads
+AUDIT_CLOCK_STRIDE = 256
+
+# Rows the view materializes at a time
+AUDIT_PAGE_SIZE = 25
+
+AUDIT_SORT_KEYS = ('line', 'entropy', 'label')
+
+
+class AuditRow(TypedDict):
+    """
+    Represents one audited password as the results view shows it.
+
+    Attributes:
+        line (int): Line of the password in the file (record number in a
+            binary file), starting at 1.
+        password (str): The password, read back from the file on demand.
+        entropy (float): Entropy in bits.
+        label (str): Strength label.
+        color (str): Strength color.
+    """
+
+    line: int
+    password: str
+    entropy: float
+    label: str
+    color: str
+
+
+def parse_password_line(line: bytes, export_format: str) -> str | None:
+    """
+    Extracts the password of one line of a text, NDJSON or CSV export.
+
+    Args:
+        line (bytes): The raw line, with or without its newline.
+        export_format (str): 'text', 'ndjson' or 'csv'.
+
+    Returns:
+        str | None: The password, or None for an empty or unreadable line.
+    """
+    text = line.decode('utf-8', errors='replace').rstrip('\r\n')
+    if not text:
+        return None
+    if export_format == 'ndjson':
+        try:
+            return json.loads(text)['password']
+        except (ValueError, KeyError, TypeError):
+            return None
+    if export_format == 'csv':
+        fields = next(csv.reader([text]), None)
+        return fields[0] if fields else None
+    return text
+
+
+def score_password(password: str) -> float:
+    """Returns the entropy of a password, 0 when none of its characters belongs to a class."""
+    try:
+        return calculate_password_entropy(password)
+    except ValueError:
+        return 0.0
+
+
+class PasswordFileAudit:
+    """
+    Streams a password file and scores it a time slice at a time.
+
+    Every `step()` scores records for about `AUDIT_CHUNK_SECONDS` and
+    returns, so a GUI can schedule the steps with `after()` and keep
+    handling events. Per record only the file offset, the line number, the
+    entropy and the strength level are kept (17 bytes); passwords are read
+    back from the file for the rows a view actually shows, so memory stays
+    bounded for files with millions of lines. Sorting is a NumPy argsort
+    over the entropy and level arrays, so reordering millions of rows takes
+    a fraction of a second on the Tk thread; without NumPy (optional) the
+    same order is built with `sorted()`, slower on very large files.
+
+    Args:
+        path (str): A plain text (one password per line), NDJSON, CSV or binary export.
+        export_format (str | None, optional): A key of `EXPORT_FORMATS`,
+            guessed from the extension when omitted.
+
+    Raises:
+        ValueError: If a binary file does not start with the expected header.
+    """
+
+    def __init__(self, path: str, export_format: str | None = None) -> None:
+        self.path = path
+        self.export_format = export_format or guess_export_format(path)
+        self.size = os.path.getsize(path)
+        self.offsets = array('Q')
+        self.lines = array('I')
+        self.entropies = array('f')
+        self.levels = array('B')
+        self.level_counts = [0] * len(STRENGTH_LEVELS)
+        self.skipped = 0
+        self.finished = False
+        self.sort_key = 'line'
+        self.descending = False
+        self.order: Sequence[int] | None = None
+
+        self.file = open(path, 'rb', buffering=EXPORT_BUFFER_SIZE)
+        self.reader = open(path, 'rb')
+        self.position = 0
+        self.line = 0
+        if self.export_format == 'binary':
+            header = BINARY_MAGIC + bytes([BINARY_VERSION])
+            if self.file.read(len(header)) != header:
+                self.close()
+                raise ValueError(f"Not a binary password export: {path}")
+            self.position = len(header)
+        elif self.export_format == 'csv':
+            first = self.file.readline()
+            if first.decode('utf-8', errors='replace').rstrip('\r\n') == ','.join(CSV_FIELDS):
+                self.position = len(first)
+                self.line = 1
+            else:
+                self.file.seek(0)
+
+    def __enter__(self) -> 'PasswordFileAudit':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _read_record(self, file) -> tuple[bytes, str | None] | None:
+        """Read the next record: its raw bytes and password (None if unreadable), or None at the end."""
+        if self.export_format == 'binary':
+            header = file.read(BINARY_RECORD_HEADER.size)
+            if len(header) < BINARY_RECORD_HEADER.size:
+                return None
+            length = BINARY_RECORD_HEADER.unpack(header)[0]
+            data = file.read(length)
+            return header + data, data.decode('utf-8', errors='replace')
+        line = file.readline()
+        if not line:
+            return None
+        return line, parse_password_line(line, self.export_format)
+
+    def step(self, budget: float = AUDIT_CHUNK_SECONDS) -> bool:
+        """
+        Score records for about `budget` seconds.
+
+        Returns:
+            bool: True once the whole file has been scored.
+        """
+        deadline = time.perf_counter() + budget
+        while not self.finished and time.perf_counter() < deadline:
+            for _ in range(AUDIT_CLOCK_STRIDE):
+                offset = self.position
+                record = self._read_record(self.file)
+                if record is None:
+                    self._finish()
+                    break
+                raw, password = record
+                self.position += len(raw)
+                self.line += 1
+                if not password:
+                    self.skipped += 1
+                    continue
+                entropy = score_password(password)
+                level = get_strength_level_index(entropy)
+                self.offsets.append(offset)
+                self.lines.append(self.line)
+                self.entropies.append(entropy)
+                self.levels.append(level)
+                self.level_counts[level] += 1
+        return self.finished
+
+    def _finish(self) -> None:
+        self.finished = True
+        self.file.close()
+        if self.sort_key != 'line':
+            self._sort()
+
+    def progress(self) -> float:
+        """Returns the share of the file scored so far, in percent."""
+        return 100.0 if self.finished or not self.size else 100.0 * self.position / self.size
+
+    def sort(self, key: str, descending: bool = False) -> None:
+        """
+        Order the rows by record number, entropy or strength level.
+
+        Rows scored after the call are listed after the sorted ones until the
+        audit finishes, when the order is rebuilt once.
+
+        Raises:
+            ValueError: If the key is not one of `AUDIT_SORT_KEYS`.
+        """
+        if key not in AUDIT_SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {key}")
+        self.sort_key = key
+        self.descending = descending
+        self._sort()
+
+    def _sort(self) -> None:
+        rows = len(self.offsets)
+        if self.sort_key == 'line':
+            self.order = range(rows - 1, -1, -1) if self.descending else None
+            return
+        if np is None:
+            entropies, levels = self.entropies, self.levels
+            key = entropies.__getitem__ if self.sort_key == 'entropy' else lambda row: (levels[row], entropies[row])
+            self.order = sorted(range(rows), key=key, reverse=self.descending)
+            return
+        # Copies: a live view would stop the arrays from growing
+        entropies = np.frombuffer(self.entropies, dtype=np.float32).copy()
+        if self.descending:
+            entropies = -entropies
+        if self.sort_key == 'entropy':
+            self.order = np.argsort(entropies, kind='stable')
+        else:
+            levels = np.frombuffer(self.levels, dtype=np.uint8).astype(np.int8)
+            self.order = np.lexsort((entropies, -levels if self.descending else levels))
+
+    def _read_password(self, row: int) -> str:
+        self.reader.seek(self.offsets[row])
+        record = self._read_record(self.reader)
+        return record[1] if record is not None else ''
+
+    def page(self, start: int, count: int = AUDIT_PAGE_SIZE) -> list[AuditRow]:
+        """
+        Returns `count` rows of the current order, from position `start`.
+
+        Only these rows' passwords are read back from the file.
+        """
+        order = self.order
+        rows = []
+        for position in range(max(0, start), min(start + count, len(self.offsets))):
+            row = order[position] if order is not None and position < len(order) else position
+            level = STRENGTH_LEVELS[self.levels[row]]
+            rows.append({
+                'line': self.lines[row],
+                'password': self._read_password(row),
+                'entropy': self.entropies[row],
+                'label': level['label'],
+                'color': level['color'],
+            })
+        return rows
+
+    def summary(self) -> dict[str, int]:
+        """Returns the row count per strength label, plus 'total' and 'skipped'."""
+        counts = {level['label']: count for level, count in zip(STRENGTH_LEVELS, self.level_counts)}
+        counts['total'] = len(self.offsets)
+        counts['skipped'] = self.skipped
+        return counts
+
+    def close(self) -> None:
+        """Close the file handles."""
+        self.file.close()
+        self.reader.close()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Audit the strength of a password file')
+    parser.add_argument('path', help='text, NDJSON, CSV or binary password file')
+    parser.add_argument('--format', choices=('text', 'ndjson', 'csv', 'binary'))
+    parser.add_argument('--weakest', type=int, default=10, help='weakest entries to list')
+    add_profile_arguments(parser)
+    arguments = parser.parse_args()
+
+    start_profiling_from_arguments(arguments)
+    with PasswordFileAudit(arguments.path, arguments.format) as audit:
+        start = time.perf_counter()
+        steps = 0
+        finished = False
+        while not finished:
+            with profile_phase():
+                finished = audit.step()
+            steps += 1
+        elapsed = time.perf_counter() - start
+        print(f'{len(audit)} passwords in {elapsed:.2f} s ({len(audit) / elapsed:,.0f}/sec, {steps} steps)')
+        for label, count in audit.summary().items():
+            print(f'{label:<12}: {count}')
+        with profile_phase():
+            audit.sort('entropy')
+        for row in audit.page(0, arguments.weakest):
+            print(f"{row['line']:>10}  {row['entropy']:>7.2f}  {row['label']:<12} {row['password']}")
+    stop_profiling()
@@ -0,0 +1,184 @@
+import re
+import time
+import argparse
+import functools
+import numpy as np
+from typing import Sequence, TypedDict
+from utils import *
+
+
+# ----------------------------- Constants ----------------------------- #
+DEFAULT_BENCHMARK_PASSWORDS = 1_000_000
+
+# Exclusive upper entropy bounds of the strength levels, for `np.searchsorted`
+LEVEL_BOUNDS = np.array([level['max_entropy'] for level in STRENGTH_LEVELS[:-1]], dtype=np.float64)
+LEVEL_SCORES = np.array([level['score'] for level in STRENGTH_LEVELS], dtype=np.int16)
+LEVEL_LABELS = np.array([level['label'] for level in STRENGTH_LEVELS], dtype=object)
+LEVEL_COLORS = np.array([level['color'] for level in STRENGTH_LEVELS], dtype=object)
+
+
+class StrengthColumns(TypedDict):
+    """
+    Strength of many passwords, one array per field (row i is password i).
+
+    Attributes:
+        length (np.ndarray): Password lengths.
+        class_mask (np.ndarray): Class bit masks, see `calculate_password_class_mask()`.
+        pool_size (np.ndarray): Character pool sizes, see `calculate_password_range()`.
+        entropy (np.ndarray): Entropies in bits, 0 for an empty pool.
+        level (np.ndarray): Indices into `STRENGTH_LEVELS`.
+        score (np.ndarray): Strength scores.
+        label (np.ndarray): Strength labels (object array).
+        color (np.ndarray): Strength colors (object array).
+    """
+
+    length: np.ndarray
+    class_mask: np.ndarray
+    pool_size: np.ndarray
+    entropy: np.ndarray
+    level: np.ndarray
+    score: np.ndarray
+    label: np.ndarray
+    color: np.ndarray
+
+
+@functools.cache
+def get_class_lookup() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds the lookup tables, derived from the scalar analysis so both agree.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The class bits of code
+            points 0-255, the sorted wider code points that count as a space
+            (the `\\s` of `analyze_selected_password()`), and the pool size
+            of every class mask.
+    """
+    narrow = np.array([calculate_password_class_mask(chr(code)) for code in range(256)], dtype=np.uint8)
+    space = re.compile(r'\s')
+    wide_spaces = np.array(
+        [code for code in range(256, 0x110000) if chr(code).isspace() and space.match(chr(code))],
+        dtype=np.uint32,
+    )
+    pool_sizes = np.array([
+        sum(PASSWORD_OPTION_RANGE_SIZE[option] for bit, option in enumerate(PASSWORD_OPTIONS) if mask >> bit & 1)
+        for mask in range(1 << len(PASSWORD_OPTIONS))
+    ], dtype=np.int64)
+    return narrow, wide_spaces, pool_sizes
+
+
+def to_code_points(passwords: Sequence[str] | np.ndarray) -> np.ndarray:
+    """
+    Converts passwords to a zero-padded 2-D array of code points.
+
+    Args:
+        passwords (Sequence[str] | np.ndarray): Strings, a NumPy fixed-width
+            unicode ('U') or bytes ('S') array, or a 2-D uint8 array of
+            zero-padded ASCII/Latin-1 rows.
+
+    Returns:
+        np.ndarray: uint32 array of shape (count, max length).
+    """
+    if isinstance(passwords, np.ndarray) and passwords.dtype == np.uint8 and passwords.ndim == 2:
+        return passwords.astype(np.uint32)
+    if not isinstance(passwords, np.ndarray) or passwords.dtype.kind not in 'US':
+        passwords = np.asarray(list(passwords), dtype=str)
+    if passwords.dtype.kind == 'S':
+        width = passwords.dtype.itemsize
+        return passwords.view(np.uint8).reshape(-1, width).astype(np.uint32)
+    width = passwords.dtype.itemsize // 4
+    return passwords.view(np.uint32).reshape(-1, max(width, 1))
+
+
+def calculate_password_strength_many(passwords: Sequence[str] | np.ndarray) -> StrengthColumns:
+    """
+    Calculates the strength of many passwords with array operations.
+
+    Gives the same results as calling `calculate_password_strength()` per
+    password, without a Python round trip per password: class bits come from
+    a lookup table, masks are OR-reduced per row, and the level labels and
+    colors are mapped once per level.
+
+    Args:
+        passwords (Sequence[str] | np.ndarray): See `to_code_points()`.
+            Trailing NUL characters count as padding.
+
+    Returns:
+        StrengthColumns: One array per strength field.
+    """
+    narrow, wide_spaces, pool_sizes = get_class_lookup()
+    codes = to_code_points(passwords)
+
+    bits = np.where(codes < 256, narrow[np.minimum(codes, 255)], 0).astype(np.uint8)
+    wide = codes >= 256
+    if wide.any():
+        bits[wide] |= np.isin(codes[wide], wide_spaces).astype(np.uint8) << PASSWORD_OPTIONS.index('space')
+
+    padding = np.cumprod((codes == 0)[:, ::-1], axis=1)[:, ::-1].sum(axis=1)
+    length = codes.shape[1] - padding
+    class_mask = np.bitwise_or.reduce(bits, axis=1) if codes.shape[1] else np.zeros(len(codes), np.uint8)
+    pool_size = pool_sizes[class_mask]
+    with np.errstate(divide='ignore'):
+        entropy = np.where(pool_size > 0, length * np.log2(np.maximum(pool_size, 1)), 0.0)
+    level = np.searchsorted(LEVEL_BOUNDS, entropy, side='right')
+
+    return {
+        'length': length,
+        'class_mask': class_mask,
+        'pool_size': pool_size,
+        'entropy': entropy,
+        'level': level,
+        'score': LEVEL_SCORES[level],
+        'label': LEVEL_LABELS[level],
+        'color': LEVEL_COLORS[level],
+    }
+
+
+def benchmark_bulk_strength(count: int, password_length: int) -> dict:
+    """
+    Compare per-password and vectorized scoring, checking that they agree.
+
+    Args:
+        count (int): Number of passwords.
+        password_length (int): Length of the generated passwords.
+
+    Returns:
+        dict: Passwords/sec of both paths, the speedup and the mismatch count.
+    """
+    settings: PasswordSettings = {'password_length': password_length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    passwords = [random_password_generator(settings) for _ in range(count)]
+    array = np.array(passwords)
+
+    start = time.perf_counter()
+    scalar = [calculate_password_strength(password) for password in passwords]
+    scalar_rate = count / (time.perf_counter() - start)
+
+    get_class_lookup()
+    start = time.perf_counter()
+    columns = calculate_password_strength_many(array)
+    vector_rate = count / (time.perf_counter() - start)
+
+    mismatches = sum(
+        1 for (score, label, color), vector_score, vector_label, vector_color
+        in zip(scalar, columns['score'], columns['label'], columns['color'])
+        if (score, label, color) != (vector_score, vector_label, vector_color)
+    )
+    return {
+        'scalar_per_second': scalar_rate,
+        'vector_per_second': vector_rate,
+        'speedup': vector_rate / scalar_rate,
+        'mismatches': mismatches,
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Vectorized strength scoring benchmark')
+    parser.add_argument('--count', type=int, default=DEFAULT_BENCHMARK_PASSWORDS)
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    arguments = parser.parse_args()
+
+    report = benchmark_bulk_strength(arguments.count, arguments.length)
+    print(f"per password : {report['scalar_per_second']:>12,.0f} passwords/sec")
+    print(f"vectorized   : {report['vector_per_second']:>12,.0f} passwords/sec  (x{report['speedup']:.1f})")
+    print(f"mismatches   : {report['mismatches']}")
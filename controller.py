@@ -0,0 +1,457 @@
+import os
+import math
+import time
+import argparse
+import statistics
+from typing import Iterator, TypedDict
+from utils import *
+from exporters import build_password_record, export_passwords
+from history import HISTORY_PAGE_SIZE, PasswordHistory, settings_profile
+from password_policy import BannedTermPolicy, combine_filters, generate_filtered_password, load_policy
+from similarity import SimilarityIndex
+from workload import TraceRecorder
+from strength_table import StrengthPreview, get_strength_table
+from memory_watchdog import DEFAULT_CHECK_INTERVAL, MemoryWatchdog
+from pronounceable import (MarkovModel, build_pronounceable_record, generate_pronounceable_password,
+                           pronounceable_profile)
+
+
+# ----------------------------- Constants ----------------------------- #
+
+# Environment variables enabling the optional features of the GUI
+HISTORY_DB_ENV = 'RPG_HISTORY_DB'
+BANNED_TERMS_ENV = 'RPG_BANNED_TERMS'
+MAX_SIMILARITY_ENV = 'RPG_MAX_SIMILARITY'
+TRACE_ENV = 'RPG_TRACE'
+MEMORY_REPORT_ENV = 'RPG_MEMORY_REPORT'
+PRONOUNCEABLE_MODEL_ENV = 'RPG_PRONOUNCEABLE_MODEL'
+
+DEFAULT_BENCHMARK_CLICKS = 10_000
+
+
+class StrengthView(TypedDict):
+    """
+    Represents everything the strength area of a view displays for a password.
+
+    Attributes:
+        password (str): The evaluated password.
+        entropy (float): Entropy in bits.
+        score (int): Strength score (progress bar value).
+        label (str): Strength label.
+        color (str): Strength color.
+        banned_terms (list[str]): Banned terms found by the policy (empty without one).
+    """
+
+    password: str
+    entropy: float
+    score: int
+    label: str
+    color: str
+    banned_terms: list[str]
+
+
+class PasswordController:
+    """
+    UI-independent state and handlers of the password generator window.
+
+    Owns the settings, the generated passwords (in memory, or in the
+    persistent history), the optional banned-term policy and near-duplicate
+    index, and computes what the view shows. The Tk window only reads its
+    widgets, calls a handler and paints the result, so every handler can be
+    driven and timed without a display.
+
+    Args:
+        history (PasswordHistory | None, optional): Persistent history; passwords
+            are kept in `passwords` when omitted.
+        policy (BannedTermPolicy | None, optional): Banned-term policy.
+        similarity (SimilarityIndex | None, optional): Near-duplicate index.
+        recorder (TraceRecorder | None, optional): Records every handled action
+            (settings and timing only) to a workload trace.
+        watchdog (MemoryWatchdog | None, optional): Started memory watchdog;
+            stopped by `close()`, which writes its report.
+        pronounceable (MarkovModel | None, optional): Markov model offered as
+            an alternative generator, switched on with `set_pronounceable()`.
+    """
+
+    def __init__(
+        self,
+        history: PasswordHistory | None = None,
+        policy: BannedTermPolicy | None = None,
+        similarity: SimilarityIndex | None = None,
+        recorder: TraceRecorder | None = None,
+        watchdog: MemoryWatchdog | None = None,
+        pronounceable: MarkovModel | None = None,
+    ) -> None:
+        self.history = history
+        self.policy = policy
+        self.similarity = similarity
+        self.recorder = recorder
+        self.watchdog = watchdog
+        self.pronounceable = pronounceable
+        self.use_pronounceable = False
+        self.settings: PasswordSettings = {'password_length': DEFAULT_PASSWORD_LENGTH,
+                                           **{option: False for option in PASSWORD_OPTIONS}}
+        self.passwords: list[str] = []
+        # Newest history records skipped by the listed page
+        self.history_offset = 0
+        # Stored entropy of the listed passwords: the history page on display,
+        # or the pronounceable ones among the in-memory passwords
+        self.listed_entropies: dict[str, float] = {}
+        if similarity is not None and history is not None:
+            similarity.add_many(history.iter_passwords())
+
+    @classmethod
+    def from_environment(cls) -> 'PasswordController':
+        """
+        Build a controller with the optional features enabled through
+        `RPG_HISTORY_DB`, `RPG_BANNED_TERMS`, `RPG_MAX_SIMILARITY`, `RPG_TRACE`,
+        `RPG_MEMORY_REPORT` and `RPG_PRONOUNCEABLE_MODEL`.
+        """
+        history_path = os.environ.get(HISTORY_DB_ENV)
+        banned_terms_path = os.environ.get(BANNED_TERMS_ENV)
+        max_similarity = os.environ.get(MAX_SIMILARITY_ENV)
+        trace_path = os.environ.get(TRACE_ENV)
+        memory_report = os.environ.get(MEMORY_REPORT_ENV)
+        model_path = os.environ.get(PRONOUNCEABLE_MODEL_ENV)
+        return cls(
+            PasswordHistory(history_path) if history_path else None,
+            load_policy(banned_terms_path) if banned_terms_path else None,
+            SimilarityIndex(threshold=float(max_similarity)) if max_similarity else None,
+            TraceRecorder(trace_path, 'gui') if trace_path else None,
+            MemoryWatchdog(report_path=memory_report).start() if memory_report else None,
+            MarkovModel.load(model_path) if model_path else None,
+        )
+
+    def record(self, action: str, start: float | None = None) -> None:
+        """
+        Record an action in the workload trace, if recording is enabled.
+
+        Args:
+            action (str): One of `TRACE_ACTIONS`.
+            start (float | None, optional): `time.perf_counter()` when handling began.
+        """
+        if self.recorder is not None:
+            duration = time.perf_counter() - start if start is not None else 0.0
+            self.recorder.record(action, self.settings, duration)
+
+    def set_password_length(self, password_length: int) -> None:
+        """
+        Set the password length.
+
+        Raises:
+            ValueError: If the length is outside the allowed range.
+        """
+        if not is_valid_password_length(password_length):
+            raise ValueError(f'Password length must be between {MIN_PASSWORD_LENGTH} and {MAX_PASSWORD_LENGTH}')
+        self.settings['password_length'] = password_length
+
+    def set_options(self, options: dict[str, bool]) -> None:
+        """Enable or disable character classes, keyed by `PASSWORD_OPTIONS` names."""
+        for option, enabled in options.items():
+            self.settings[option] = bool(enabled)
+
+    def set_pronounceable(self, enabled: bool) -> None:
+        """
+        Switch between the character-class generator and the pronounceable model.
+
+        Raises:
+            ValueError: If enabled without a model.
+        """
+        if enabled and self.pronounceable is None:
+            raise ValueError('No pronounceable model loaded')
+        self.use_pronounceable = bool(enabled)
+
+    def generate(self) -> str:
+        """
+        Generate a password with the current settings and store it.
+
+        Passwords containing a banned term, or too similar to an earlier one,
+        are redrawn when a policy or similarity index is enabled. In
+        pronounceable mode the password comes from the Markov model and only
+        the length applies.
+
+        Raises:
+            IndexError: If no character class is enabled.
+
+        Returns:
+            str: The new password.
+        """
+        settings = self.settings
+        accept = combine_filters(
+            self.policy.is_allowed if self.policy is not None else None,
+            self.similarity.accept_new if self.similarity is not None else None,
+        )
+        if self.use_pronounceable:
+            length = settings['password_length']
+            password, entropy = generate_pronounceable_password(self.pronounceable, length, accept=accept)
+            self.listed_entropies[password] = entropy
+            if self.history is not None:
+                self.history.add(build_pronounceable_record(password, entropy), pronounceable_profile(length))
+                self.history_offset = 0
+            else:
+                self.passwords.append(password)
+            return password
+        if accept is not None:
+            password = generate_filtered_password(lambda: random_password_generator(settings), accept)
+        else:
+            password = random_password_generator(settings)
+        if self.history is not None:
+            self.history.add(build_password_record(password), settings_profile(settings))
+            self.history_offset = 0
+        else:
+            self.passwords.append(password)
+        return password
+
+    def strength(self, password: str) -> StrengthView:
+        """
+        Compute the strength view of a password.
+
+        Listed passwords are rated by the entropy stored with them, so
+        pronounceable ones keep their model entropy, also when picked from
+        the history of an earlier session; any other password is rated by
+        its character classes.
+
+        Args:
+            password (str): The password to evaluate.
+
+        Returns:
+            StrengthView: Entropy, score, label, color and banned terms.
+        """
+        entropy = self.listed_entropies.get(password)
+        if entropy is None:
+            entropy = calculate_password_entropy(password)
+        strength = evaluate_password_strength(entropy)
+        return {
+            'password': password,
+            'entropy': entropy,
+            'score': strength['score'],
+            'label': strength['label'],
+            'color': strength['color'],
+            'banned_terms': self.policy.find_banned_terms(password) if self.policy is not None else [],
+        }
+
+    def preview(self, password_length: int, options: dict[str, bool]) -> StrengthPreview:
+        """
+        Handler of a settings change: the expected strength, read from the
+        precomputed strength table without generating a password (in
+        pronounceable mode, the model entropy of the length).
+
+        Args:
+            password_length (int): The length entered by the user.
+            options (dict[str, bool]): The character classes selected by the user.
+
+        Raises:
+            ValueError: If the length is invalid.
+            IndexError: If no character class is selected.
+
+        Returns:
+            StrengthPreview: Expected entropy and strength bucket probabilities.
+        """
+        self.set_password_length(password_length)
+        self.set_options(options)
+        if self.use_pronounceable:
+            entropy = self.pronounceable.password_entropy(password_length)
+            level = get_strength_level_index(entropy)
+            return {
+                'length': password_length,
+                'class_mask': 0,
+                'expected_entropy': entropy,
+                'full_entropy': entropy,
+                'bucket_probabilities': tuple(float(index == level) for index in range(len(STRENGTH_LEVELS))),
+                'label': STRENGTH_LEVELS[level]['label'],
+                'color': STRENGTH_LEVELS[level]['color'],
+            }
+        return get_strength_table().preview(self.settings)
+
+    def length_for_target(self, target_bits: float, options: dict[str, bool]) -> int | None:
+        """
+        Handler of the target bits setting: the shortest length whose expected
+        entropy reaches `target_bits` with the selected classes (or with the
+        pronounceable model).
+
+        Raises:
+            IndexError: If no character class is selected.
+
+        Returns:
+            int | None: The length, or None if the maximum length falls short.
+        """
+        self.set_options(options)
+        if self.use_pronounceable:
+            length = max(MIN_PASSWORD_LENGTH, math.ceil(target_bits / self.pronounceable.entropy_per_char))
+            return length if length <= MAX_PASSWORD_LENGTH else None
+        return get_strength_table().minimum_length(settings_class_mask(self.settings), target_bits)
+
+    def click_generate(self, password_length: int, options: dict[str, bool]) -> StrengthView:
+        """
+        Handler of the 'Generate Password' button.
+
+        Args:
+            password_length (int): The length entered by the user.
+            options (dict[str, bool]): The character classes selected by the user.
+
+        Raises:
+            ValueError: If the length is invalid.
+            IndexError: If no character class is selected (outside pronounceable mode).
+
+        Returns:
+            StrengthView: The view of the new password.
+        """
+        start = time.perf_counter()
+        self.set_password_length(password_length)
+        self.set_options(options)
+        view = self.strength(self.generate())
+        self.record('generate', start)
+        return view
+
+    def select(self, password: str) -> StrengthView:
+        """
+        Handler of a password picked in the list: compute its strength view.
+
+        Args:
+            password (str): The selected password.
+
+        Returns:
+            StrengthView: The view of the selected password.
+        """
+        start = time.perf_counter()
+        view = self.strength(password)
+        self.record('select', start)
+        return view
+
+    def list_passwords(self) -> list[str]:
+        """
+        Returns the passwords the view lists, oldest first.
+
+        With a persistent history only the page of `HISTORY_PAGE_SIZE` entries
+        at `history_offset` is loaded (the newest one until `turn_history_page()`
+        moves it), so the history never has to be held in memory as a whole.
+        """
+        if self.history is not None:
+            page = self.history.page(self.history_offset, HISTORY_PAGE_SIZE)
+            self.listed_entropies = {record['password']: record['entropy'] for record in page}
+            return [record['password'] for record in reversed(page)]
+        return self.passwords
+
+    def turn_history_page(self, pages: int) -> list[str]:
+        """
+        Handler of the history page buttons: move the listed page.
+
+        Args:
+            pages (int): Pages to move, positive towards older passwords.
+                The move stops at the newest and at the oldest page.
+
+        Returns:
+            list[str]: The passwords of the new page, oldest first.
+        """
+        if self.history is not None:
+            offset = max(0, self.history_offset + pages * HISTORY_PAGE_SIZE)
+            if offset == 0 or self.history.page(offset, 1):
+                self.history_offset = offset
+        return self.list_passwords()
+
+    def history_page_state(self) -> tuple[bool, bool]:
+        """
+        Tell which history page buttons apply to the listed page.
+
+        Returns:
+            tuple[bool, bool]: Whether a newer and an older history page exist.
+        """
+        if self.history is None:
+            return False, False
+        older = self.history.page(self.history_offset + HISTORY_PAGE_SIZE, 1)
+        return self.history_offset > 0, bool(older)
+
+    def iter_saved_passwords(self) -> Iterator[str]:
+        """Yields every password to be saved, paging through the history (newest first) if enabled."""
+        if self.history is None:
+            yield from self.passwords
+            return
+        offset = 0
+        while page := self.history.page(offset, HISTORY_PAGE_SIZE):
+            for record in page:
+                yield record['password']
+            offset += len(page)
+
+    def save(self, path: str) -> int:
+        """
+        Export the saved passwords; the format follows the file extension.
+
+        Returns:
+            int: The number of passwords written.
+        """
+        start = time.perf_counter()
+        written = export_passwords(self.iter_saved_passwords(), path)
+        self.record('save', start)
+        return written
+
+    def clear(self) -> None:
+        """Forget the in-memory passwords (the persistent history is kept)."""
+        self.passwords.clear()
+        if self.history is None:
+            self.listed_entropies.clear()
+        self.record('clear')
+
+    def close(self) -> None:
+        """Release the history database and the trace, and write the memory report, if any."""
+        if self.history is not None:
+            self.history.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+
+
+def benchmark_clicks(controller: PasswordController, clicks: int, password_length: int) -> dict:
+    """
+    Time the generate and select handlers over many simulated clicks.
+
+    Args:
+        controller (PasswordController): The controller to drive.
+        clicks (int): Number of simulated clicks per handler.
+        password_length (int): Length entered for every click.
+
+    Returns:
+        dict: Per handler ('generate', 'select'): clicks/sec and p50/p99 latency (µs).
+    """
+    options = {option: True for option in PASSWORD_OPTIONS}
+    timings: dict[str, list[float]] = {'generate': [], 'select': []}
+    for _ in range(clicks):
+        start = time.perf_counter()
+        view = controller.click_generate(password_length, options)
+        timings['generate'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        controller.select(view['password'])
+        timings['select'].append(time.perf_counter() - start)
+
+    reports = {}
+    for handler, latencies in timings.items():
+        quantiles = statistics.quantiles(latencies, n=100)
+        reports[handler] = {
+            'clicks_per_second': len(latencies) / sum(latencies),
+            'p50_us': quantiles[49] * 1e6,
+            'p99_us': quantiles[98] * 1e6,
+        }
+    return reports
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Headless GUI handler benchmark')
+    parser.add_argument('--clicks', type=int, default=DEFAULT_BENCHMARK_CLICKS)
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    parser.add_argument('--memory-report', metavar='PATH',
+                        help='trace allocations and write the memory growth report to PATH')
+    arguments = parser.parse_args()
+
+    controller = PasswordController.from_environment()
+    if arguments.memory_report and controller.watchdog is None:
+        controller.watchdog = MemoryWatchdog(report_path=arguments.memory_report).start(DEFAULT_CHECK_INTERVAL)
+    try:
+        for handler, report in benchmark_clicks(controller, arguments.clicks, arguments.length).items():
+            print(
+                f"{handler:<9}: {report['clicks_per_second']:>10,.0f} clicks/sec  "
+                f"p50 {report['p50_us']:.1f} µs  p99 {report['p99_us']:.1f} µs"
+            )
+    finally:
+        controller.close()
@@ -0,0 +1,272 @@
+import io
+import os
+import csv
+import json
+import time
+import base64
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Sequence
+from utils import *
+from exporters import EXPORT_BUFFER_SIZE, PasswordRecord, generate_password_record_batches, guess_export_format
+
+
+# ----------------------------- Constants ----------------------------- #
+KDF_ALGORITHMS = ('pbkdf2_sha256', 'scrypt')
+DEFAULT_KDF = 'pbkdf2_sha256'
+SALT_SIZE = 16
+KDF_BATCH_SIZE = 64
+
+# Default cost parameters of every algorithm
+DEFAULT_KDF_PARAMETERS = {
+    'pbkdf2_sha256': {'iterations': 600_000},
+    'scrypt': {'n': 1 << 14, 'r': 8, 'p': 1},
+}
+
+CREDENTIAL_FIELDS = ('hash', 'password', 'entropy', 'label', 'class_mask')
+
+
+def encode_base64(data: bytes) -> str:
+    """URL-safe base64 without padding, as used in the hash strings."""
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def hash_password(password: str, algorithm: str = DEFAULT_KDF, salt: bytes | None = None,
+                  parameters: dict | None = None) -> str:
+    """
+    Hashes a password with a standard library KDF and a per-record salt.
+
+    The result is a self-describing string holding the algorithm, the cost
+    parameters, the salt and the derived key, separated by '$':
+    'pbkdf2_sha256$<iterations>$<salt>$<key>' or 'scrypt$<n>$<r>$<p>$<salt>$<key>'.
+
+    Args:
+        password (str): The password to hash.
+        algorithm (str, optional): One of `KDF_ALGORITHMS`.
+        salt (bytes | None, optional): Salt; a fresh random one when omitted.
+        parameters (dict | None, optional): Cost parameters overriding
+            `DEFAULT_KDF_PARAMETERS`.
+
+    Raises:
+        ValueError: If the algorithm is not supported.
+
+    Returns:
+        str: The encoded hash.
+    """
+    if algorithm not in KDF_ALGORITHMS:
+        raise ValueError(f"Unsupported KDF algorithm: {algorithm}")
+    salt = salt if salt is not None else os.urandom(SALT_SIZE)
+    parameters = {**DEFAULT_KDF_PARAMETERS[algorithm], **(parameters or {})}
+    secret = password.encode('utf-8')
+
+    if algorithm == 'pbkdf2_sha256':
+        key = hashlib.pbkdf2_hmac('sha256', secret, salt, parameters['iterations'])
+        fields = [parameters['iterations']]
+    else:
+        n, r, p = parameters['n'], parameters['r'], parameters['p']
+        key = hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, maxmem=2 * 128 * n * r * p)
+        fields = [n, r, p]
+    return '$'.join([algorithm, *map(str, fields), encode_base64(salt), encode_base64(key)])
+
+
+def _hash_batch(passwords: Sequence[str], algorithm: str, parameters: dict | None) -> list[str]:
+    """Worker: hash one batch of passwords, each with its own salt."""
+    return [hash_password(password, algorithm, parameters=parameters) for password in passwords]
+
+
+def hash_record_batches(
+    batches: Iterable[Sequence[PasswordRecord]],
+    algorithm: str = DEFAULT_KDF,
+    workers: int | None = None,
+    parameters: dict | None = None,
+    include_password: bool = True,
+) -> Iterator[list[dict]]:
+    """
+    Hashes batches of records in a process pool, keeping their order.
+
+    Batches are split into `KDF_BATCH_SIZE` chunks, one task each, and at
+    most two chunks per worker are in flight, so generation, hashing and
+    writing overlap without the whole input being queued up front.
+
+    Args:
+        batches (Iterable[Sequence[PasswordRecord]]): The records to hash.
+        algorithm (str, optional): One of `KDF_ALGORITHMS`.
+        workers (int | None, optional): Worker processes; one per core by default.
+        parameters (dict | None, optional): KDF cost parameters.
+        include_password (bool, optional): Keep the plaintext next to its hash.
+
+    Yields:
+        list[dict]: The next chunk of records, with their 'hash' field added.
+    """
+    workers = workers or os.cpu_count() or 1
+    pending: deque[tuple[Sequence[PasswordRecord], Future]] = deque()
+
+    def completed() -> list[dict]:
+        records, future = pending.popleft()
+        hashed = []
+        for record, password_hash in zip(records, future.result()):
+            record = {'hash': password_hash, **record}
+            if not include_password:
+                del record['password']
+            hashed.append(record)
+        return hashed
+
+    with ProcessPoolExecutor(workers) as pool:
+        for batch in batches:
+            for start in range(0, len(batch), KDF_BATCH_SIZE):
+                chunk = batch[start:start + KDF_BATCH_SIZE]
+                passwords = [record['password'] for record in chunk]
+                pending.append((chunk, pool.submit(_hash_batch, passwords, algorithm, parameters)))
+                if len(pending) >= 2 * workers:
+                    yield completed()
+        while pending:
+            yield completed()
+
+
+def encode_credential_text_batch(records: Sequence[dict]) -> bytes:
+    """Encode a batch as one hash per line, followed by a tab and the password when it is kept."""
+    return ''.join(
+        f"{record['hash']}\t{record['password']}\n" if 'password' in record else f"{record['hash']}\n"
+        for record in records
+    ).encode('utf-8')
+
+
+def encode_credential_ndjson_batch(records: Sequence[dict]) -> bytes:
+    """Encode a batch as newline-delimited JSON objects."""
+    return ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records).encode('utf-8')
+
+
+def encode_credential_csv_batch(records: Sequence[dict]) -> bytes:
+    """Encode a batch as CSV rows in `CREDENTIAL_FIELDS` order (without the header line)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerows(
+        (record['hash'], record.get('password', ''), f"{record['entropy']:.4f}", record['label'], record['class_mask'])
+        for record in records
+    )
+    return buffer.getvalue().encode('utf-8')
+
+
+# Credential format name -> (file header, batch encoder)
+CREDENTIAL_FORMATS: dict[str, tuple[bytes, Callable[[Sequence[dict]], bytes]]] = {
+    'text': (b'', encode_credential_text_batch),
+    'ndjson': (b'', encode_credential_ndjson_batch),
+    'csv': ((','.join(CREDENTIAL_FIELDS) + '\n').encode('utf-8'), encode_credential_csv_batch),
+}
+
+
+def export_credential_batches(batches: Iterable[Sequence[dict]], path: str, export_format: str) -> int:
+    """
+    Streams batches of hashed records to a file, one buffered write per batch.
+
+    Args:
+        batches (Iterable[Sequence[dict]]): Output of `hash_record_batches()`.
+        path (str): The output file path.
+        export_format (str): A key of `CREDENTIAL_FORMATS`.
+
+    Raises:
+        ValueError: If the format cannot hold credentials.
+
+    Returns:
+        int: The number of records written.
+    """
+    if export_format not in CREDENTIAL_FORMATS:
+        raise ValueError(f"Unsupported credential export format: {export_format}")
+    header, encode_batch = CREDENTIAL_FORMATS[export_format]
+
+    written = 0
+    with open(path, 'wb', buffering=EXPORT_BUFFER_SIZE) as file:
+        file.write(header)
+        for batch in batches:
+            file.write(encode_batch(batch))
+            written += len(batch)
+    return written
+
+
+def export_generated_credentials(
+    settings: PasswordSettings,
+    count: int,
+    path: str,
+    export_format: str | None = None,
+    algorithm: str = DEFAULT_KDF,
+    workers: int | None = None,
+    include_password: bool = True,
+) -> int:
+    """
+    Generates `count` passwords and writes them hashed to an export file.
+
+    Args:
+        settings (PasswordSettings): The settings used for every password.
+        count (int): Number of passwords to generate.
+        path (str): The output file path.
+        export_format (str | None, optional): A key of `CREDENTIAL_FORMATS`.
+            Guessed from the file extension when omitted.
+        algorithm (str, optional): One of `KDF_ALGORITHMS`.
+        workers (int | None, optional): Worker processes; one per core by default.
+        include_password (bool, optional): Keep the plaintext next to its hash.
+
+    Returns:
+        int: The number of records written.
+    """
+    batches = generate_password_record_batches(settings, count, KDF_BATCH_SIZE)
+    hashed = hash_record_batches(batches, algorithm, workers, include_password=include_password)
+    return export_credential_batches(hashed, path, export_format or guess_export_format(path))
+
+
+def benchmark_kdf(
+    algorithm: str,
+    count: int,
+    worker_counts: Sequence[int],
+    parameters: dict | None = None,
+) -> list[dict]:
+    """
+    Measure hashing throughput with 1..N worker processes.
+
+    Args:
+        algorithm (str): One of `KDF_ALGORITHMS`.
+        count (int): Passwords hashed per run.
+        worker_counts (Sequence[int]): Worker counts to measure.
+        parameters (dict | None, optional): KDF cost parameters.
+
+    Returns:
+        list[dict]: Per run: workers, hashes/sec and hashes/sec per busy core
+            (workers beyond the core count share cores).
+    """
+    settings: PasswordSettings = {'password_length': DEFAULT_PASSWORD_LENGTH,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    batch_size = max(1, count // (4 * max(worker_counts)))
+    records = list(generate_password_record_batches(settings, count, batch_size))
+    reports = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        for _ in hash_record_batches(records, algorithm, workers, parameters):
+            pass
+        rate = count / (time.perf_counter() - start)
+        cores = min(workers, os.cpu_count() or 1)
+        reports.append({'workers': workers, 'hashes_per_second': rate, 'per_core': rate / cores})
+    return reports
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='KDF hashing throughput benchmark')
+    parser.add_argument('--algorithm', choices=KDF_ALGORITHMS, default=DEFAULT_KDF)
+    parser.add_argument('--count', type=int, default=64)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--iterations', type=int, help='PBKDF2 iterations')
+    parser.add_argument('--scrypt-n', type=int, help='scrypt CPU/memory cost')
+    arguments = parser.parse_args()
+
+    parameters = {}
+    if arguments.iterations:
+        parameters['iterations'] = arguments.iterations
+    if arguments.scrypt_n:
+        parameters['n'] = arguments.scrypt_n
+    print(f'{arguments.algorithm} {({**DEFAULT_KDF_PARAMETERS[arguments.algorithm], **parameters})}')
+    for report in benchmark_kdf(arguments.algorithm, arguments.count, arguments.workers, parameters):
+        print(
+            f"{report['workers']:>3} workers: {report['hashes_per_second']:>10,.1f} hashes/sec  "
+            f"{report['per_core']:>8,.1f} hashes/sec per core"
+        )
@@ -0,0 +1,290 @@
+import os
+import json
+import math
+import time
+import platform
+import argparse
+import functools
+import threading
+from array import array
+from collections import Counter
+from typing import Callable
+from utils import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# ----------------------------- Constants ----------------------------- #
+ENGINE_ENV = 'RPG_ENGINE'
+ENGINE_CACHE_ENV = 'RPG_ENGINE_CACHE'
+DEFAULT_ENGINE_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'random_password_generator', 'engines.json')
+DEFAULT_ENGINE = 'reference'
+
+# Calibration: passwords per timed run (capped at the batch size), best of N runs
+CALIBRATION_PASSWORDS = 2_000
+CALIBRATION_REPEATS = 3
+
+# Largest batch bucket; every bigger batch is calibrated like this one
+MAX_BATCH_BUCKET = 1_000_000
+
+# Bytes read from the OS per urandom() call of the pooled engine
+CSPRNG_POOL_BYTES = 1 << 20
+
+# |z| of the chi-square test above which cross-validation fails an engine
+CROSS_VALIDATION_Z = 4.0
+
+# Engine name -> batch generator(settings, count) -> passwords.
+# Every engine draws with the default 'class_first' sampling.
+GENERATION_ENGINES: dict[str, Callable[[PasswordSettings, int], list[str]]] = {}
+
+
+def register_engine(name: str) -> Callable:
+    """Decorator adding a batch generator to `GENERATION_ENGINES` under `name`."""
+    def register(engine: Callable[[PasswordSettings, int], list[str]]) -> Callable:
+        GENERATION_ENGINES[name] = engine
+        return engine
+    return register
+
+
+@functools.cache
+def get_class_first_table(class_mask: int) -> str:
+    """
+    Builds a table where a uniform pick has the 'class_first' distribution.
+
+    Every enabled class fills the same number of slots (the lcm of the class
+    sizes), each of its characters an equal share, so one draw replaces the
+    class draw and the character draw of `random_password_generator()`.
+
+    Raises:
+        IndexError: If no character class is enabled.
+
+    Returns:
+        str: The table (at most 87,360 characters).
+    """
+    classes = [CHARACTER_CLASSES[option] for bit, option in enumerate(PASSWORD_OPTIONS) if class_mask >> bit & 1]
+    if not classes:
+        raise IndexError('No character class enabled')
+    slots = math.lcm(*(len(characters) for characters in classes))
+    return ''.join(characters * (slots // len(characters)) for characters in classes)
+
+
+def settings_table(settings: PasswordSettings) -> str:
+    """Returns the 'class_first' table of the classes enabled in a settings dict."""
+    return get_class_first_table(sum(1 << bit for bit, option in enumerate(PASSWORD_OPTIONS) if settings.get(option)))
+
+
+def split_passwords(characters: str, length: int) -> list[str]:
+    """Cuts a run of characters into passwords of `length`."""
+    return [characters[start:start + length] for start in range(0, len(characters), length)]
+
+
+@register_engine('reference')
+def generate_reference(settings: PasswordSettings, count: int) -> list[str]:
+    """The pure-Python reference: `random_password_generator()` once per password."""
+    return [random_password_generator(settings) for _ in range(count)]
+
+
+@register_engine('table')
+def generate_from_table(settings: PasswordSettings, count: int) -> list[str]:
+    """One `choices()` call per password over the precomputed 'class_first' table."""
+    table = settings_table(settings)
+    length = settings['password_length']
+    choices = get_thread_rng().choices
+    return [''.join(choices(table, k=length)) for _ in range(count)]
+
+
+@register_engine('csprng_pooled')
+def generate_from_csprng_pool(settings: PasswordSettings, count: int) -> list[str]:
+    """
+    Draws from the OS CSPRNG in large pooled reads instead of one call per character.
+
+    32-bit words of the pool index the 'class_first' table; words at or above
+    the largest multiple of the table size are rejected, so there is no
+    modulo bias.
+    """
+    table = settings_table(settings)
+    size = len(table)
+    limit = (1 << 32) - (1 << 32) % size
+    needed = count * settings['password_length']
+    characters: list[str] = []
+    while len(characters) < needed:
+        words = array('I', os.urandom(min(CSPRNG_POOL_BYTES, 4 * (needed - len(characters)) + 64)))
+        characters.extend(table[word % size] for word in words if word < limit)
+    return split_passwords(''.join(characters[:needed]), settings['password_length'])
+
+
+if np is not None:
+    _numpy_state = threading.local()
+
+    @functools.cache
+    def get_numpy_table(class_mask: int) -> 'np.ndarray':
+        """Returns the 'class_first' table as a uint8 array."""
+        return np.frombuffer(get_class_first_table(class_mask).encode('ascii'), dtype=np.uint8)
+
+    @register_engine('numpy')
+    def generate_with_numpy(settings: PasswordSettings, count: int) -> list[str]:
+        """Draws every table index of the batch in one vectorized call (per-thread PCG64)."""
+        generator = getattr(_numpy_state, 'generator', None)
+        if generator is None:
+            generator = _numpy_state.generator = np.random.default_rng()
+        table = get_numpy_table(sum(1 << bit for bit, option in enumerate(PASSWORD_OPTIONS) if settings.get(option)))
+        indices = generator.integers(0, table.size, size=count * settings['password_length'])
+        return split_passwords(table[indices].tobytes().decode('ascii'), settings['password_length'])
+
+
+def get_engine(name: str) -> Callable[[PasswordSettings, int], list[str]]:
+    """
+    Looks up an engine by name.
+
+    Raises:
+        ValueError: If no such engine is available on this host.
+    """
+    if name not in GENERATION_ENGINES:
+        raise ValueError(f"Unknown or unavailable engine: {name} (available: {', '.join(GENERATION_ENGINES)})")
+    return GENERATION_ENGINES[name]
+
+
+def get_batch_bucket(batch_size: int) -> int:
+    """Rounds a batch size up to a power of ten, the granularity of calibration."""
+    return min(10 ** math.ceil(math.log10(max(batch_size, 1))), MAX_BATCH_BUCKET)
+
+
+def get_host_key() -> str:
+    """Identifies the host and interpreter a calibration is valid for."""
+    return f'{platform.node()}|{platform.machine()}|{platform.python_implementation()}-{platform.python_version()}'
+
+
+def calibrate_engines(batch_size: int, settings: PasswordSettings | None = None) -> dict[str, float]:
+    """
+    Times every available engine on one batch.
+
+    Args:
+        batch_size (int): The batch size the engine is picked for.
+        settings (PasswordSettings | None, optional): Settings to time with;
+            every class at the default length when omitted.
+
+    Returns:
+        dict[str, float]: Engine name -> passwords/sec (best of `CALIBRATION_REPEATS`).
+    """
+    settings = settings or {'password_length': DEFAULT_PASSWORD_LENGTH, **{option: True for option in PASSWORD_OPTIONS}}
+    count = min(batch_size, CALIBRATION_PASSWORDS)
+    rates = {}
+    for name, engine in GENERATION_ENGINES.items():
+        engine(settings, 1)
+        best = math.inf
+        for _ in range(CALIBRATION_REPEATS):
+            start = time.perf_counter()
+            engine(settings, count)
+            best = min(best, time.perf_counter() - start)
+        rates[name] = count / best
+    return rates
+
+
+def select_engine(batch_size: int, override: str | None = None, cache_path: str | None = None) -> str:
+    """
+    Picks the engine for a batch size: the override, else the cached choice
+    for this host, else the winner of a fresh calibration (then cached).
+
+    Args:
+        batch_size (int): Number of passwords generated per call.
+        override (str | None, optional): Engine name forced by the caller;
+            `RPG_ENGINE` is used when omitted.
+        cache_path (str | None, optional): The calibration cache; `RPG_ENGINE_CACHE`
+            or `DEFAULT_ENGINE_CACHE` when omitted.
+
+    Raises:
+        ValueError: If the override names no available engine.
+
+    Returns:
+        str: A key of `GENERATION_ENGINES`.
+    """
+    override = override or os.environ.get(ENGINE_ENV)
+    if override:
+        get_engine(override)
+        return override
+
+    cache_path = cache_path or os.environ.get(ENGINE_CACHE_ENV) or DEFAULT_ENGINE_CACHE
+    key = f'{get_host_key()}|{get_batch_bucket(batch_size)}'
+    try:
+        with open(cache_path, encoding='utf-8') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get(key) in GENERATION_ENGINES:
+        return cache[key]
+
+    rates = calibrate_engines(get_batch_bucket(batch_size))
+    cache[key] = max(rates, key=rates.get)
+    try:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        with open(f'{cache_path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(cache, file, indent=2)
+        os.replace(f'{cache_path}.tmp', cache_path)
+    except OSError:
+        pass
+    return cache[key]
+
+
+def cross_validate_engines(settings: PasswordSettings, count: int) -> dict[str, dict]:
+    """
+    Checks that every engine draws from the 'class_first' distribution.
+
+    Each engine's character counts over `count` passwords are tested against
+    the exact probabilities of `get_character_weights()` with a chi-square
+    goodness-of-fit test (normal approximation of the statistic).
+
+    Args:
+        settings (PasswordSettings): The settings to validate with.
+        count (int): Passwords generated per engine.
+
+    Returns:
+        dict[str, dict]: Engine name -> chi-square statistic, degrees of freedom,
+            z-score, wrong-length and foreign-character counts, and 'passed'.
+    """
+    probabilities = get_character_weights(settings)
+    dof = len(probabilities) - 1
+    reports = {}
+    for name, engine in GENERATION_ENGINES.items():
+        passwords = engine(settings, count)
+        counts = Counter(''.join(passwords))
+        total = sum(counts.values())
+        statistic = sum((counts.get(char, 0) - total * p) ** 2 / (total * p) for char, p in probabilities.items())
+        z_score = (statistic - dof) / math.sqrt(2 * dof) if dof else 0.0
+        wrong_length = sum(len(password) != settings['password_length'] for password in passwords)
+        foreign = sum(n for char, n in counts.items() if char not in probabilities)
+        reports[name] = {
+            'chi_square': statistic,
+            'dof': dof,
+            'z_score': z_score,
+            'wrong_length': wrong_length,
+            'foreign_chars': foreign,
+            'passed': abs(z_score) < CROSS_VALIDATION_Z and not wrong_length and not foreign,
+        }
+    return reports
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Generation engines: calibration, selection and cross-validation')
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    parser.add_argument('--cross-validate', type=int, metavar='COUNT',
+                        help='check every engine against the exact distribution with COUNT passwords')
+    arguments = parser.parse_args()
+
+    settings: PasswordSettings = {'password_length': arguments.length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    for name, rate in calibrate_engines(arguments.batch_size, settings).items():
+        print(f'{name:<14}: {rate:>12,.0f} passwords/sec')
+    print(f'selected      : {select_engine(arguments.batch_size)}')
+
+    if arguments.cross_validate:
+        reports = cross_validate_engines(settings, arguments.cross_validate)
+        for name, report in reports.items():
+            print(f"{name:<14}: chi2 {report['chi_square']:.1f} (dof {report['dof']}, z {report['z_score']:+.2f})  "
+                  f"{'ok' if report['passed'] else 'FAILED'}")
+        if not all(report['passed'] for report in reports.values()):
+            raise SystemExit(1)
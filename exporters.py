@@ -0,0 +1,340 @@
+import io
+import csv
+import json
+import struct
+from typing import Callable, Iterable, Iterator, Sequence, TypedDict
+from utils import *
+from alphabets import Alphabet
+from seeded_streams import SeededPasswordStream
+from password_policy import generate_filtered_password
+
+
+# ----------------------------- Constants ----------------------------- #
+DEFAULT_EXPORT_BATCH_SIZE = 10_000
+EXPORT_BUFFER_SIZE = 1 << 20
+CSV_FIELDS = ('password', 'entropy', 'label', 'class_mask')
+
+# Length-prefixed binary layout:
+#   file header : magic + format version
+#   per record  : <password byte length, entropy, strength level index, class mask>
+#                 followed by the UTF-8 encoded password
+BINARY_MAGIC = b'RPGB'
+BINARY_VERSION = 1
+BINARY_RECORD_HEADER = struct.Struct('<HfBB')
+
+# File extensions recognised by `guess_export_format()`
+EXPORT_EXTENSIONS = {
+    '.txt': 'text',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.csv': 'csv',
+    '.bin': 'binary',
+}
+
+
+class PasswordRecord(TypedDict):
+    """
+    Represents a generated password together with its precomputed strength fields.
+
+    Attributes:
+        password (str): The password itself.
+        entropy (float): Password entropy in bits.
+        label (str): Strength label from `evaluate_password_strength()`.
+        class_mask (int): Character class bit mask from `calculate_password_class_mask()`.
+    """
+
+    password: str
+    entropy: float
+    label: str
+    class_mask: int
+
+
+def build_password_record(password: str, alphabet: Alphabet | None = None) -> PasswordRecord:
+    """
+    Computes the structured export record for a single password.
+
+    Args:
+        password (str): The password to describe.
+        alphabet (Alphabet | None, optional): Custom alphabet the password was
+            drawn from; its pool sizes and class bits are used when given.
+
+    Returns:
+        PasswordRecord: The password with its entropy, label and class mask.
+    """
+    if alphabet is not None:
+        entropy = alphabet.calculate_entropy(password)
+        class_mask = alphabet.calculate_class_mask(password)
+    else:
+        entropy = calculate_password_entropy(password)
+        class_mask = calculate_password_class_mask(password)
+    return {
+        'password': password,
+        'entropy': entropy,
+        'label': evaluate_password_strength(entropy)['label'],
+        'class_mask': class_mask,
+    }
+
+
+def generate_password_record_batches(
+    settings: PasswordSettings,
+    count: int,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    seed: int | None = None,
+    start: int = 0,
+    sampling: str = DEFAULT_SAMPLING_MODE,
+    alphabet: Alphabet | None = None,
+    accept: Callable[[str], bool] | None = None,
+    engine: Callable[[PasswordSettings, int], list[str]] | None = None,
+    class_weights: dict[str, float] | None = None,
+) -> Iterator[list[PasswordRecord]]:
+    """
+    Generates `count` passwords and yields their records in batches.
+
+    Args:
+        settings (PasswordSettings): The settings used for every password.
+        count (int): Total number of passwords to generate.
+        batch_size (int, optional): Number of records per yielded batch.
+        seed (int | None, optional): Draw from a reproducible `SeededPasswordStream`
+            instead of the global random state.
+        start (int, optional): First stream position to use when `seed` is given.
+        sampling (str, optional): One of `SAMPLING_MODES`.
+        alphabet (Alphabet | None, optional): Custom alphabet to draw from.
+        accept (Callable[[str], bool] | None, optional): Filter stage, e.g.
+            `BannedTermPolicy.is_allowed`; rejected passwords are redrawn.
+        engine (Callable | None, optional): Batch generator of `engines.py`
+            producing each unseeded batch in one call ('class_first' sampling,
+            ignored with a custom alphabet).
+        class_weights (dict[str, float] | None, optional): Weights of the 'weighted' mode.
+
+    Yields:
+        list[PasswordRecord]: The next batch of records.
+    """
+    stream = SeededPasswordStream(seed, settings, sampling, alphabet, class_weights) if seed is not None else None
+
+    def draw() -> str:
+        if alphabet is not None:
+            return alphabet.generate_password(settings, sampling=sampling)
+        return random_password_generator(settings, sampling=sampling, class_weights=class_weights)
+
+    generate = draw if accept is None else lambda: generate_filtered_password(draw, accept)
+
+    position = start
+    remaining = count
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        if stream is not None:
+            passwords = stream.generate(position, size, accept)
+        elif engine is not None and alphabet is None:
+            passwords = engine(settings, size)
+            if accept is not None:
+                passwords = [password if accept(password) else generate() for password in passwords]
+        else:
+            passwords = (generate() for _ in range(size))
+        yield [build_password_record(password, alphabet) for password in passwords]
+        position += size
+        remaining -= size
+
+
+def batch_records(
+    records: Iterable[PasswordRecord],
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+) -> Iterator[list[PasswordRecord]]:
+    """
+    Groups a flat iterable of records into lists of at most `batch_size`.
+
+    Args:
+        records (Iterable[PasswordRecord]): The records to group.
+        batch_size (int, optional): Maximum number of records per batch.
+
+    Yields:
+        list[PasswordRecord]: The next batch of records.
+    """
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def encode_text_batch(records: Sequence[PasswordRecord]) -> bytes:
+    """Encode a batch as newline-terminated plain text passwords."""
+    return ''.join(f"{record['password']}\n" for record in records).encode('utf-8')
+
+
+def encode_ndjson_batch(records: Sequence[PasswordRecord]) -> bytes:
+    """Encode a batch as newline-delimited JSON objects."""
+    return ''.join(
+        json.dumps(record, ensure_ascii=False) + '\n' for record in records
+    ).encode('utf-8')
+
+
+def encode_csv_batch(records: Sequence[PasswordRecord]) -> bytes:
+    """Encode a batch as CSV rows (without the header line)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerows(
+        (record['password'], f"{record['entropy']:.4f}", record['label'], record['class_mask'])
+        for record in records
+    )
+    return buffer.getvalue().encode('utf-8')
+
+
+def encode_binary_batch(records: Sequence[PasswordRecord]) -> bytes:
+    """Encode a batch in the length-prefixed binary record format."""
+    chunks = []
+    for record in records:
+        password_bytes = record['password'].encode('utf-8')
+        chunks.append(BINARY_RECORD_HEADER.pack(
+            len(password_bytes),
+            record['entropy'],
+            get_strength_level_index(record['entropy']),
+            record['class_mask'],
+        ))
+        chunks.append(password_bytes)
+    return b''.join(chunks)
+
+
+# Export format name -> (file header, batch encoder)
+EXPORT_FORMATS: dict[str, tuple[bytes, Callable[[Sequence[PasswordRecord]], bytes]]] = {
+    'text': (b'', encode_text_batch),
+    'ndjson': (b'', encode_ndjson_batch),
+    'csv': ((','.join(CSV_FIELDS) + '\n').encode('utf-8'), encode_csv_batch),
+    'binary': (BINARY_MAGIC + bytes([BINARY_VERSION]), encode_binary_batch),
+}
+
+
+def guess_export_format(path: str) -> str:
+    """
+    Picks the export format matching a file's extension.
+
+    Args:
+        path (str): The output file path.
+
+    Returns:
+        str: A key of `EXPORT_FORMATS`, 'text' if the extension is unknown.
+    """
+    for extension, export_format in EXPORT_EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return export_format
+    return 'text'
+
+
+def export_record_batches(
+    batches: Iterable[Sequence[PasswordRecord]],
+    path: str,
+    export_format: str,
+) -> int:
+    """
+    Streams batches of records to a file, one buffered write per batch.
+
+    Args:
+        batches (Iterable[Sequence[PasswordRecord]]): The record batches to write.
+        path (str): The output file path.
+        export_format (str): A key of `EXPORT_FORMATS`.
+
+    Raises:
+        ValueError: If the export format is not supported.
+
+    Returns:
+        int: The number of records written.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    header, encode_batch = EXPORT_FORMATS[export_format]
+
+    written = 0
+    with open(path, 'wb', buffering=EXPORT_BUFFER_SIZE) as file:
+        file.write(header)
+        for batch in batches:
+            file.write(encode_batch(batch))
+            written += len(batch)
+    return written
+
+
+def export_passwords(passwords: Iterable[str], path: str, export_format: str | None = None) -> int:
+    """
+    Exports existing passwords, computing their strength fields on the way.
+
+    Args:
+        passwords (Iterable[str]): The passwords to export.
+        path (str): The output file path.
+        export_format (str | None, optional): A key of `EXPORT_FORMATS`.
+            Guessed from the file extension when omitted.
+
+    Returns:
+        int: The number of records written.
+    """
+    export_format = export_format or guess_export_format(path)
+    records = (build_password_record(password) for password in passwords)
+    return export_record_batches(batch_records(records), path, export_format)
+
+
+def export_generated_passwords(
+    settings: PasswordSettings,
+    count: int,
+    path: str,
+    export_format: str | None = None,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    seed: int | None = None,
+    sampling: str = DEFAULT_SAMPLING_MODE,
+    alphabet: Alphabet | None = None,
+) -> int:
+    """
+    Generates `count` passwords and streams them straight to an export file.
+
+    Args:
+        settings (PasswordSettings): The settings used for every password.
+        count (int): Number of passwords to generate.
+        path (str): The output file path.
+        export_format (str | None, optional): A key of `EXPORT_FORMATS`.
+            Guessed from the file extension when omitted.
+        batch_size (int, optional): Number of records generated per write.
+        seed (int | None, optional): Seed for a reproducible password sequence.
+        sampling (str, optional): One of `SAMPLING_MODES`.
+        alphabet (Alphabet | None, optional): Custom alphabet to draw from.
+
+    Returns:
+        int: The number of records written.
+    """
+    export_format = export_format or guess_export_format(path)
+    batches = generate_password_record_batches(
+        settings, count, batch_size, seed, sampling=sampling, alphabet=alphabet
+    )
+    return export_record_batches(batches, path, export_format)
+
+
+def read_binary_records(path: str) -> Iterator[PasswordRecord]:
+    """
+    Reads back a file written in the length-prefixed binary format.
+
+    Args:
+        path (str): The binary export file.
+
+    Raises:
+        ValueError: If the file does not start with the expected header.
+
+    Yields:
+        PasswordRecord: The stored records, in file order.
+    """
+    with open(path, 'rb', buffering=EXPORT_BUFFER_SIZE) as file:
+        data = file.read()
+
+    header = BINARY_MAGIC + bytes([BINARY_VERSION])
+    if not data.startswith(header):
+        raise ValueError(f"Not a binary password export: {path}")
+
+    offset = len(header)
+    while offset < len(data):
+        length, entropy, level_index, class_mask = BINARY_RECORD_HEADER.unpack_from(data, offset)
+        offset += BINARY_RECORD_HEADER.size
+        password = data[offset:offset + length].decode('utf-8')
+        offset += length
+        yield {
+            'password': password,
+            'entropy': entropy,
+            'label': STRENGTH_LEVELS[level_index]['label'],
+            'class_mask': class_mask,
+        }
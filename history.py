@@ -0,0 +1,230 @@
+import time
+import sqlite3
+import argparse
+from typing import Iterable, Iterator, Sequence
+from utils import *
+from exporters import PasswordRecord, generate_password_record_batches
+
+
+# ----------------------------- Constants ----------------------------- #
+HISTORY_PAGE_SIZE = 100
+
+HISTORY_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS password_history (
+    id          INTEGER PRIMARY KEY,
+    created_at  REAL    NOT NULL,
+    profile     TEXT    NOT NULL,
+    password    TEXT    NOT NULL,
+    entropy     REAL    NOT NULL,
+    label       TEXT    NOT NULL,
+    class_mask  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_created_at ON password_history (created_at);
+CREATE INDEX IF NOT EXISTS idx_history_profile ON password_history (profile, created_at);
+'''
+
+
+def settings_profile(settings: PasswordSettings) -> str:
+    """
+    Builds a stable, human-readable key describing a settings combination.
+
+    Args:
+        settings (PasswordSettings): The password settings.
+
+    Returns:
+        str: A key such as 'length=16;uppercase,lowercase,digit'.
+    """
+    enabled = ','.join(option for option in PASSWORD_OPTIONS if settings.get(option))
+    return f"length={settings['password_length']};{enabled}"
+
+
+class PasswordHistory:
+    """
+    Append-only persistent history of generated passwords backed by SQLite.
+
+    The database runs in WAL mode and every `add_many()` call is a single
+    transaction, so bulk runs pay one commit per batch instead of one per
+    password. Records keep their precomputed strength fields so reading the
+    history never re-analyzes passwords.
+
+    Args:
+        path (str): The SQLite database file (created if missing).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(HISTORY_SCHEMA)
+
+    def __enter__(self) -> 'PasswordHistory':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.connection.close()
+
+    def add(self, record: PasswordRecord, profile: str) -> None:
+        """
+        Append one record to the history.
+
+        Args:
+            record (PasswordRecord): The password and its strength fields.
+            profile (str): The settings profile, see `settings_profile()`.
+        """
+        self.add_many([record], profile)
+
+    def add_many(self, records: Sequence[PasswordRecord], profile: str) -> int:
+        """
+        Append a batch of records in a single transaction.
+
+        Args:
+            records (Sequence[PasswordRecord]): The records to store.
+            profile (str): The settings profile shared by the batch.
+
+        Returns:
+            int: The number of records stored.
+        """
+        created_at = time.time()
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO password_history '
+                '(created_at, profile, password, entropy, label, class_mask) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (created_at, profile, record['password'], record['entropy'],
+                     record['label'], record['class_mask'])
+                    for record in records
+                ],
+            )
+        return len(records)
+
+    def record_batches(
+        self,
+        batches: Iterable[Sequence[PasswordRecord]],
+        profile: str,
+    ) -> Iterator[Sequence[PasswordRecord]]:
+        """
+        Store every batch passing through, then yield it unchanged.
+
+        This lets bulk generation feed both an export writer and the history.
+
+        Args:
+            batches (Iterable[Sequence[PasswordRecord]]): The record batches.
+            profile (str): The settings profile shared by the batches.
+
+        Yields:
+            Sequence[PasswordRecord]: The same batches, after they were stored.
+        """
+        for batch in batches:
+            self.add_many(batch, profile)
+            yield batch
+
+    def count(self, profile: str | None = None) -> int:
+        """
+        Count stored records, optionally for one settings profile only.
+
+        Args:
+            profile (str | None, optional): Restrict the count to this profile.
+
+        Returns:
+            int: The number of records.
+        """
+        if profile is None:
+            row = self.connection.execute('SELECT COUNT(*) FROM password_history').fetchone()
+        else:
+            row = self.connection.execute(
+                'SELECT COUNT(*) FROM password_history WHERE profile = ?', (profile,)
+            ).fetchone()
+        return row[0]
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: int = HISTORY_PAGE_SIZE,
+        profile: str | None = None,
+    ) -> list[PasswordRecord]:
+        """
+        Fetch one page of the history, newest first.
+
+        Args:
+            offset (int, optional): Number of newest records to skip.
+            limit (int, optional): Maximum number of records to return.
+            profile (str | None, optional): Restrict the page to this profile.
+
+        Returns:
+            list[PasswordRecord]: The records of the page.
+        """
+        query = 'SELECT password, entropy, label, class_mask FROM password_history'
+        parameters: tuple = ()
+        if profile is not None:
+            query += ' WHERE profile = ?'
+            parameters = (profile,)
+        query += ' ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?'
+
+        rows = self.connection.execute(query, parameters + (limit, offset))
+        return [
+            {'password': password, 'entropy': entropy, 'label': label, 'class_mask': class_mask}
+            for password, entropy, label, class_mask in rows
+        ]
+
+    def iter_passwords(self, profile: str | None = None) -> Iterator[str]:
+        """
+        Stream every stored password, oldest first, without paging.
+
+        Args:
+            profile (str | None, optional): Restrict the passwords to this profile.
+
+        Yields:
+            str: The next password.
+        """
+        query = 'SELECT password FROM password_history'
+        parameters: tuple = ()
+        if profile is not None:
+            query += ' WHERE profile = ?'
+            parameters = (profile,)
+        for password, in self.connection.execute(query + ' ORDER BY id', parameters):
+            yield password
+
+
+def benchmark_bulk_inserts(path: str, count: int, password_length: int) -> float:
+    """
+    Measure bulk insert throughput into a history database.
+
+    Records are generated up front so only the inserts are timed.
+
+    Args:
+        path (str): The SQLite database file.
+        count (int): Number of records to insert.
+        password_length (int): Length of the generated passwords.
+
+    Returns:
+        float: Inserts per second.
+    """
+    settings: PasswordSettings = {'password_length': password_length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    batches = list(generate_password_record_batches(settings, count))
+    profile = settings_profile(settings)
+
+    with PasswordHistory(path) as history:
+        start = time.perf_counter()
+        for batch in batches:
+            history.add_many(batch, profile)
+        elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Benchmark bulk history inserts')
+    parser.add_argument('path', help='SQLite database file')
+    parser.add_argument('--count', type=int, default=100_000)
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    arguments = parser.parse_args()
+
+    rate = benchmark_bulk_inserts(arguments.path, arguments.count, arguments.length)
+    print(f'{arguments.count} inserts: {rate:,.0f} inserts/sec')
@@ -0,0 +1,475 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, TypedDict
+from utils import *
+from engines import get_engine, select_engine
+from exporters import EXPORT_FORMATS, generate_password_record_batches, guess_export_format
+
+
+# ----------------------------- Constants ----------------------------- #
+CHECKPOINT_VERSION = 1
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Seconds between two progress reports
+PROGRESS_INTERVAL = 1.0
+
+# Chunks in flight per worker: one running, one queued
+CHUNKS_PER_WORKER = 2
+
+# Job spec layout:
+#   {
+#     "chunk_size": 50000,                        (optional)
+#     "profiles": [
+#       {"name": "service-tokens", "count": 2000000, "length": 64,
+#        "classes": ["uppercase", "lowercase", "digit"], "sink": "tokens.txt"},
+#       {"name": "users", "count": 500000, "length": 16,
+#        "classes": ["uppercase", "lowercase", "digit", "symbol"], "sink": "users.csv",
+#        "format": "csv", "sampling": "uniform", "seed": 7, "engine": "table"},
+#       {"name": "pins", "count": 1000, "length": 12, "classes": ["uppercase", "digit"],
+#        "sink": "pins.txt", "sampling": "weighted", "class_weights": {"digit": 3}}
+#     ]
+#   }
+# Sinks are relative to the spec file. "format" is guessed from the sink
+# extension when omitted; "sampling", "class_weights" (weighted sampling
+# only), "seed" and "engine" are optional. "engine" ("auto" for the engine
+# calibrated fastest on this host) applies to unseeded "class_first" profiles.
+
+
+class JobProfile(TypedDict):
+    """
+    Represents one profile of a job spec, validated.
+
+    Attributes:
+        name (str): Unique profile name.
+        count (int): Number of passwords.
+        settings (PasswordSettings): The settings used for every password.
+        sink (str): Absolute path of the output file.
+        format (str): A key of `EXPORT_FORMATS`.
+        sampling (str): One of `SAMPLING_MODES`.
+        class_weights (dict[str, float] | None): Per-class weights of the 'weighted' mode.
+        seed (int | None): Seed of a reproducible stream, None for fresh randomness.
+        engine (str | None): A key of `GENERATION_ENGINES` or 'auto', None for the
+            reference generator.
+    """
+
+    name: str
+    count: int
+    settings: PasswordSettings
+    sink: str
+    format: str
+    sampling: str
+    class_weights: dict[str, float] | None
+    seed: int | None
+    engine: str | None
+
+
+class JobProgress(TypedDict):
+    """
+    Represents the progress of a job, as passed to the progress callback.
+
+    Attributes:
+        records (int): Passwords written so far, including earlier runs.
+        total (int): Passwords of the whole job.
+        chunks (int): Chunks completed so far.
+        chunk_total (int): Chunks of the whole job.
+        rate (float): Passwords per second in this run.
+        eta (float | None): Seconds left at that rate, None before the first chunk.
+        profile (str): Profile of the last completed chunk.
+    """
+
+    records: int
+    total: int
+    chunks: int
+    chunk_total: int
+    rate: float
+    eta: float | None
+    profile: str
+
+
+def load_job_spec(path: str) -> tuple[list[JobProfile], int]:
+    """
+    Reads and validates a job spec.
+
+    Args:
+        path (str): The JSON job spec.
+
+    Raises:
+        ValueError: If the spec is malformed, a profile is invalid, or two
+            profiles share a name or a sink.
+
+    Returns:
+        tuple[list[JobProfile], int]: The profiles and the chunk size.
+    """
+    with open(path, encoding='utf-8') as file:
+        spec = json.load(file)
+    base = os.path.dirname(os.path.abspath(path))
+    chunk_size = spec.get('chunk_size', DEFAULT_CHUNK_SIZE)
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive integer, got {chunk_size!r}")
+    if not spec.get('profiles'):
+        raise ValueError(f"Job spec defines no profiles: {path}")
+
+    profiles: list[JobProfile] = []
+    for entry in spec['profiles']:
+        name = entry.get('name')
+        if not name or not isinstance(name, str):
+            raise ValueError(f"Every profile needs a name: {entry!r}")
+        count, length = entry.get('count'), entry.get('length', DEFAULT_PASSWORD_LENGTH)
+        if not isinstance(count, int) or count < 1:
+            raise ValueError(f"{name}: count must be a positive integer")
+        # Service tokens run past the interactive cap, so only the lower bound applies
+        if not isinstance(length, int) or length < MIN_PASSWORD_LENGTH:
+            raise ValueError(f"{name}: length must be an integer of at least {MIN_PASSWORD_LENGTH}")
+        classes = entry.get('classes') or []
+        unknown = set(classes) - set(PASSWORD_OPTIONS)
+        if not classes or unknown:
+            raise ValueError(f"{name}: classes must be a non-empty subset of {', '.join(PASSWORD_OPTIONS)}")
+        if 'sink' not in entry:
+            raise ValueError(f"{name}: no sink")
+        sink = os.path.join(base, entry['sink'])
+        export_format = entry.get('format') or guess_export_format(sink)
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"{name}: unsupported export format: {export_format}")
+        sampling = entry.get('sampling', DEFAULT_SAMPLING_MODE)
+        if sampling not in SAMPLING_MODES:
+            raise ValueError(f"{name}: unsupported sampling mode: {sampling}")
+        class_weights = entry.get('class_weights')
+        if class_weights is not None:
+            if sampling != 'weighted':
+                raise ValueError(f"{name}: class_weights requires the 'weighted' sampling mode")
+            if (not isinstance(class_weights, dict) or set(class_weights) - set(PASSWORD_OPTIONS)
+                    or not all(isinstance(weight, (int, float)) and 0 < weight < math.inf
+                               for weight in class_weights.values())):
+                raise ValueError(f"{name}: class_weights must map classes to positive numbers")
+        engine = entry.get('engine')
+        if engine is not None:
+            if engine != 'auto':
+                get_engine(engine)
+            if entry.get('seed') is not None or sampling != DEFAULT_SAMPLING_MODE:
+                raise ValueError(f"{name}: engine applies to unseeded '{DEFAULT_SAMPLING_MODE}' profiles only")
+        profiles.append({
+            'name': name,
+            'count': count,
+            'settings': {'password_length': length, **{option: option in classes for option in PASSWORD_OPTIONS}},
+            'sink': sink,
+            'format': export_format,
+            'sampling': sampling,
+            'class_weights': class_weights,
+            'seed': entry.get('seed'),
+            'engine': engine,
+        })
+
+    for key in ('name', 'sink'):
+        values = [profile[key] for profile in profiles]
+        if len(set(values)) != len(values):
+            raise ValueError(f"Two profiles share a {key}")
+    return profiles, chunk_size
+
+
+def _fsync_directory(path: str) -> None:
+    """Make a rename inside `path` durable (no-op where directories cannot be opened)."""
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _run_chunk(profile: JobProfile, chunk: int, chunk_size: int, part_path: str) -> tuple[int, int, str]:
+    """
+    Process pool entry point: generate one chunk and write it to its part file.
+
+    The part is written under a temporary name, flushed to disk and renamed,
+    so a part file either holds the whole chunk or does not exist.
+
+    Returns:
+        tuple[int, int, str]: The records, bytes and SHA-256 of the part.
+    """
+    start = chunk * chunk_size
+    count = min(chunk_size, profile['count'] - start)
+    engine = get_engine(profile['engine']) if profile['engine'] else None
+    encode_batch = EXPORT_FORMATS[profile['format']][1]
+    digest = hashlib.sha256()
+    size = 0
+    with open(f'{part_path}.tmp', 'wb') as file:
+        for batch in generate_password_record_batches(profile['settings'], count, seed=profile['seed'], start=start,
+                                                      sampling=profile['sampling'], engine=engine,
+                                                      class_weights=profile['class_weights']):
+            data = encode_batch(batch)
+            digest.update(data)
+            size += len(data)
+            file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(f'{part_path}.tmp', part_path)
+    _fsync_directory(os.path.dirname(part_path))
+    return count, size, digest.hexdigest()
+
+
+class BatchJob:
+    """
+    Runs a multi-profile job spec in chunks, resumable after a crash.
+
+    Every profile is split into chunks of `chunk_size` passwords; chunk i
+    always covers passwords [i * chunk_size, (i + 1) * chunk_size), so a
+    seeded profile produces the same output however often it is resumed.
+    Workers write each chunk to its own part file next to the sink, and the
+    scheduler appends the completed chunk to an NDJSON checkpoint, flushed
+    to disk, before counting it done. Once every chunk of a profile is
+    checkpointed, the parts are concatenated in order behind the format
+    header into the sink (written under a temporary name and renamed) and
+    the profile is checkpointed as finished.
+
+    On restart, checkpointed chunks whose part file is intact are skipped
+    and everything else is regenerated from its start position: a part is
+    only ever part of the sink once, and an interrupted chunk never is.
+
+    Args:
+        spec_path (str): The JSON job spec, see the layout above.
+        checkpoint_path (str | None, optional): The checkpoint; `<spec>.checkpoint`
+            when omitted.
+        workers (int | None, optional): Worker processes; one per core by default.
+
+    Raises:
+        ValueError: If the spec is invalid, or the checkpoint belongs to a different spec.
+    """
+
+    def __init__(self, spec_path: str, checkpoint_path: str | None = None, workers: int | None = None) -> None:
+        self.profiles, self.chunk_size = load_job_spec(spec_path)
+        self.checkpoint_path = checkpoint_path or f'{spec_path}.checkpoint'
+        self.workers = workers or os.cpu_count() or 1
+        spec = json.dumps([self.profiles, self.chunk_size], sort_keys=True)
+        self.spec_hash = hashlib.sha256(spec.encode('utf-8')).hexdigest()
+        # Resolved after hashing, so a resume elsewhere still matches the checkpoint
+        for profile in self.profiles:
+            if profile['engine'] == 'auto':
+                profile['engine'] = select_engine(self.chunk_size)
+        self.chunks: dict[str, dict[int, dict]] = {profile['name']: {} for profile in self.profiles}
+        self.finished: set[str] = set()
+        self._load_checkpoint()
+        self.checkpoint = open(self.checkpoint_path, 'a', encoding='utf-8')
+        if not self.checkpoint.tell():
+            self._append({'version': CHECKPOINT_VERSION, 'spec': self.spec_hash})
+
+    def _load_checkpoint(self) -> None:
+        """Read the completed chunks and profiles back, ignoring a torn last line."""
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return
+        if lines and not lines[-1].endswith('\n'):
+            lines.pop()
+            with open(self.checkpoint_path, 'w', encoding='utf-8') as file:
+                file.writelines(lines)
+        for line in lines:
+            entry = json.loads(line)
+            if 'spec' in entry:
+                if entry['spec'] != self.spec_hash:
+                    raise ValueError(f"Checkpoint {self.checkpoint_path} belongs to a different job spec")
+            elif entry.get('finished'):
+                self.finished.add(entry['profile'])
+            elif entry.get('profile') in self.chunks:
+                self.chunks[entry['profile']][entry['chunk']] = entry
+
+    def _append(self, entry: dict) -> None:
+        """Append one checkpoint entry and flush it to disk."""
+        self.checkpoint.write(json.dumps(entry) + '\n')
+        self.checkpoint.flush()
+        os.fsync(self.checkpoint.fileno())
+
+    def __enter__(self) -> 'BatchJob':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def chunk_count(self, profile: JobProfile) -> int:
+        """Returns the number of chunks of a profile."""
+        return -(-profile['count'] // self.chunk_size)
+
+    def part_path(self, profile: JobProfile, chunk: int) -> str:
+        """Returns the part file of one chunk, in a directory next to the sink."""
+        return os.path.join(f"{profile['sink']}.parts", f'chunk-{chunk:06d}.part')
+
+    def _is_done(self, profile: JobProfile, chunk: int) -> bool:
+        """A chunk is done if it is checkpointed and its part file is intact."""
+        entry = self.chunks[profile['name']].get(chunk)
+        if entry is None:
+            return False
+        try:
+            return os.path.getsize(self.part_path(profile, chunk)) == entry['bytes']
+        except OSError:
+            return False
+
+    def pending_chunks(self) -> list[tuple[JobProfile, int]]:
+        """Returns the chunks still to generate, profile by profile."""
+        pending = []
+        for profile in self.profiles:
+            if profile['name'] in self.finished and os.path.exists(profile['sink']):
+                continue
+            self.finished.discard(profile['name'])
+            pending.extend((profile, chunk) for chunk in range(self.chunk_count(profile))
+                           if not self._is_done(profile, chunk))
+        return pending
+
+    def progress(self) -> tuple[int, int]:
+        """Returns the passwords completed and the total, over every profile."""
+        done = 0
+        for profile in self.profiles:
+            if profile['name'] in self.finished:
+                done += profile['count']
+            else:
+                done += sum(entry['records'] for chunk, entry in self.chunks[profile['name']].items()
+                            if self._is_done(profile, chunk))
+        return done, sum(profile['count'] for profile in self.profiles)
+
+    def _assemble(self, profile: JobProfile) -> None:
+        """Concatenate the parts of a completed profile into its sink, then drop them."""
+        header = EXPORT_FORMATS[profile['format']][0]
+        sink = profile['sink']
+        with open(f'{sink}.tmp', 'wb') as file:
+            file.write(header)
+            for chunk in range(self.chunk_count(profile)):
+                with open(self.part_path(profile, chunk), 'rb') as part:
+                    shutil.copyfileobj(part, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(f'{sink}.tmp', sink)
+        _fsync_directory(os.path.dirname(sink))
+        self._append({'profile': profile['name'], 'finished': True, 'records': profile['count']})
+        self.finished.add(profile['name'])
+        shutil.rmtree(f'{sink}.parts', ignore_errors=True)
+
+    def run(self, on_progress: Callable[[JobProgress], None] | None = None) -> JobProgress:
+        """
+        Generate every pending chunk and assemble every completed profile.
+
+        At most `CHUNKS_PER_WORKER` chunks per worker are queued at a time.
+        If the run is interrupted, the chunks completed so far stay
+        checkpointed and the next `run()` resumes after them.
+
+        Args:
+            on_progress (Callable[[JobProgress], None] | None, optional): Called
+                at most every `PROGRESS_INTERVAL` seconds and once at the end.
+
+        Returns:
+            JobProgress: The final progress.
+        """
+        pending = self.pending_chunks()
+        remaining = {profile['name']: 0 for profile in self.profiles}
+        for profile, _ in pending:
+            remaining[profile['name']] += 1
+        for profile in self.profiles:
+            if profile['name'] not in self.finished:
+                os.makedirs(f"{profile['sink']}.parts", exist_ok=True)
+
+        chunk_total = sum(self.chunk_count(profile) for profile in self.profiles)
+        chunks_done = chunk_total - len(pending)
+        records, total = self.progress()
+        start_records = records
+        start = time.perf_counter()
+        last_report = 0.0
+        status: JobProgress = {'records': records, 'total': total, 'chunks': chunks_done,
+                               'chunk_total': chunk_total, 'rate': 0.0, 'eta': None, 'profile': ''}
+
+        def update(profile: JobProfile, force: bool = False) -> None:
+            nonlocal last_report
+            elapsed = time.perf_counter() - start
+            rate = (status['records'] - start_records) / elapsed if elapsed else 0.0
+            left = total - status['records']
+            status.update(rate=rate, eta=left / rate if rate else (None if left else 0.0), profile=profile['name'])
+            if on_progress is not None and (force or elapsed - last_report >= PROGRESS_INTERVAL):
+                last_report = elapsed
+                on_progress(status)
+
+        for profile in self.profiles:
+            if not remaining[profile['name']] and profile['name'] not in self.finished:
+                self._assemble(profile)
+
+        in_flight: dict[Future, tuple[JobProfile, int]] = {}
+        queue = iter(pending)
+        with ProcessPoolExecutor(self.workers) as pool:
+            try:
+                while True:
+                    while len(in_flight) < CHUNKS_PER_WORKER * self.workers:
+                        task = next(queue, None)
+                        if task is None:
+                            break
+                        profile, chunk = task
+                        future = pool.submit(_run_chunk, profile, chunk, self.chunk_size,
+                                             self.part_path(profile, chunk))
+                        in_flight[future] = task
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        profile, chunk = in_flight.pop(future)
+                        count, size, digest = future.result()
+                        entry = {'profile': profile['name'], 'chunk': chunk, 'records': count,
+                                 'bytes': size, 'sha256': digest}
+                        self._append(entry)
+                        self.chunks[profile['name']][chunk] = entry
+                        status['records'] += count
+                        status['chunks'] += 1
+                        remaining[profile['name']] -= 1
+                        if not remaining[profile['name']]:
+                            self._assemble(profile)
+                        update(profile)
+            except BaseException:
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        if self.profiles:
+            update(self.profiles[-1], force=True)
+        return status
+
+    def close(self) -> None:
+        """Close the checkpoint."""
+        self.checkpoint.close()
+
+
+def format_duration(seconds: float) -> str:
+    """Formats seconds as H:MM:SS."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes:02d}:{seconds:02d}'
+
+
+def format_job_progress(progress: JobProgress) -> str:
+    """
+    Formats progress on one line, e.g. '1,250,000/2,500,000 (50.0%), 24/50 chunks, 310,000/sec, ETA 0:00:04'.
+    """
+    share = progress['records'] / progress['total'] if progress['total'] else 1.0
+    eta = format_duration(progress['eta']) if progress['eta'] is not None else '--:--:--'
+    return (f"{progress['records']:,}/{progress['total']:,} ({share:.1%}), "
+            f"{progress['chunks']}/{progress['chunk_total']} chunks, {progress['rate']:,.0f}/sec, ETA {eta}")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Run a resumable multi-profile password job')
+    parser.add_argument('spec', help='JSON job spec')
+    parser.add_argument('--checkpoint', metavar='PATH', help='checkpoint file (default: SPEC.checkpoint)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per core)')
+    arguments = parser.parse_args()
+
+    with BatchJob(arguments.spec, arguments.checkpoint, arguments.workers) as job:
+        done, total = job.progress()
+        if done:
+            print(f'Resuming: {done:,}/{total:,} passwords already done')
+        start = time.perf_counter()
+        job.run(lambda progress: print(format_job_progress(progress), flush=True))
+        print(f'Finished in {format_duration(time.perf_counter() - start)}')
+        for profile in job.profiles:
+            print(f"{profile['name']:<20}: {profile['count']:>12,} -> {profile['sink']}")
@@ -0,0 +1,185 @@
+import math
+import random
+import string
+import argparse
+import functools
+from typing import Callable, Iterator
+from utils import *
+from exporters import DEFAULT_EXPORT_BATCH_SIZE, PasswordRecord
+from password_policy import generate_filtered_password
+
+
+# ----------------------------- Constants ----------------------------- #
+
+# Mask placeholders and the characters each position draws from.
+# Any other character is a literal; `\` escapes a placeholder and `{n}`
+# repeats the previous token n times, e.g. 'Aa{3}-9{4}-*{4}'.
+MASK_PLACEHOLDERS = {
+    'A': string.ascii_uppercase,
+    'a': string.ascii_lowercase,
+    '9': DIGITS,
+    'S': SYMBOLS,
+    'B': BRACKETS,
+    'X': string.ascii_uppercase + DIGITS,
+    'x': string.ascii_lowercase + DIGITS,
+    '?': string.ascii_letters + DIGITS,
+    '*': ''.join(CHARACTER_CLASSES.values()),
+}
+MASK_ESCAPE = '\\'
+MASK_CACHE_SIZE = 256
+
+
+class MaskPlan:
+    """
+    Compiled fill plan of a mask: one character pool per position.
+
+    Literal positions have a one-character pool and cost no random draw.
+    Entropy is exact: the sum of log2(pool size) over all positions, since
+    every position is drawn uniformly and independently.
+
+    Args:
+        mask (str): The source mask.
+        positions (tuple[str, ...]): The character pool of every position.
+    """
+
+    def __init__(self, mask: str, positions: tuple[str, ...]) -> None:
+        self.mask = mask
+        self.positions = positions
+        self.length = len(positions)
+        self.entropy = sum(math.log2(len(pool)) for pool in positions)
+
+    def fill(self, count: int, rng: random.Random | None = None) -> list[str]:
+        """
+        Fill `count` passwords at once, drawing each position's column in bulk.
+
+        Args:
+            count (int): Number of passwords.
+            rng (random.Random | None, optional): The random generator to draw from.
+
+        Returns:
+            list[str]: The generated passwords.
+        """
+        rng = rng or get_thread_rng()
+        columns = [
+            pool * count if len(pool) == 1 else rng.choices(pool, k=count)
+            for pool in self.positions
+        ]
+        return [''.join(chars) for chars in zip(*columns)]
+
+    def generate(self, rng: random.Random | None = None) -> str:
+        """Generate a single password from the plan."""
+        return self.fill(1, rng)[0]
+
+
+def parse_mask(mask: str) -> tuple[str, ...]:
+    """
+    Translates a mask into the character pool of every position.
+
+    Args:
+        mask (str): The mask, e.g. 'Aaaa-9999-****' or 'X{4}-X{4}-X{4}'.
+
+    Raises:
+        ValueError: If the mask is empty, or a repeat count or an escape is malformed.
+
+    Returns:
+        tuple[str, ...]: One pool per output character.
+    """
+    if not mask:
+        raise ValueError('Mask is empty')
+    positions: list[str] = []
+    index = 0
+    while index < len(mask):
+        char = mask[index]
+        if char == MASK_ESCAPE:
+            if index + 1 >= len(mask):
+                raise ValueError('Mask ends with a dangling escape')
+            positions.append(mask[index + 1])
+            index += 2
+        elif char == '{':
+            end = mask.find('}', index)
+            repeat = mask[index + 1:end] if end != -1 else ''
+            if not positions or not repeat.isdigit() or int(repeat) < 1:
+                raise ValueError(f'Invalid repeat count at position {index} of mask {mask!r}')
+            positions.extend([positions[-1]] * (int(repeat) - 1))
+            index = end + 1
+        else:
+            positions.append(MASK_PLACEHOLDERS.get(char, char))
+            index += 1
+    return tuple(positions)
+
+
+@functools.lru_cache(maxsize=MASK_CACHE_SIZE)
+def compile_mask(mask: str) -> MaskPlan:
+    """
+    Compiles a mask into a cached `MaskPlan`.
+
+    Args:
+        mask (str): The mask to compile.
+
+    Returns:
+        MaskPlan: The fill plan, shared by every caller using the same mask.
+    """
+    return MaskPlan(mask, parse_mask(mask))
+
+
+def generate_mask_record_batches(
+    mask: str,
+    count: int,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    rng: random.Random | None = None,
+    accept: Callable[[str], bool] | None = None,
+) -> Iterator[list[PasswordRecord]]:
+    """
+    Fills passwords from a mask and yields export records in batches.
+
+    Entropy and label come from the mask itself, not from analyzing the
+    generated passwords.
+
+    Args:
+        mask (str): The mask.
+        count (int): Total number of passwords.
+        batch_size (int, optional): Number of records per batch.
+        rng (random.Random | None, optional): The random generator to draw from.
+        accept (Callable[[str], bool] | None, optional): Filter stage, e.g.
+            `BannedTermPolicy.is_allowed`; rejected passwords are redrawn from the mask.
+
+    Yields:
+        list[PasswordRecord]: The next batch of records.
+    """
+    plan = compile_mask(mask)
+    label = evaluate_password_strength(plan.entropy)['label']
+
+    def redraw() -> str:
+        return plan.generate(rng)
+
+    remaining = count
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        passwords = plan.fill(size, rng)
+        if accept is not None:
+            passwords = [password if accept(password) else generate_filtered_password(redraw, accept)
+                         for password in passwords]
+        yield [
+            {
+                'password': password,
+                'entropy': plan.entropy,
+                'label': label,
+                'class_mask': calculate_password_class_mask(password),
+            }
+            for password in passwords
+        ]
+        remaining -= size
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Generate passwords from a mask')
+    parser.add_argument('mask', help="e.g. 'Aaaa-9999-****' or 'X{4}-X{4}-X{4}'")
+    parser.add_argument('--count', type=int, default=5)
+    arguments = parser.parse_args()
+
+    plan = compile_mask(arguments.mask)
+    strength = evaluate_password_strength(plan.entropy)
+    print(f"Mask {arguments.mask!r}: {plan.length} characters, {plan.entropy:.2f} bits ({strength['label']})")
+    for password in plan.fill(arguments.count):
+        print(password)
@@ -0,0 +1,182 @@
+import json
+import time
+import logging
+import argparse
+import threading
+import tracemalloc
+from utils import *
+
+
+# ----------------------------- Constants ----------------------------- #
+DEFAULT_GROWTH_THRESHOLD = 16 << 20
+DEFAULT_CHECK_INTERVAL = 60.0
+DEFAULT_TOP_SITES = 10
+DEFAULT_TRACE_FRAMES = 1
+
+# Allocations of the instrumentation itself, left out of every snapshot
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryWatchdog:
+    """
+    Opt-in memory growth monitor built on `tracemalloc`.
+
+    Every `check()` takes a snapshot, diffs it against the baseline taken at
+    `start()` and against the previous check, and attributes the growth to
+    the top allocation sites. Whenever the growth since the last alert
+    passes `threshold` bytes, a warning is logged. Checks run from a
+    background thread (`start(interval)`), or from the caller, e.g. a Tk
+    `after()` callback.
+
+    Args:
+        threshold (int, optional): Growth in bytes that raises an alert.
+        top (int, optional): Allocation sites kept per check.
+        frames (int, optional): Traceback depth recorded per allocation.
+        report_path (str | None, optional): JSON report written by `stop()`.
+    """
+
+    def __init__(
+        self,
+        threshold: int = DEFAULT_GROWTH_THRESHOLD,
+        top: int = DEFAULT_TOP_SITES,
+        frames: int = DEFAULT_TRACE_FRAMES,
+        report_path: str | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.top = top
+        self.frames = frames
+        self.report_path = report_path
+        self.samples: list[dict] = []
+        self.alerts: list[dict] = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: threading.Thread | None = None
+        self.started_tracing = False
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def start(self, interval: float | None = None) -> 'MemoryWatchdog':
+        """
+        Start tracing and take the baseline snapshot.
+
+        Args:
+            interval (float | None, optional): Seconds between checks run by a
+                background thread; None leaves the checks to the caller.
+
+        Returns:
+            MemoryWatchdog: self, for chaining.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.started_tracing = True
+        self.start_time = time.monotonic()
+        self.baseline = self.previous = self._snapshot()
+        self.alerted_growth = 0
+        if interval is not None:
+            self.thread = threading.Thread(target=self._run, args=(interval,), name='memory-watchdog', daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self, interval: float) -> None:
+        while not self.stop_event.wait(interval):
+            self.check()
+
+    def check(self) -> dict:
+        """
+        Take a snapshot and record the growth since the baseline.
+
+        Returns:
+            dict: The sample: elapsed seconds, traced and peak bytes, growth
+                since the baseline and since the previous check, and the top
+                growing sites (file:line, bytes, blocks).
+        """
+        with self.lock:
+            snapshot = self._snapshot()
+            since_baseline = snapshot.compare_to(self.baseline, 'lineno')
+            since_previous = snapshot.compare_to(self.previous, 'lineno')
+            self.previous = snapshot
+            current, peak = tracemalloc.get_traced_memory()
+
+            growth = sum(stat.size_diff for stat in since_baseline)
+            sample = {
+                'elapsed': round(time.monotonic() - self.start_time, 3),
+                'current': current,
+                'peak': peak,
+                'growth': growth,
+                'interval_growth': sum(stat.size_diff for stat in since_previous),
+                'top': [
+                    {
+                        'site': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+                        'bytes': stat.size_diff,
+                        'blocks': stat.count_diff,
+                    }
+                    for stat in since_baseline[:self.top] if stat.size_diff > 0
+                ],
+            }
+            self.samples.append(sample)
+
+            if growth - self.alerted_growth >= self.threshold:
+                self.alerted_growth = growth
+                self.alerts.append({'elapsed': sample['elapsed'], 'growth': growth, 'top': sample['top'][:3]})
+                sites = ', '.join(f"{site['site']} (+{site['bytes'] / 1024:.0f} KiB)" for site in sample['top'][:3])
+                logger.warning('Memory grew by %.1f MiB since start; top sites: %s', growth / (1 << 20), sites)
+            return sample
+
+    def report(self) -> dict:
+        """Return the threshold, every sample and every alert."""
+        with self.lock:
+            return {'threshold': self.threshold, 'samples': list(self.samples), 'alerts': list(self.alerts)}
+
+    def write_report(self, path: str) -> None:
+        """Write `report()` as JSON."""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, indent=2)
+
+    def stop(self) -> dict:
+        """
+        Stop the background checks, take a final sample and write the report.
+
+        Returns:
+            dict: The final sample.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        sample = self.check()
+        if self.report_path is not None:
+            self.write_report(self.report_path)
+        if self.started_tracing:
+            tracemalloc.stop()
+        return sample
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Memory growth check of repeated password generation')
+    parser.add_argument('--count', type=int, default=200_000)
+    parser.add_argument('--checks', type=int, default=5)
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    parser.add_argument('--threshold', type=int, default=DEFAULT_GROWTH_THRESHOLD)
+    parser.add_argument('--report', help='JSON report path')
+    arguments = parser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s %(message)s')
+    settings: PasswordSettings = {'password_length': arguments.length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    watchdog = MemoryWatchdog(arguments.threshold, report_path=arguments.report).start()
+    per_check = arguments.count // arguments.checks
+    for _ in range(arguments.checks):
+        for _ in range(per_check):
+            calculate_password_strength(random_password_generator(settings))
+        sample = watchdog.check()
+        print(f"{sample['elapsed']:>8.2f} s  traced {sample['current'] / 1024:>9.1f} KiB  "
+              f"growth {sample['growth'] / 1024:>+9.1f} KiB")
+    watchdog.stop()
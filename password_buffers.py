@@ -0,0 +1,195 @@
+import math
+import array
+import ctypes
+import random
+import string
+from utils import *
+
+
+# ----------------------------- Constants ----------------------------- #
+
+# ASCII bytes of every character class, mirroring the `generate_*` helpers
+CLASS_BYTES = {
+    'uppercase': string.ascii_uppercase.encode('ascii'),
+    'lowercase': string.ascii_lowercase.encode('ascii'),
+    'space': b' ',
+    'minus': b'-',
+    'underline': b'_',
+    'digit': DIGITS.encode('ascii'),
+    'symbol': SYMBOLS.encode('ascii'),
+    'bracket': BRACKETS.encode('ascii'),
+}
+
+# Byte value -> class bit (see `PASSWORD_OPTIONS`), so buffers are analyzed without decoding
+CLASS_LOOKUP = bytearray(256)
+for _bit, _option in enumerate(PASSWORD_OPTIONS):
+    for _byte in CLASS_BYTES[_option]:
+        CLASS_LOOKUP[_byte] |= 1 << _bit
+
+# Class bit mask -> size of the combined character pool
+POOL_SIZE_BY_MASK = tuple(
+    sum(len(CLASS_BYTES[option]) for bit, option in enumerate(PASSWORD_OPTIONS) if mask >> bit & 1)
+    for mask in range(1 << len(PASSWORD_OPTIONS))
+)
+
+
+def wipe_buffer(buffer: bytearray | memoryview) -> None:
+    """
+    Overwrite a writable buffer with zero bytes in place.
+
+    Args:
+        buffer (bytearray | memoryview): The buffer to clear.
+    """
+    size = len(buffer)
+    if size:
+        ctypes.memset(ctypes.addressof((ctypes.c_char * size).from_buffer(buffer)), 0, size)
+
+
+def _enabled_class_bytes(settings: PasswordSettings) -> tuple[bytes, ...]:
+    """Return the byte alphabets of the enabled classes, raising IndexError if none is."""
+    enabled = tuple(CLASS_BYTES[option] for option in PASSWORD_OPTIONS if settings.get(option))
+    if not enabled:
+        raise IndexError('No character class enabled')
+    return enabled
+
+
+def generate_password_into(
+    settings: PasswordSettings,
+    buffer: bytearray | memoryview,
+    offset: int = 0,
+    rng: random.Random | None = None,
+) -> int:
+    """
+    Writes one password straight into a caller-supplied buffer.
+
+    Uses the same sampling as `random_password_generator()` (a class first,
+    then a character of it) but stores ASCII bytes instead of building `str`
+    objects, so nothing but the buffer ever holds the password.
+
+    Args:
+        settings (PasswordSettings): The settings used for the password.
+        buffer (bytearray | memoryview): Writable destination buffer.
+        offset (int, optional): Position of the first password byte in `buffer`.
+        rng (random.Random | None, optional): The random generator to draw from.
+
+    Raises:
+        IndexError: If no character class is enabled.
+
+    Returns:
+        int: The offset just after the written password.
+    """
+    choice = (rng or get_thread_rng()).choice
+    enabled = _enabled_class_bytes(settings)
+    end = offset + settings['password_length']
+    for position in range(offset, end):
+        buffer[position] = choice(choice(enabled))
+    return end
+
+
+class PackedPasswords:
+    """
+    Batch of passwords packed into one contiguous `bytearray`.
+
+    Password `i` occupies `buffer[offsets[i]:offsets[i + 1]]`. Items are
+    returned as `memoryview` slices, so reading them never copies, and the
+    whole batch can be zeroized with `wipe()` (also done when leaving a
+    `with` block).
+
+    Args:
+        buffer (bytearray): The packed password bytes.
+        offsets (array.array): `count + 1` start offsets into `buffer`.
+    """
+
+    def __init__(self, buffer: bytearray, offsets: array.array) -> None:
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> memoryview:
+        return memoryview(self.buffer)[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self):
+        view = memoryview(self.buffer)
+        for index in range(len(self)):
+            yield view[self.offsets[index]:self.offsets[index + 1]]
+
+    def __enter__(self) -> 'PackedPasswords':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.wipe()
+
+    def wipe(self) -> None:
+        """Zeroize every password of the batch."""
+        wipe_buffer(self.buffer)
+
+
+def generate_packed_passwords(
+    settings: PasswordSettings,
+    count: int,
+    rng: random.Random | None = None,
+    buffer: bytearray | None = None,
+) -> PackedPasswords:
+    """
+    Generates a batch of passwords into a single contiguous buffer.
+
+    Args:
+        settings (PasswordSettings): The settings used for every password.
+        count (int): Number of passwords.
+        rng (random.Random | None, optional): The random generator to draw from.
+        buffer (bytearray | None, optional): Preallocated buffer to reuse; it
+            must hold at least `count * password_length` bytes.
+
+    Raises:
+        ValueError: If the supplied buffer is too small.
+
+    Returns:
+        PackedPasswords: The batch and its offsets array.
+    """
+    password_length = settings['password_length']
+    size = count * password_length
+    if buffer is None:
+        buffer = bytearray(size)
+    elif len(buffer) < size:
+        raise ValueError(f'Buffer holds {len(buffer)} bytes, {size} are needed')
+
+    offsets = array.array('Q', (index * password_length for index in range(count + 1)))
+    view = memoryview(buffer)
+    for index in range(count):
+        generate_password_into(settings, view, offsets[index], rng)
+    return PackedPasswords(buffer, offsets)
+
+
+def analyze_password_buffer(password: bytes | bytearray | memoryview) -> int:
+    """
+    Computes the character class bit mask of an ASCII password buffer.
+
+    The buffer equivalent of `calculate_password_class_mask()`; it reads the
+    bytes through `CLASS_LOOKUP` and never decodes them.
+
+    Args:
+        password (bytes | bytearray | memoryview): The password bytes.
+
+    Returns:
+        int: The class bit mask (bit `i` = `PASSWORD_OPTIONS[i]` present).
+    """
+    class_mask = 0
+    for byte in password:
+        class_mask |= CLASS_LOOKUP[byte]
+    return class_mask
+
+
+def calculate_buffer_entropy(password: bytes | bytearray | memoryview) -> float:
+    """
+    Calculates the entropy of an ASCII password buffer without decoding it.
+
+    Args:
+        password (bytes | bytearray | memoryview): The password bytes.
+
+    Returns:
+        float: The password entropy in bits.
+    """
+    pool_size = POOL_SIZE_BY_MASK[analyze_password_buffer(password)]
+    return len(password) * math.log2(pool_size) if pool_size else 0.0
@@ -0,0 +1,213 @@
+import os
+import json
+import hashlib
+import unicodedata
+from collections import deque
+from typing import Callable, Iterable
+
+
+# ----------------------------- Constants ----------------------------- #
+POLICY_CACHE_VERSION = 1
+DEFAULT_POLICY_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'random_password_generator')
+DEFAULT_MAX_ATTEMPTS = 1000
+
+
+class BannedTermPolicy:
+    """
+    Rejects passwords containing banned substrings, using an Aho-Corasick automaton.
+
+    The banned terms are compiled once into a trie with failure links, so a
+    password is checked against every term in a single left-to-right pass,
+    whatever the number of terms. Matching is case-insensitive by default.
+
+    Args:
+        terms (Iterable[str]): The banned substrings.
+        case_sensitive (bool, optional): Match the exact case if True.
+    """
+
+    def __init__(self, terms: Iterable[str], case_sensitive: bool = False) -> None:
+        self.case_sensitive = case_sensitive
+        self.terms = sorted({self._normalize(term.strip()) for term in terms if term.strip()})
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.output: list[list[int]] = [[]]
+        self._build()
+
+    def _normalize(self, text: str) -> str:
+        """NFC-normalize, and case-fold unless matching is case sensitive."""
+        text = unicodedata.normalize('NFC', text)
+        return text if self.case_sensitive else text.casefold()
+
+    def _build(self) -> None:
+        """Build the trie, then the failure links breadth-first."""
+        for index, term in enumerate(self.terms):
+            state = 0
+            for char in term:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(index)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                candidate = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = candidate if candidate != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def _scan(self, password: str, first_only: bool) -> list[str]:
+        """Walk the automaton over the password, collecting matched terms."""
+        goto, fail, output = self.goto, self.fail, self.output
+        found: list[str] = []
+        state = 0
+        for char in self._normalize(password):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.extend(self.terms[index] for index in output[state])
+                if first_only:
+                    break
+        return found
+
+    def find_banned_terms(self, password: str) -> list[str]:
+        """
+        List the banned terms contained in a password.
+
+        Args:
+            password (str): The password to check.
+
+        Returns:
+            list[str]: The matched terms (normalized), without duplicates.
+        """
+        return list(dict.fromkeys(self._scan(password, first_only=False)))
+
+    def is_allowed(self, password: str) -> bool:
+        """Return True if the password contains no banned term (stops at the first hit)."""
+        return not self._scan(password, first_only=True)
+
+    def to_dict(self) -> dict:
+        """Serialize the compiled automaton."""
+        return {
+            'version': POLICY_CACHE_VERSION,
+            'case_sensitive': self.case_sensitive,
+            'terms': self.terms,
+            'goto': self.goto,
+            'fail': self.fail,
+            'output': self.output,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BannedTermPolicy':
+        """Rebuild a policy from `to_dict()` output without recompiling it."""
+        policy = cls.__new__(cls)
+        policy.case_sensitive = data['case_sensitive']
+        policy.terms = data['terms']
+        policy.goto = data['goto']
+        policy.fail = data['fail']
+        policy.output = data['output']
+        return policy
+
+
+def load_policy(
+    path: str,
+    case_sensitive: bool = False,
+    cache_dir: str | None = DEFAULT_POLICY_CACHE_DIR,
+) -> BannedTermPolicy:
+    """
+    Loads a banned-term list (one term per line), using the on-disk automaton cache.
+
+    The cache file is keyed by a hash of the term list and options, so an
+    edited list is recompiled automatically.
+
+    Args:
+        path (str): The term list file.
+        case_sensitive (bool, optional): Match the exact case if True.
+        cache_dir (str | None, optional): Cache directory; None disables caching.
+
+    Returns:
+        BannedTermPolicy: The compiled policy.
+    """
+    with open(path, encoding='utf-8') as file:
+        terms = [line.rstrip('\n') for line in file]
+
+    if cache_dir is None:
+        return BannedTermPolicy(terms, case_sensitive)
+
+    digest = hashlib.sha256(
+        json.dumps([POLICY_CACHE_VERSION, case_sensitive, sorted(terms)]).encode('utf-8')
+    ).hexdigest()
+    cache_path = os.path.join(cache_dir, f'policy-{digest[:32]}.json')
+
+    try:
+        with open(cache_path, encoding='utf-8') as file:
+            return BannedTermPolicy.from_dict(json.load(file))
+    except (OSError, ValueError, KeyError):
+        pass
+
+    policy = BannedTermPolicy(terms, case_sensitive)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump(policy.to_dict(), file)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        pass
+    return policy
+
+
+def generate_filtered_password(
+    generate: Callable[[], str],
+    accept: Callable[[str], bool],
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> str:
+    """
+    Filter stage: draw passwords until one is accepted.
+
+    Args:
+        generate (Callable[[], str]): Produces a candidate password.
+        accept (Callable[[str], bool]): Returns True for an acceptable password,
+            e.g. `BannedTermPolicy.is_allowed`.
+        max_attempts (int, optional): Candidates to try before giving up.
+
+    Raises:
+        ValueError: If no acceptable password was found.
+
+    Returns:
+        str: The first accepted candidate.
+    """
+    for _ in range(max_attempts):
+        password = generate()
+        if accept(password):
+            return password
+    raise ValueError(f"No acceptable password found in {max_attempts} attempts")
+
+
+def combine_filters(*accepts: Callable[[str], bool] | None) -> Callable[[str], bool] | None:
+    """
+    Chains filter stages; a password is accepted only if every stage accepts it.
+
+    Stages run in order and stop at the first rejection, so put cheap checks
+    (and stages without side effects) first.
+
+    Args:
+        *accepts (Callable[[str], bool] | None): Filter stages; None entries are skipped.
+
+    Returns:
+        Callable[[str], bool] | None: The combined stage, or None if there is none.
+    """
+    stages = [accept for accept in accepts if accept is not None]
+    if not stages:
+        return None
+    if len(stages) == 1:
+        return stages[0]
+    return lambda password: all(accept(password) for accept in stages)
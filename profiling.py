@@ -0,0 +1,161 @@
+import os
+import sys
+import pstats
+import cProfile
+import argparse
+import threading
+import contextlib
+from collections import Counter
+from typing import Iterable, Iterator, TypeVar
+
+
+# ----------------------------- Constants ----------------------------- #
+
+# 'cprofile' : deterministic, every call, written as .pstats
+# 'sample'   : periodic stack samples, written as collapsed stacks
+#              ("frame;frame;frame count" lines, for flamegraph tools)
+PROFILE_MODES = ('cprofile', 'sample')
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+Item = TypeVar('Item')
+
+_active_profiler: 'Profiler | None' = None
+
+
+class Profiler:
+    """
+    Profiles only the phases wrapped in `phase()`, never the time in between.
+
+    In 'cprofile' mode the profiler is enabled for each phase and the
+    calls of all phases add up. In 'sample' mode a daemon thread reads the
+    stack of the profiled thread every `interval` seconds, keeping a sample
+    only while a phase is running, so prompts and file writes outside the
+    phases leave no trace in the profile.
+
+    Args:
+        mode (str): One of `PROFILE_MODES`.
+        path (str): Output file, written by `close()`.
+        interval (float, optional): Seconds between stack samples ('sample' mode).
+
+    Raises:
+        ValueError: If the mode is not supported.
+    """
+
+    def __init__(self, mode: str, path: str, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profile mode: {mode}")
+        self.mode = mode
+        self.path = path
+        self.interval = interval
+        self.depth = 0
+        self.samples: Counter[str] = Counter()
+        self.thread_id = threading.get_ident()
+        self.stop_event = threading.Event()
+        self.profile = cProfile.Profile() if mode == 'cprofile' else None
+        self.sampler = None
+        if mode == 'sample':
+            self.sampler = threading.Thread(target=self._sample, name='stack-sampler', daemon=True)
+            self.sampler.start()
+
+    @contextlib.contextmanager
+    def phase(self) -> Iterator[None]:
+        """Profile the body of the `with` block; phases may nest."""
+        self.depth += 1
+        if self.depth == 1 and self.profile is not None:
+            self.profile.enable()
+        try:
+            yield
+        finally:
+            if self.depth == 1 and self.profile is not None:
+                self.profile.disable()
+            self.depth -= 1
+
+    def _sample(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            if not self.depth:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            if self.depth:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def close(self) -> None:
+        """Stop sampling and write the profile."""
+        if self.profile is not None:
+            self.profile.dump_stats(self.path)
+            return
+        self.stop_event.set()
+        self.sampler.join()
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for stack, count in self.samples.most_common():
+                file.write(f'{stack} {count}\n')
+
+
+def start_profiling(mode: str, path: str, interval: float = DEFAULT_SAMPLE_INTERVAL) -> Profiler:
+    """Create a profiler and make it the one `profile_phase()` reports to."""
+    global _active_profiler
+    _active_profiler = Profiler(mode, path, interval)
+    return _active_profiler
+
+
+def stop_profiling() -> None:
+    """Write the active profile, if any, and stop profiling."""
+    global _active_profiler
+    if _active_profiler is not None:
+        _active_profiler.close()
+        _active_profiler = None
+
+
+def profile_phase() -> contextlib.AbstractContextManager:
+    """A phase of the active profiler, or a no-op context when profiling is off."""
+    return _active_profiler.phase() if _active_profiler is not None else contextlib.nullcontext()
+
+
+def profile_batches(batches: Iterable[Item]) -> Iterator[Item]:
+    """
+    Yield the batches of a lazy pipeline, profiling only their production.
+
+    The consumer's work between two batches (encoding, writing) stays out of the profile.
+    """
+    iterator = iter(batches)
+    while True:
+        with profile_phase():
+            batch = next(iterator, None)
+        if batch is None:
+            return
+        yield batch
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the --profile/--profile-stacks switches shared by the command-line tools."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--profile', metavar='PSTATS',
+                       help='profile the generation and analysis phases with cProfile into PSTATS')
+    group.add_argument('--profile-stacks', metavar='PATH',
+                       help='sample the stacks of the generation and analysis phases into PATH (collapsed stacks)')
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_SAMPLE_INTERVAL, metavar='SECONDS',
+                        help='seconds between stack samples')
+
+
+def start_profiling_from_arguments(arguments: argparse.Namespace) -> Profiler | None:
+    """Start the profiler selected by the `add_profile_arguments()` switches, if any."""
+    if arguments.profile:
+        return start_profiling('cprofile', arguments.profile)
+    if arguments.profile_stacks:
+        return start_profiling('sample', arguments.profile_stacks, arguments.profile_interval)
+    return None
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Summarize a .pstats profile')
+    parser.add_argument('pstats', help='profile written with --profile')
+    parser.add_argument('--sort', default='cumulative', help='pstats sort key')
+    parser.add_argument('--limit', type=int, default=25)
+    arguments = parser.parse_args()
+
+    pstats.Stats(arguments.pstats).strip_dirs().sort_stats(arguments.sort).print_stats(arguments.limit)
@@ -0,0 +1,381 @@
+import math
+import array
+import random
+import struct
+import argparse
+from collections import Counter, defaultdict
+from typing import Callable, Iterator, Sequence
+from utils import *
+from exporters import DEFAULT_EXPORT_BATCH_SIZE, PasswordRecord
+from password_policy import generate_filtered_password
+
+
+# ----------------------------- Constants ----------------------------- #
+DEFAULT_MARKOV_ORDER = 3
+MIN_WORD_LENGTH = 3
+WORD_START = '^'
+WORD_END = '$'
+
+# Binary model layout (little endian):
+#   header   : magic, version, order, symbol count, context count, entropy per char
+#   symbols  : UTF-8 encoded symbol string (length-prefixed)
+#   arrays   : context keys, table offsets, outcomes, probabilities, aliases, surprisals
+MODEL_MAGIC = b'RPGM'
+MODEL_VERSION = 1
+MODEL_HEADER = struct.Struct('<4sBBHId')
+ARRAY_LENGTH = struct.Struct('<Q')
+
+
+def build_alias_table(weights: list[float]) -> tuple[list[float], list[int]]:
+    """
+    Builds Vose's alias table, allowing O(1) sampling of a discrete distribution.
+
+    Args:
+        weights (list[float]): Non-negative outcome weights.
+
+    Returns:
+        tuple[list[float], list[int]]: Acceptance probability and alias of every slot.
+    """
+    count = len(weights)
+    total = sum(weights)
+    scaled = [weight * count / total for weight in weights]
+    probabilities = [0.0] * count
+    aliases = list(range(count))
+
+    small = [index for index, value in enumerate(scaled) if value < 1.0]
+    large = [index for index, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probabilities[less] = scaled[less]
+        aliases[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    for index in small + large:
+        probabilities[index] = 1.0
+    return probabilities, aliases
+
+
+def context_key(context: Sequence[int]) -> int:
+    """Pack the last `order` symbol indices of a context into one integer."""
+    key = 0
+    for symbol in context:
+        key = key * 256 + symbol
+    return key
+
+
+class MarkovModel:
+    """
+    Character n-gram Markov chain compiled to alias tables.
+
+    Every context (the previous `order` symbols) owns a contiguous slice of
+    the flat `outcomes` / `probabilities` / `aliases` arrays, so drawing the
+    next character is one `randrange`, one `random()` and two array reads,
+    whatever the alphabet size.
+
+    Args:
+        order (int): Number of previous symbols forming a context.
+        symbols (str): The symbol alphabet; index 0 is `WORD_START`, index 1 `WORD_END`.
+        tables (dict): Context key -> (outcomes, weights).
+        entropy_per_char (float): Entropy rate of the chain in bits per drawn symbol.
+    """
+
+    def __init__(self, order: int, symbols: str, tables: dict, entropy_per_char: float) -> None:
+        self.order = order
+        self.symbols = symbols
+        self.entropy_per_char = entropy_per_char
+        self.context_index: dict[int, int] = {}
+        self.offsets = array.array('I', [0])
+        self.outcomes = array.array('B')
+        self.probabilities = array.array('d')
+        self.aliases = array.array('B')
+        self.surprisals = array.array('d')
+
+        for number, (key, (outcomes, weights)) in enumerate(sorted(tables.items())):
+            total = sum(weights)
+            probabilities, aliases = build_alias_table(weights)
+            self.context_index[key] = number
+            self.outcomes.extend(outcomes)
+            self.probabilities.extend(probabilities)
+            self.aliases.extend(aliases)
+            self.surprisals.extend(-math.log2(weight / total) for weight in weights)
+            self.offsets.append(len(self.outcomes))
+
+    def draw(self, context: list[int], rng: random.Random) -> tuple[int, float]:
+        """
+        Draw the next symbol for a context in O(1).
+
+        Args:
+            context (list[int]): The previous `order` symbol indices.
+            rng (random.Random): The random generator to draw from.
+
+        Returns:
+            tuple[int, float]: The symbol index and its surprisal in bits.
+        """
+        number = self.context_index[context_key(context)]
+        start = self.offsets[number]
+        slot = start + rng.randrange(self.offsets[number + 1] - start)
+        if rng.random() >= self.probabilities[slot]:
+            slot = start + self.aliases[slot]
+        return self.outcomes[slot], self.surprisals[slot]
+
+    def password_entropy(self, length: int) -> float:
+        """
+        Returns the entropy in bits of the model's passwords of `length` characters.
+
+        This is the entropy rate of the chain times the length. It is a
+        property of the generator, so every password of a length gets the
+        same strength. The surprisal of one sampled path would vary from one
+        password to the next and overstate it, since several word splits
+        spell the same string.
+        """
+        return length * self.entropy_per_char
+
+    def generate(self, length: int, rng: random.Random | None = None) -> tuple[str, float]:
+        """
+        Generate a pronounceable password of exactly `length` characters.
+
+        Words are chained: when the model ends a word, the next one starts.
+
+        Args:
+            length (int): Number of characters.
+            rng (random.Random | None, optional): The random generator to draw from.
+
+        Returns:
+            tuple[str, float]: The password and its entropy in bits, see `password_entropy()`.
+        """
+        rng = rng or get_thread_rng()
+        chars: list[str] = []
+        context = [0] * self.order
+        while len(chars) < length:
+            symbol, _ = self.draw(context, rng)
+            if symbol == 1:
+                context = [0] * self.order
+                continue
+            chars.append(self.symbols[symbol])
+            context = context[1:] + [symbol]
+        return ''.join(chars), self.password_entropy(length)
+
+    def save(self, path: str) -> None:
+        """Write the compiled model to a compact binary file."""
+        keys = array.array('Q', sorted(self.context_index, key=self.context_index.get))
+        symbol_bytes = self.symbols.encode('utf-8')
+        with open(path, 'wb') as file:
+            file.write(MODEL_HEADER.pack(
+                MODEL_MAGIC, MODEL_VERSION, self.order, len(self.symbols), len(keys), self.entropy_per_char
+            ))
+            file.write(ARRAY_LENGTH.pack(len(symbol_bytes)) + symbol_bytes)
+            for table in (keys, self.offsets, self.outcomes, self.probabilities, self.aliases, self.surprisals):
+                file.write(ARRAY_LENGTH.pack(len(table)))
+                file.write(table.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'MarkovModel':
+        """
+        Read a model written by `save()`; the tables are loaded as raw arrays.
+
+        Raises:
+            ValueError: If the file is not a model of a supported version.
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        magic, version, order, _, _, entropy_per_char = MODEL_HEADER.unpack_from(data, 0)
+        if magic != MODEL_MAGIC or version != MODEL_VERSION:
+            raise ValueError(f"Not a supported Markov model file: {path}")
+        offset = MODEL_HEADER.size
+        size, = ARRAY_LENGTH.unpack_from(data, offset)
+        offset += ARRAY_LENGTH.size
+        symbols = data[offset:offset + size].decode('utf-8')
+        offset += size
+
+        model = cls.__new__(cls)
+        model.order = order
+        model.symbols = symbols
+        model.entropy_per_char = entropy_per_char
+        tables = []
+        for typecode in ('Q', 'I', 'B', 'd', 'B', 'd'):
+            table = array.array(typecode)
+            count, = ARRAY_LENGTH.unpack_from(data, offset)
+            offset += ARRAY_LENGTH.size
+            table.frombytes(data[offset:offset + count * table.itemsize])
+            offset += count * table.itemsize
+            tables.append(table)
+        keys, model.offsets, model.outcomes, model.probabilities, model.aliases, model.surprisals = tables
+        model.context_index = {key: number for number, key in enumerate(keys)}
+        return model
+
+
+def read_corpus_words(path: str) -> Iterator[str]:
+    """Yield the lowercase alphabetic words of a corpus file."""
+    with open(path, encoding='utf-8', errors='ignore') as file:
+        for line in file:
+            for word in line.split():
+                word = word.strip().lower()
+                if len(word) >= MIN_WORD_LENGTH and word.isascii() and word.isalpha():
+                    yield word
+
+
+def train_markov_model(corpus_path: str, order: int = DEFAULT_MARKOV_ORDER) -> MarkovModel:
+    """
+    Trains a character n-gram model from a corpus of words.
+
+    The entropy rate is the average of every context's next-symbol entropy,
+    weighted by how often the context occurs in the corpus.
+
+    Args:
+        corpus_path (str): Text file with words separated by whitespace.
+        order (int, optional): Context length in characters.
+
+    Raises:
+        ValueError: If the corpus holds no usable word.
+
+    Returns:
+        MarkovModel: The compiled model.
+    """
+    counts: dict[tuple[int, ...], Counter] = defaultdict(Counter)
+    symbols = WORD_START + WORD_END
+    symbol_index = {WORD_START: 0, WORD_END: 1}
+
+    for word in read_corpus_words(corpus_path):
+        context = (0,) * order
+        for char in word:
+            if char not in symbol_index:
+                symbol_index[char] = len(symbols)
+                symbols += char
+            counts[context][symbol_index[char]] += 1
+            context = context[1:] + (symbol_index[char],)
+        counts[context][1] += 1
+
+    if not counts:
+        raise ValueError(f"No usable words in corpus: {corpus_path}")
+
+    total_draws = sum(sum(counter.values()) for counter in counts.values())
+    entropy_rate = 0.0
+    tables = {}
+    for context, counter in counts.items():
+        context_total = sum(counter.values())
+        entropy_rate += context_total / total_draws * -sum(
+            count / context_total * math.log2(count / context_total) for count in counter.values()
+        )
+        tables[context_key(context)] = (list(counter), list(counter.values()))
+
+    return MarkovModel(order, symbols, tables, entropy_rate)
+
+
+def calculate_pronounceable_strength(entropy: float) -> tuple[int, str, str]:
+    """
+    Rates a pronounceable password from its model entropy.
+
+    Character-class analysis would credit a lowercase word with
+    log2(26) bits per character; the chain delivers far less, so the
+    strength must come from the model.
+
+    Args:
+        entropy (float): The password entropy, see `MarkovModel.password_entropy()`.
+
+    Returns:
+        tuple[int, str, str]: The score, label and color, like `calculate_password_strength()`.
+    """
+    strength = evaluate_password_strength(entropy)
+    return strength['score'], strength['label'], strength['color']
+
+
+def pronounceable_profile(length: int) -> str:
+    """Returns the history profile of pronounceable passwords of `length` characters."""
+    return f'pronounceable;length={length}'
+
+
+def build_pronounceable_record(password: str, entropy: float) -> PasswordRecord:
+    """Builds the export record of a pronounceable password, rated by its model entropy."""
+    return {
+        'password': password,
+        'entropy': entropy,
+        'label': evaluate_password_strength(entropy)['label'],
+        'class_mask': calculate_password_class_mask(password),
+    }
+
+
+def generate_pronounceable_password(
+    model: MarkovModel,
+    length: int,
+    rng: random.Random | None = None,
+    accept: Callable[[str], bool] | None = None,
+) -> tuple[str, float]:
+    """
+    Generates one pronounceable password, redrawn until the filter accepts it.
+
+    Args:
+        model (MarkovModel): The compiled model.
+        length (int): Password length.
+        rng (random.Random | None, optional): The random generator to draw from.
+        accept (Callable[[str], bool] | None, optional): Filter stage, e.g.
+            `BannedTermPolicy.is_allowed`.
+
+    Raises:
+        ValueError: If the filter rejects every attempt.
+
+    Returns:
+        tuple[str, float]: The password and its model entropy in bits.
+    """
+    if accept is None:
+        return model.generate(length, rng)
+    password = generate_filtered_password(lambda: model.generate(length, rng)[0], accept)
+    return password, model.password_entropy(length)
+
+
+def generate_pronounceable_record_batches(
+    model: MarkovModel,
+    length: int,
+    count: int,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    rng: random.Random | None = None,
+    accept: Callable[[str], bool] | None = None,
+) -> Iterator[list[PasswordRecord]]:
+    """
+    Generates pronounceable passwords and yields export records in batches.
+
+    Args:
+        model (MarkovModel): The compiled model.
+        length (int): Password length.
+        count (int): Total number of passwords.
+        batch_size (int, optional): Number of records per batch.
+        rng (random.Random | None, optional): The random generator to draw
+            from, e.g. a seeded `CounterRandom` for a reproducible export.
+        accept (Callable[[str], bool] | None, optional): Filter stage;
+            rejected passwords are redrawn.
+
+    Yields:
+        list[PasswordRecord]: The next batch, with the model entropy of every password.
+    """
+    remaining = count
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        yield [build_pronounceable_record(*generate_pronounceable_password(model, length, rng, accept))
+               for _ in range(size)]
+        remaining -= size
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Pronounceable password model')
+    commands = parser.add_subparsers(dest='command', required=True)
+    train_parser = commands.add_parser('train', help='train a model from a word corpus')
+    train_parser.add_argument('corpus')
+    train_parser.add_argument('model')
+    train_parser.add_argument('--order', type=int, default=DEFAULT_MARKOV_ORDER)
+    generate_parser = commands.add_parser('generate', help='generate passwords from a model')
+    generate_parser.add_argument('model')
+    generate_parser.add_argument('--length', type=int, default=12)
+    generate_parser.add_argument('--count', type=int, default=5)
+    arguments = parser.parse_args()
+
+    if arguments.command == 'train':
+        model = train_markov_model(arguments.corpus, arguments.order)
+        model.save(arguments.model)
+        print(f'{len(model.context_index)} contexts, {model.entropy_per_char:.3f} bits per symbol')
+    else:
+        model = MarkovModel.load(arguments.model)
+        for _ in range(arguments.count):
+            password, entropy = model.generate(arguments.length)
+            _, label, _ = calculate_pronounceable_strength(entropy)
+            print(f'{password}  {entropy:.2f} bits  {label}')
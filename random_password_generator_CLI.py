@@ -1,5 +1,26 @@
+import time
+import argparse
 from colorama import Fore, Style, init
 from utils import *
+from exporters import *
+from alphabets import ALPHABET_SAMPLING_MODES, Alphabet, load_alphabet
+from password_policy import BannedTermPolicy, combine_filters, generate_filtered_password, load_policy
+from masks import generate_mask_record_batches
+from seeded_streams import CounterRandom
+from pronounceable import (MarkovModel, build_pronounceable_record, calculate_pronounceable_strength,
+                           generate_pronounceable_password, generate_pronounceable_record_batches,
+                           pronounceable_profile)
+from similarity import SimilarityIndex
+from credentials import (CREDENTIAL_FORMATS, DEFAULT_KDF_PARAMETERS, KDF_ALGORITHMS, export_credential_batches,
+                         hash_record_batches)
+from sharded_writer import COMPRESSION_CODECS, ShardedWriter, ShardOptions, positive_int
+from workload import TraceRecorder
+from strength_table import format_strength_preview, get_strength_table
+from memory_watchdog import DEFAULT_CHECK_INTERVAL, MemoryWatchdog
+from rng_accounting import CountingRandom, format_rng_report
+from engines import GENERATION_ENGINES, get_engine, select_engine
+from profiling import add_profile_arguments, profile_batches, profile_phase, start_profiling_from_arguments, stop_profiling
+from history import PasswordHistory, settings_profile
 
 
 init(autoreset=True)
@@ -42,7 +63,63 @@ def colorize_outputs(message_type: str, message_text: str) -> str:
     return f'{color}{message_text}{Style.RESET_ALL}' if color else message_text
 
 
-def ask_if_change_settings(settings: PasswordSettings) -> None:
+def print_strength_preview(settings: PasswordSettings, sampling: str = DEFAULT_SAMPLING_MODE,
+                           class_weights: dict[str, float] | None = None) -> None:
+    """
+    Print the expected strength of the settings, read from the precomputed
+    strength table before any password is generated.
+
+    Args:
+        settings (PasswordSettings): The settings to preview.
+        sampling (str, optional): One of `SAMPLING_MODES`.
+        class_weights (dict[str, float] | None, optional): Weights of the 'weighted' mode.
+
+    Returns:
+        None
+    """
+    try:
+        preview = get_strength_table(sampling, class_weights).preview(settings)
+    except IndexError:
+        print(colorize_outputs('error', 'Preview: no character class enabled'))
+        return
+    print(f"Preview: {format_strength_preview(preview)}")
+
+
+def apply_target_bits(settings: PasswordSettings, target_bits: float,
+                      sampling: str = DEFAULT_SAMPLING_MODE,
+                      class_weights: dict[str, float] | None = None) -> None:
+    """
+    Set the password length to the shortest one whose expected entropy
+    reaches `target_bits` with the enabled classes.
+
+    Falls back to `MAX_PASSWORD_LENGTH` with a warning when no allowed
+    length reaches the target.
+
+    Args:
+        settings (PasswordSettings): The settings, updated in place.
+        target_bits (float): The target entropy in bits.
+        sampling (str, optional): One of `SAMPLING_MODES`.
+        class_weights (dict[str, float] | None, optional): Weights of the 'weighted' mode.
+
+    Raises:
+        IndexError: If no character class is enabled.
+
+    Returns:
+        None
+    """
+    length = get_strength_table(sampling, class_weights).minimum_length(settings_class_mask(settings), target_bits)
+    if length is None:
+        print(colorize_outputs(
+            'error', f'No length up to {MAX_PASSWORD_LENGTH} reaches {target_bits} bits; using {MAX_PASSWORD_LENGTH}.'
+        ))
+        length = MAX_PASSWORD_LENGTH
+    settings['password_length'] = length
+    print(f"password_length set to {length} for a target of {target_bits} bits")
+
+
+def ask_if_change_settings(settings: PasswordSettings, target_bits: float | None = None,
+                           sampling: str = DEFAULT_SAMPLING_MODE, preview: bool = True,
+                           class_weights: dict[str, float] | None = None) -> None:
     
     """
     Prompt the user to decide if they want to change the default password settings.
@@ -52,9 +129,17 @@ def ask_if_change_settings(settings: PasswordSettings) -> None:
     - 'n': skips changing settings and generates a password with current settings.
     - Other inputs: prompts the user again with an error message.
 
+    The expected strength of the chosen settings is printed at the end.
+
     Args:
         settings (PasswordSettings): 
             A dictionary of current password settings to be potentially modified.
+        target_bits (float | None, optional):
+            When given, the length is then picked to reach this expected entropy.
+        sampling (str, optional): One of `SAMPLING_MODES`, for the preview.
+        preview (bool, optional): Print strength previews; off for generators
+            the class settings do not describe.
+        class_weights (dict[str, float] | None, optional): Weights of the 'weighted' mode.
 
     Returns:
         None
@@ -69,7 +154,7 @@ def ask_if_change_settings(settings: PasswordSettings) -> None:
         
         if user_answer in VALID_YES:
             print('-'*5, 'Changing default settings', '-'*5, sep='')
-            get_password_settings(settings)
+            get_password_settings(settings, sampling, preview, class_weights)
             break
         elif user_answer == VALID_NO:
             break
@@ -82,6 +167,11 @@ def ask_if_change_settings(settings: PasswordSettings) -> None:
                 )
             )
 
+    if target_bits is not None and settings_class_mask(settings):
+        apply_target_bits(settings, target_bits, sampling, class_weights)
+    if preview:
+        print_strength_preview(settings, sampling, class_weights)
+
 
 def get_user_password_length(option: str, default: int,
                             min_length: int = MIN_PASSWORD_LENGTH, 
@@ -161,18 +251,23 @@ def get_user_password_settings(option: str, default: bool) -> bool:
         ))
 
 
-def get_password_settings(settings: PasswordSettings) -> None:
+def get_password_settings(settings: PasswordSettings, sampling: str = DEFAULT_SAMPLING_MODE,
+                          preview: bool = True, class_weights: dict[str, float] | None = None) -> None:
     
     """
     Prompt the user to update password settings.
 
     For each setting in the dictionary, asks the user to input a new value.
     For 'password_length', requests a numeric input within defined limits.
-    For other options, asks for yes/no confirmation.
+    For other options, asks for yes/no confirmation, then (if `preview`)
+    prints the expected strength of the settings so far.
 
     Args:
         settings (PasswordSettings): 
             A dictionary of password settings with option names as keys.
+        sampling (str, optional): One of `SAMPLING_MODES`, for the preview.
+        preview (bool, optional): Print the strength preview after every class.
+        class_weights (dict[str, float] | None, optional): Weights of the 'weighted' mode.
 
     Returns:
         None: modifies the dictionary in-place.
@@ -184,29 +279,46 @@ def get_password_settings(settings: PasswordSettings) -> None:
             settings[option] = get_user_password_length(option, default)
         else:
             settings[option] = get_user_password_settings(option, default)
+            if preview:
+                print_strength_preview(settings, sampling, class_weights)
 
 
-def get_generated_password(settings: PasswordSettings) -> str:
+def get_generated_password(settings: PasswordSettings, policy: BannedTermPolicy | None = None,
+                           pronounceable: MarkovModel | None = None) -> str:
     """
     Generate a random password.
     
     Args:
         settings (PasswordSettings): 
             A dictionary of password settings with option names as keys.
+        policy (BannedTermPolicy | None, optional):
+            When given, passwords containing a banned term are redrawn.
+        pronounceable (MarkovModel | None, optional):
+            When given, the password is drawn from this model; only the length applies.
     
     Returns:
         str: The generated random password.
     """
+    if pronounceable is not None:
+        accept = policy.is_allowed if policy is not None else None
+        return generate_pronounceable_password(pronounceable, settings['password_length'], accept=accept)[0]
+    if policy is not None:
+        return generate_filtered_password(lambda: random_password_generator(settings), policy.is_allowed)
     return random_password_generator(settings)
 
 
-def generate_password_with_metrics(settings: PasswordSettings) -> tuple[str, float, str]:
+def generate_password_with_metrics(settings: PasswordSettings,
+                                   policy: BannedTermPolicy | None = None,
+                                   pronounceable: MarkovModel | None = None) -> tuple[str, float, str]:
     """
     Generate a password along with its entropy and strength label.
 
     Args:
         settings (PasswordSettings): 
             A dictionary of password settings with option names as keys.
+        policy (BannedTermPolicy | None, optional): Optional banned-term policy.
+        pronounceable (MarkovModel | None, optional):
+            Optional Markov model; its passwords are rated by the model entropy.
     
     Returns:
         tuple: A tuple containing:
@@ -214,7 +326,11 @@ def generate_password_with_metrics(settings: PasswordSettings) -> tuple[str, flo
             - float: The password entropy in bits
             - str: The password strength label
     """
-    password = get_generated_password(settings)
+    password = get_generated_password(settings, policy, pronounceable)
+    if pronounceable is not None:
+        entropy = pronounceable.password_entropy(settings['password_length'])
+        _, strength_label, _ = calculate_pronounceable_strength(entropy)
+        return password, entropy, strength_label
     entropy = calculate_password_entropy(password)
     _, strength_label, _= calculate_password_strength(password)
     return password, entropy, strength_label
@@ -239,33 +355,84 @@ def colorize_strength(strength_label: str) -> str:
     return strength_label
 
 
-def print_generated_password_entropy_strength(settings: PasswordSettings) -> None:
+def format_policy_status(password: str, policy: BannedTermPolicy) -> str:
+    """
+    Describe whether a password passes the banned-term policy.
+
+    Args:
+        password (str): The password to check.
+        policy (BannedTermPolicy): The banned-term policy.
+
+    Returns:
+        str: 'OK', or a colorized warning listing the banned terms found.
+    """
+    banned_terms = policy.find_banned_terms(password)
+    if not banned_terms:
+        return 'OK'
+    return colorize_outputs('error', f"contains banned term(s): {', '.join(banned_terms)}")
+
+
+def print_generated_password_entropy_strength(settings: PasswordSettings,
+                                              history: PasswordHistory | None = None,
+                                              policy: BannedTermPolicy | None = None,
+                                              recorder: TraceRecorder | None = None,
+                                              action: str = 'generate',
+                                              pronounceable: MarkovModel | None = None) -> None:
     """
     Print a generated password along with its entropy and strength to the console. 
 
     Args:
         settings (PasswordSettings): 
             A dictionary of password settings with option names as keys.
+        history (PasswordHistory | None, optional):
+            When given, the generated password is also stored in the history.
+        policy (BannedTermPolicy | None, optional):
+            When given, generation skips banned terms and the policy status is shown.
+        recorder (TraceRecorder | None, optional):
+            When given, the action and its generation time are added to the workload trace.
+        action (str, optional): The traced action, 'generate' or 'regenerate'.
+        pronounceable (MarkovModel | None, optional):
+            When given, the password is drawn from this Markov model.
     
     Returns:
         None
     """
-    password, entropy, strength = generate_password_with_metrics(settings)
+    start = time.perf_counter()
+    with profile_phase():
+        password, entropy, strength = generate_password_with_metrics(settings, policy, pronounceable)
+    if history is not None:
+        if pronounceable is not None:
+            history.add(build_pronounceable_record(password, entropy),
+                        pronounceable_profile(settings['password_length']))
+        else:
+            history.add(build_password_record(password), settings_profile(settings))
+    if recorder is not None:
+        recorder.record(action, settings, time.perf_counter() - start)
     strength_label = colorize_strength(strength)
     print(BORDER)
     print(f"Generated password : {password}")
     print(f"Strength           : {strength_label}")
     print(f"Entropy            : {entropy:.2f} bits")
+    if policy is not None:
+        print(f"Policy             : {format_policy_status(password, policy)}")
     print(BORDER)
 
 
 
-def regenerate_random_password(settings: PasswordSettings) -> None:
+def regenerate_random_password(settings: PasswordSettings,
+                               history: PasswordHistory | None = None,
+                               policy: BannedTermPolicy | None = None,
+                               recorder: TraceRecorder | None = None,
+                               pronounceable: MarkovModel | None = None) -> None:
     """
     Continuously prompt the user to regenerate a password until they decline.
     
     Args:
         settings (dict): A dictionary of password settings used for generation.
+        history (PasswordHistory | None, optional): Optional persistent history.
+        policy (BannedTermPolicy | None, optional): Optional banned-term policy.
+        recorder (TraceRecorder | None, optional): Optional workload trace recorder.
+        pronounceable (MarkovModel | None, optional): Optional Markov model to draw from.
 
     Returns:
         None
@@ -279,7 +446,8 @@ def regenerate_random_password(settings: PasswordSettings) -> None:
         ).strip().lower()
 
         if user_input in VALID_YES:
-            print_generated_password_entropy_strength(settings)
+            print_generated_password_entropy_strength(settings, history, policy, recorder, 'regenerate',
+                                                      pronounceable)
 
         elif user_input == VALID_NO:
             print(colorize_outputs(
@@ -293,7 +461,9 @@ def regenerate_random_password(settings: PasswordSettings) -> None:
             ))
             
 
-def run(settings: PasswordSettings) -> None:
+def run(settings: PasswordSettings, history: PasswordHistory | None = None,
+        policy: BannedTermPolicy | None = None, recorder: TraceRecorder | None = None,
+        target_bits: float | None = None, pronounceable: MarkovModel | None = None) -> None:
     """
     Run the main password generation workflow.
 
@@ -305,20 +475,289 @@ def run(settings: PasswordSettings) -> None:
 
     Args:
         settings (PasswordSettings): The current configuration for password generation.
+        history (PasswordHistory | None, optional): Optional persistent history.
+        policy (BannedTermPolicy | None, optional): Optional banned-term policy.
+        recorder (TraceRecorder | None, optional): Optional workload trace recorder.
+        target_bits (float | None, optional): When given, the length is picked
+            to reach this expected entropy.
+        pronounceable (MarkovModel | None, optional): When given, passwords are
+            drawn from this Markov model and only the length of the settings applies.
 
     Returns:
         None
     """
 
     clear_screen()
-    ask_if_change_settings(settings)
-    print_generated_password_entropy_strength(settings)
-    regenerate_random_password(settings)
-    
+    if pronounceable is not None:
+        ask_if_change_settings(settings, preview=False)
+    else:
+        ask_if_change_settings(settings, target_bits)
+    print_generated_password_entropy_strength(settings, history, policy, recorder, 'generate', pronounceable)
+    regenerate_random_password(settings, history, policy, recorder, pronounceable)
+
+
+def run_export(settings: PasswordSettings, path: str, count: int, export_format: str | None,
+               history: PasswordHistory | None = None, seed: int | None = None,
+               sampling: str = DEFAULT_SAMPLING_MODE, alphabet: Alphabet | None = None,
+               policy: BannedTermPolicy | None = None, mask: str | None = None,
+               pronounceable: MarkovModel | None = None,
+               similarity: SimilarityIndex | None = None, hash_algorithm: str | None = None,
+               hash_workers: int | None = None, include_password: bool = True,
+               sharding: ShardOptions | None = None, target_bits: float | None = None,
+               engine: str | None = None, class_weights: dict[str, float] | None = None,
+               kdf_parameters: dict | None = None) -> None:
+    """
+    Run the bulk export workflow.
+
+    Prompts for the settings like `run()` does, then streams `count` generated
+    passwords with their strength fields straight into the export file.
+    With a mask, the mask alone defines the passwords and no prompt is shown;
+    the seed and the filters still apply.
+    With a pronounceable model, only the length of the settings applies;
+    the seed and the filters still apply.
+
+    Args:
+        settings (PasswordSettings): The current configuration for password generation.
+        path (str): The output file path.
+        count (int): Number of passwords to generate.
+        export_format (str | None): A key of `EXPORT_FORMATS`, or None to
+            guess it from the file extension.
+        history (PasswordHistory | None, optional):
+            When given, every exported record is also stored in the history.
+        seed (int | None, optional):
+            When given, the export is the reproducible sequence for this seed.
+        sampling (str, optional): One of `SAMPLING_MODES`.
+        alphabet (Alphabet | None, optional): Custom alphabet loaded from a file.
+        policy (BannedTermPolicy | None, optional):
+            When given, exported passwords never contain a banned term.
+        mask (str | None, optional): Template such as 'X{4}-X{4}-X{4}', see `masks.py`.
+        pronounceable (MarkovModel | None, optional):
+            When given, passwords are drawn from this Markov model, see `pronounceable.py`.
+        similarity (SimilarityIndex | None, optional):
+            When given, passwords too similar to an indexed one are redrawn.
+        hash_algorithm (str | None, optional): One of `KDF_ALGORITHMS`; when given,
+            every record is written with its salted hash, computed in a process pool.
+        hash_workers (int | None, optional): Hashing processes; one per core by default.
+        include_password (bool, optional): Keep the plaintext next to its hash.
+        sharding (ShardOptions | None, optional): When given, `path` is a directory
+            receiving compressed shard files and a manifest.
+        target_bits (float | None, optional): When given, the length is picked
+            to reach this expected entropy (built-in classes only).
+        engine (str | None, optional): A key of `GENERATION_ENGINES`, or 'auto'
+            for the engine calibrated fastest on this host. Applies to unseeded
+            'class_first' exports without a custom alphabet.
+        class_weights (dict[str, float] | None, optional): Per-class weights of
+            the 'weighted' sampling mode; classes left out weigh 1.
+        kdf_parameters (dict | None, optional): KDF cost parameters overriding
+            `DEFAULT_KDF_PARAMETERS`, e.g. {'iterations': 1_000_000}.
+
+    Raises:
+        ValueError: If `engine` is combined with a seed, an alphabet or
+            another sampling mode, or `target_bits` with an alphabet.
+
+    Returns:
+        None
+    """
+    clear_screen()
+    accept = combine_filters(
+        policy.is_allowed if policy is not None else None,
+        similarity.accept_new if similarity is not None else None,
+    )
+    if mask is not None:
+        rng = CounterRandom(seed) if seed is not None else None
+        batches = generate_mask_record_batches(mask, count, rng=rng, accept=accept)
+        profile = f'mask={mask}'
+    elif pronounceable is not None:
+        ask_if_change_settings(settings, preview=False)
+        rng = CounterRandom(seed) if seed is not None else None
+        batches = generate_pronounceable_record_batches(pronounceable, settings['password_length'], count,
+                                                        rng=rng, accept=accept)
+        profile = pronounceable_profile(settings['password_length'])
+    else:
+        if engine is not None and (seed is not None or alphabet is not None or sampling != DEFAULT_SAMPLING_MODE):
+            raise ValueError(f"Engines apply to unseeded '{DEFAULT_SAMPLING_MODE}' exports only")
+        if alphabet is not None and target_bits is not None:
+            raise ValueError('Target bits cannot be combined with a custom alphabet')
+        # The strength table describes the built-in classes, not a custom alphabet
+        ask_if_change_settings(settings, target_bits, sampling, preview=alphabet is None, class_weights=class_weights)
+        batch_engine = None
+        if engine is not None:
+            name = select_engine(DEFAULT_EXPORT_BATCH_SIZE) if engine == 'auto' else engine
+            print(f'Generation engine: {name}')
+            batch_engine = get_engine(name)
+        batches = generate_password_record_batches(settings, count, seed=seed, sampling=sampling,
+                                                   alphabet=alphabet, accept=accept, engine=batch_engine,
+                                                   class_weights=class_weights)
+        profile = settings_profile(settings)
+    batches = profile_batches(batches)
+    if history is not None:
+        batches = history.record_batches(batches, profile)
+    export_format = export_format or (guess_export_format(path) if sharding is None else 'text')
+    if hash_algorithm is not None:
+        batches = hash_record_batches(batches, hash_algorithm, hash_workers, kdf_parameters,
+                                      include_password=include_password)
+    if sharding is not None:
+        formats = CREDENTIAL_FORMATS if hash_algorithm is not None else EXPORT_FORMATS
+        written = ShardedWriter(path, export_format, sharding, formats=formats).write_batches(batches)
+    elif hash_algorithm is not None:
+        written = export_credential_batches(batches, path, export_format)
+    else:
+        written = export_record_batches(batches, path, export_format)
+    print(colorize_outputs('end', f'{written} passwords exported to {path}'))
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse the command-line options of the CLI.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description='Random password generator')
+    parser.add_argument('--export', metavar='PATH',
+                        help='generate passwords in bulk and write them to PATH')
+    parser.add_argument('--count', type=positive_int,
+                        help='number of passwords to export (default: 1)')
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS),
+                        help='export format (default: guessed from the file extension)')
+    parser.add_argument('--history', metavar='DB',
+                        help='also store generated passwords in this SQLite history file')
+    parser.add_argument('--seed', type=int,
+                        help='make the exported password sequence reproducible')
+    parser.add_argument('--sampling', choices=SAMPLING_MODES, default=DEFAULT_SAMPLING_MODE,
+                        help='character sampling mode for exports (default: class_first)')
+    parser.add_argument('--class-weights', metavar='CLASS=WEIGHT,...',
+                        help="per-class weights of --sampling weighted, e.g. 'uppercase=3,symbol=0.5' "
+                             "(classes left out weigh 1)")
+    parser.add_argument('--alphabet', metavar='JSON',
+                        help='draw exported passwords from an alphabet definition file')
+    parser.add_argument('--banned-terms', metavar='FILE',
+                        help='reject passwords containing any term of FILE (one per line)')
+    parser.add_argument('--mask',
+                        help="export passwords following a mask, e.g. 'Aaaa-9999-****' or 'X{4}-X{4}'")
+    parser.add_argument('--pronounceable', metavar='MODEL',
+                        help='generate pronounceable passwords from a model built by pronounceable.py')
+    parser.add_argument('--max-similarity', type=float, metavar='JACCARD',
+                        help='redraw exported passwords at least this similar (0-1) to an earlier '
+                             'one, including the --history passwords')
+    parser.add_argument('--hash', choices=KDF_ALGORITHMS, dest='hash_algorithm',
+                        help='write a salted hash with every exported password (text, ndjson or csv)')
+    parser.add_argument('--hash-workers', type=positive_int,
+                        help='processes computing the hashes (default: one per core)')
+    parser.add_argument('--kdf-iterations', type=positive_int,
+                        help=f"PBKDF2 iterations of --hash pbkdf2_sha256 "
+                             f"(default: {DEFAULT_KDF_PARAMETERS['pbkdf2_sha256']['iterations']:,})")
+    parser.add_argument('--scrypt-n', type=positive_int,
+                        help=f"scrypt CPU/memory cost of --hash scrypt, a power of 2 "
+                             f"(default: {DEFAULT_KDF_PARAMETERS['scrypt']['n']:,})")
+    parser.add_argument('--hash-only', action='store_true',
+                        help='with --hash, leave the plaintext passwords out of the export')
+    parser.add_argument('--shards', type=positive_int,
+                        help='write the export as this many compressed shard files into the --export directory')
+    parser.add_argument('--compress', choices=sorted(COMPRESSION_CODECS), default='gzip',
+                        help='shard compression codec (default: gzip)')
+    parser.add_argument('--compress-level', type=int,
+                        help='shard compression level (default: the codec default)')
+    parser.add_argument('--rotate-records', type=positive_int,
+                        help='start a new shard file after this many records')
+    parser.add_argument('--rotate-bytes', type=positive_int,
+                        help='start a new shard file once it reaches this many compressed bytes')
+    parser.add_argument('--target-bits', type=float, metavar='BITS',
+                        help='pick the shortest length whose expected entropy reaches BITS')
+    parser.add_argument('--engine', choices=('auto', *GENERATION_ENGINES),
+                        help='batch generation engine for exports; auto picks the fastest on this host '
+                             '(calibrated once and cached, RPG_ENGINE overrides)')
+    parser.add_argument('--rng-report', action='store_true',
+                        help='count the random bits drawn against the entropy delivered and print the totals '
+                             '(unseeded generation in the main thread)')
+    add_profile_arguments(parser)
+    parser.add_argument('--record-trace', metavar='PATH',
+                        help='append an anonymized trace of the session (settings and timing, '
+                             'never passwords) to PATH, for replay with workload.py')
+    parser.add_argument('--memory-report', metavar='PATH',
+                        help='trace allocations, log a warning on memory growth and write the report to PATH')
+    parser.add_argument('--memory-interval', type=float, default=DEFAULT_CHECK_INTERVAL, metavar='SECONDS',
+                        help='seconds between memory watchdog checks')
+    arguments = parser.parse_args()
+
+    if not arguments.export:
+        # Options only the export workflow reads
+        for option, given in (
+            ('--count', arguments.count is not None),
+            ('--format', arguments.format),
+            ('--seed', arguments.seed is not None),
+            ('--sampling', arguments.sampling != DEFAULT_SAMPLING_MODE),
+            ('--class-weights', arguments.class_weights is not None),
+            ('--alphabet', arguments.alphabet),
+            ('--mask', arguments.mask is not None),
+            ('--max-similarity', arguments.max_similarity is not None),
+            ('--hash', arguments.hash_algorithm),
+            ('--hash-workers', arguments.hash_workers is not None),
+            ('--hash-only', arguments.hash_only),
+            ('--kdf-iterations', arguments.kdf_iterations is not None),
+            ('--scrypt-n', arguments.scrypt_n is not None),
+            ('--shards', arguments.shards is not None),
+            ('--compress-level', arguments.compress_level is not None),
+            ('--rotate-records', arguments.rotate_records is not None),
+            ('--rotate-bytes', arguments.rotate_bytes is not None),
+            ('--engine', arguments.engine),
+        ):
+            if given:
+                parser.error(f'{option} requires --export')
+    if arguments.count is None:
+        arguments.count = 1
+    if arguments.hash_algorithm is not None and arguments.export:
+        export_format = arguments.format or (guess_export_format(arguments.export) if not arguments.shards else 'text')
+        if export_format not in CREDENTIAL_FORMATS:
+            parser.error(f"--hash cannot write the {export_format} format; use {', '.join(CREDENTIAL_FORMATS)}")
+    if arguments.kdf_iterations is not None and arguments.hash_algorithm != 'pbkdf2_sha256':
+        parser.error('--kdf-iterations requires --hash pbkdf2_sha256')
+    if arguments.scrypt_n is not None:
+        if arguments.hash_algorithm != 'scrypt':
+            parser.error('--scrypt-n requires --hash scrypt')
+        if arguments.scrypt_n < 2 or arguments.scrypt_n & (arguments.scrypt_n - 1):
+            parser.error(f'--scrypt-n must be a power of 2 greater than 1, got {arguments.scrypt_n}')
+    if arguments.mask is not None and arguments.pronounceable:
+        parser.error('--mask and --pronounceable cannot be combined')
+    if arguments.class_weights is not None:
+        if arguments.sampling != 'weighted':
+            parser.error('--class-weights requires --sampling weighted')
+        if arguments.alphabet:
+            parser.error('--class-weights cannot be combined with --alphabet')
+    if arguments.alphabet and arguments.sampling not in ALPHABET_SAMPLING_MODES:
+        parser.error(f"--alphabet supports --sampling {' or '.join(ALPHABET_SAMPLING_MODES)} only")
+    if arguments.alphabet and arguments.target_bits is not None:
+        parser.error('--target-bits sizes passwords for the built-in classes and cannot be combined with --alphabet')
+        try:
+            arguments.class_weights = parse_class_weights(arguments.class_weights)
+        except ValueError as error:
+            parser.error(f'--class-weights: {error}')
+    if arguments.engine is not None:
+        conflicts = [option for option, given in (
+            ('--seed', arguments.seed is not None),
+            ('--alphabet', arguments.alphabet),
+            ('--sampling', arguments.sampling != DEFAULT_SAMPLING_MODE),
+        ) if given]
+        if conflicts:
+            parser.error(f"--engine applies to unseeded '{DEFAULT_SAMPLING_MODE}' exports and cannot be combined "
+                         f"with {', '.join(conflicts)}")
+    generator = '--mask' if arguments.mask is not None else '--pronounceable' if arguments.pronounceable else None
+    if generator is not None:
+        conflicts = [option for option, given in (
+            ('--sampling', arguments.sampling != DEFAULT_SAMPLING_MODE),
+            ('--alphabet', arguments.alphabet),
+            ('--target-bits', arguments.target_bits is not None),
+            ('--engine', arguments.engine),
+        ) if given]
+        if conflicts:
+            parser.error(f"{generator} defines the passwords itself and cannot be combined with {', '.join(conflicts)}")
+    return arguments
 
 
 if __name__ == "__main__":
     
+    arguments = parse_arguments()
+
     settings: PasswordSettings = {
         'password_length': DEFAULT_PASSWORD_LENGTH,
         'uppercase': True,
@@ -331,4 +770,52 @@ if __name__ == "__main__":
         'bracket': True,
     }
 
-    run(settings)
\ No newline at end of file
+    history = PasswordHistory(arguments.history) if arguments.history else None
+    sharding: ShardOptions | None = None
+    if arguments.shards:
+        sharding = {'shards': arguments.shards, 'codec': arguments.compress, 'level': arguments.compress_level,
+                    'max_records': arguments.rotate_records, 'max_bytes': arguments.rotate_bytes}
+    kdf_parameters = {}
+    if arguments.kdf_iterations:
+        kdf_parameters['iterations'] = arguments.kdf_iterations
+    if arguments.scrypt_n:
+        kdf_parameters['n'] = arguments.scrypt_n
+    policy = load_policy(arguments.banned_terms) if arguments.banned_terms else None
+    similarity = None
+    if arguments.max_similarity is not None:
+        similarity = SimilarityIndex(threshold=arguments.max_similarity, expected_entries=arguments.count)
+        if history is not None:
+            similarity.add_many(history.iter_passwords())
+    recorder = TraceRecorder(arguments.record_trace, 'cli') if arguments.record_trace else None
+    pronounceable = MarkovModel.load(arguments.pronounceable) if arguments.pronounceable else None
+    start_profiling_from_arguments(arguments)
+    counting_rng = None
+    if arguments.rng_report:
+        counting_rng = CountingRandom(get_thread_rng())
+        set_thread_rng(counting_rng)
+    watchdog = None
+    if arguments.memory_report:
+        watchdog = MemoryWatchdog(report_path=arguments.memory_report).start(arguments.memory_interval)
+
+    try:
+        if arguments.export:
+            run_export(settings, arguments.export, arguments.count, arguments.format,
+                       history, arguments.seed, arguments.sampling,
+                       load_alphabet(arguments.alphabet) if arguments.alphabet else None, policy,
+                       arguments.mask,
+                       pronounceable,
+                       similarity, arguments.hash_algorithm, arguments.hash_workers,
+                       not arguments.hash_only, sharding, arguments.target_bits, arguments.engine,
+                       arguments.class_weights, kdf_parameters)
+        else:
+            run(settings, history, policy, recorder, arguments.target_bits, pronounceable)
+    finally:
+        if history is not None:
+            history.close()
+        if recorder is not None:
+            recorder.close()
+        if watchdog is not None:
+            watchdog.stop()
+        if counting_rng is not None:
+            print(f'Random bits: {format_rng_report(counting_rng.report())}')
+        stop_profiling()
\ No newline at end of file
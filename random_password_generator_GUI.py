@@ -2,9 +2,13 @@ import re
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
-from tkinter.filedialog import asksaveasfile
+from tkinter.filedialog import askopenfilename, asksaveasfilename
 from typing import Type, Dict, List, Any
 from utils import *
+from controller import PasswordController, StrengthView
+from memory_watchdog import DEFAULT_CHECK_INTERVAL
+from strength_table import MAX_TARGET_BITS, format_strength_preview
+from audit import AUDIT_PAGE_SIZE, PasswordFileAudit
 
 # ----------------------------- Constants ----------------------------- #
 
@@ -24,16 +28,26 @@ ABOUT_TEXT = '''The Random Password Generator enables you to generate secure and
     unpredictable passwords through an optional mix of lowercase and uppercase letters,
     numbers and special characters.'''
 
+POLICY_WARNING_PREFIX = 'Policy warning:'
+
 # Globals
 checkbox_variables = []
 checkbox_configs = []
-password_list = []
-password_option = {}
 labelframes = {}
 checkboxes = {}
 buttons = {}
 labels = {}
 
+# File audit: the running audit, its pending `after()` job, the first row
+# shown, and the widgets of the results window
+audit_state = {'audit': None, 'job': None, 'first': 0}
+audit_widgets = {}
+
+# State and handlers live in the UI-independent controller (optional history,
+# banned terms, near-duplicate rejection, workload tracing and the
+# pronounceable model are enabled through the environment)
+controller = PasswordController.from_environment()
+
 
 # ----------------------------- Utility Functions ----------------------------- #
 
@@ -67,97 +81,140 @@ def get_spinbox_password_length() -> int | None:
     return int(spinbox_password_length.get())
 
 
-def set_password_length() -> None:
-    """
-    Sets the password length in the `password_option` dictionary if valid.
-    Raises a ValueError if is invalid.
-
-    Side Effects:
-        Updates global `password_option` if valid.
-
-    Raises:
-        ValueError: If the password length is invalid (e.g., below minimum or above maximum allowed).
-
-    Returns:
-        None
-    """
-    password_length = get_spinbox_password_length()
-    if not is_valid_password_length(password_length):
-        raise ValueError
-    password_option['password_length'] = password_length
-
-
 def get_selected_password() -> str:
     """Fetch the latest selected password from the combobox."""
     return combobox_generated_password.get()
 
 
-def show_password_entropy(*args) -> None:
+def show_password_entropy(view: StrengthView) -> None:
     """
-    Calculates and displays the password entropy in the GUI label.
+    Displays the password entropy in the GUI label.
 
     Side Effects:
-        - Calls `calculate_password_entropy()` to compute the entropy
-        - Formats the result to 2 decimal places
+        - Formats the entropy computed by the controller to 2 decimal places
         - Updates the text of `label_entropy_value` with the result
 
     Returns:
         None
     """
-    selected_password = get_selected_password()
-    password_entropy_value = calculate_password_entropy(selected_password)
-    labels['label_entropy_value'].config(text=f'{password_entropy_value:.2f} bits')
+    labels['label_entropy_value'].config(text=f"{view['entropy']:.2f} bits")
 
 
-def update_password_strength_label() -> None:
+def update_password_strength_label(view: StrengthView) -> None:
     """
     Updates the password strength rating and its associated color in the GUI.
 
     Side Effects:
-    1. Retrieves the strength level and color by calling `calculate_password_strength()`
-    2. Updates the `label_show_strength` widget with:
-       - Text: The strength level (e.g., "🔴 Very Weak")
-       - Foreground color: The associated color code (e.g., "#f01010")
+        Updates the `label_show_strength` widget with:
+        - Text: The strength level (e.g., "🔴 Very Weak")
+        - Foreground color: The associated color code (e.g., "#f01010")
 
     Returns:
         None
     """
-    selected_password = get_selected_password()
-    _, strength_level, strength_color  = calculate_password_strength(selected_password)
-    labels['label_show_strength'].config(text=strength_level, fg=strength_color)
+    labels['label_show_strength'].config(text=view['label'], fg=view['color'])
 
 
-def get_password_options_from_user() -> None:
+def get_password_options_from_user() -> dict[str, bool]:
     """
-    Updates the global `password_option` dictionary based on the current user-selected checkbox values.
+    Reads the character classes selected in the checkboxes.
 
-    Side Effects:
-        - Modifies the global `password_option` dictionary by extracting checkbox states from `checkbox_configs`.
-    
     Returns:
-        None
+        dict[str, bool]: The checkbox states keyed by password option name.
     """
+    options = {}
     for config in checkbox_configs:
         text = config['text']
         checkbox_name = re.sub(r'\s\(.*\)', '', text)
-        variable_value = config['variable'].get()
-        password_option[checkbox_name.lower()] = variable_value
+        options[checkbox_name.lower()] = config['variable'].get()
+    return options
+
 
+def set_spinbox_password_length(password_length: int) -> None:
+    """Writes a password length into the spinbox."""
+    spinbox_password_length.delete(0, 'end')
+    spinbox_password_length.insert(0, str(password_length))
 
-def generate_password() -> str:
+
+def update_strength_preview(*args) -> None:
     """
-    Generates a random password based on the options selected by the user.
+    Shows the expected strength of the current settings, before generating.
 
     Side Effects:
-        - Calls the `random_password_generator()` to generate password.
-        - Appends the generated password to the global `password_list`.
+        - Updates `label_strength_preview` from the precomputed strength table
+        - Asks for a character class when none is checked
+    """
+    try:
+        preview = controller.preview(get_spinbox_password_length(), get_password_options_from_user())
+    except IndexError:
+        labels['label_strength_preview'].config(text='Preview: check at least one character class',
+                                                fg=COLOR_BACKGROUND)
+        return
+    except ValueError:
+        labels['label_strength_preview'].config(text='')
+        return
+    labels['label_strength_preview'].config(text=f'Preview: {format_strength_preview(preview)}',
+                                            fg=preview['color'])
+
+
+def on_settings_change(*args) -> None:
+    """
+    Handles a change of the target bits or of the checked classes.
+
+    Side Effects:
+        - With a target set, writes the shortest length reaching it into the
+          length spinbox (the maximum length if none does)
+        - Refreshes the strength preview
+    """
+    try:
+        target_bits = int(spinbox_target_bits.get())
+    except ValueError:
+        target_bits = 0
+    if target_bits > 0:
+        try:
+            length = controller.length_for_target(target_bits, get_password_options_from_user())
+        except IndexError:
+            pass
+        else:
+            set_spinbox_password_length(length or MAX_PASSWORD_LENGTH)
+    update_strength_preview()
+
+
+def on_pronounceable_toggle() -> None:
+    """
+    Switches between the character-class generator and the pronounceable model.
+
+    Side Effects:
+        - Refreshes the length picked for the target bits and the strength preview
+    """
+    controller.set_pronounceable(pronounceable_variable.get())
+    on_settings_change()
+
+
+def load_combobox_history_page() -> None:
+    """Refreshes the combobox values right before its dropdown opens."""
+    combobox_generated_password.config(values=controller.list_passwords())
+
+
+def on_history_page_click(pages: int) -> None:
+    """
+    Handles the history page buttons: lists an older (`pages` > 0) or newer
+    page of the persistent history in the combobox.
 
     Returns:
-        str: The newely generated password.
+        None
     """
-    generated_password = random_password_generator(password_option)
-    password_list.append(generated_password)
-    return generated_password
+    combobox_generated_password.config(values=controller.turn_history_page(pages))
+    update_history_page_buttons()
+
+
+def update_history_page_buttons() -> None:
+    """Enables the history page buttons that lead to an existing page."""
+    if controller.history is None:
+        return
+    newer, older = controller.history_page_state()
+    button_newer_page.config(state='normal' if newer else 'disabled')
+    button_older_page.config(state='normal' if older else 'disabled')
 
 
 def show_generated_password_in_combobox() -> None:
@@ -165,43 +222,73 @@ def show_generated_password_in_combobox() -> None:
     Displays the list of generated passwords in the combobox widget.
     
     Side Effects:
-        - Updates the values of `combobox_generated_password` with the current `password_list`.
+        - Updates the values of `combobox_generated_password` with the current passwords.
         - Sets the combobox selection to the most recently generated password.
+        - Updates the history page buttons (the newest page is listed again).
 
     Returns:
         None
     """
-    combobox_generated_password.config(values=password_list)
-    combobox_generated_password.set(password_list[-1])
+    passwords = controller.list_passwords()
+    combobox_generated_password.config(values=passwords)
+    combobox_generated_password.set(passwords[-1])
+    update_history_page_buttons()
 
 
-def show_password_strength_in_progressbar() -> None:
+def show_password_strength_in_progressbar(view: StrengthView) -> None:
     """
     Updates the password strength progress bar's value and color based on password entropy.
     
     Side Effects:
-        - Calls `calculate_password_entropy()` to compute the entropy of the current password.
         - Updates the progress bar value and color to visually reflect password strength.
         
     Returns:
         None
     """
-    selected_password = get_selected_password()
-    strength, _, color = calculate_password_strength(selected_password)
-    style.configure('strength.Horizontal.TProgressbar', background=color)
-    progressbar_generated_password.config(value=strength)
+    style.configure('strength.Horizontal.TProgressbar', background=view['color'])
+    progressbar_generated_password.config(value=view['score'])
 
 
-def update_password_strength_display(*args) -> None:
+def show_policy_warning(view: StrengthView) -> None:
     """
-    Updates the entire password strength view, including:
+    Warns in `label_guidance_text` when the selected password contains banned terms.
+
+    Side Effects:
+        - Shows the banned terms found in red, if any.
+        - Clears a previous policy warning once the password passes.
+
+    Returns:
+        None
+    """
+    if controller.policy is None:
+        return
+    banned_terms = view['banned_terms']
+    if banned_terms:
+        labels['label_guidance_text'].config(
+            text=f"{POLICY_WARNING_PREFIX} contains {', '.join(banned_terms)}",
+            fg=STRENGTH_COLORS['very_weak'],
+        )
+    elif labels['label_guidance_text']['text'].startswith(POLICY_WARNING_PREFIX):
+        labels['label_guidance_text'].config(text='')
+
+
+def show_strength_view(view: StrengthView) -> None:
+    """
+    Paints a strength view computed by the controller, including:
         - Entropy display
         - Strength label
         - Progress bar
+        - Banned-term policy warning
     """
-    show_password_entropy()
-    update_password_strength_label()
-    show_password_strength_in_progressbar()
+    show_password_entropy(view)
+    update_password_strength_label(view)
+    show_password_strength_in_progressbar(view)
+    show_policy_warning(view)
+
+
+def update_password_strength_display(*args) -> None:
+    """Updates the entire password strength view for the selected password."""
+    show_strength_view(controller.select(get_selected_password()))
 
 
 def on_generate_password_click() -> None:
@@ -209,13 +296,10 @@ def on_generate_password_click() -> None:
     Handles the event triggered by the 'Generate Password' button.
 
     Steps performed:
-        1. Retrives and validates the user_specified password length.
-        2. Updates `password_option` based on user selections.
-        3. Generates a password using the specified options.
-        4. Displays the generated password in the combobox.
-        5. Shows the password entropy.
-        6. Shows the textual strength indicator.
-        7. Updates the progress bar based on password strength.
+        1. Reads the user-specified password length and character classes.
+        2. Lets the controller validate them and generate a password.
+        3. Displays the generated password in the combobox.
+        4. Shows the password entropy, strength label and progress bar.
     
     Handles:
         - IndexError by showing a checkbox selection error message.
@@ -226,15 +310,11 @@ def on_generate_password_click() -> None:
 
     try:
 
-        set_password_length()
-
-        get_password_options_from_user()
+        view = controller.click_generate(get_spinbox_password_length(), get_password_options_from_user())
 
-        generate_password()
-        
         show_generated_password_in_combobox()
 
-        update_password_strength_display()
+        show_strength_view(view)
 
     except IndexError:
         show_checkbox_error_message()
@@ -245,31 +325,33 @@ def on_generate_password_click() -> None:
 
 def save_password_to_file() -> None:
     """
-    Prompts the user with a file save dialog and writes the given password.
-    
-    Args:
-        password (str): The password to save.
+    Prompts the user with a file save dialog and exports the generated passwords.
+
+    The export format (plain text, NDJSON, CSV or binary) follows the
+    extension chosen in the dialog.
 
     Side Effects:
         - Opens a file dialog to select the save location.
-        - Writes the password content to the selected file.
+        - Writes the generated (or stored history) passwords to the selected file.
 
     Returns:
         None
     """
 
-    file = asksaveasfile(
-            mode='w', 
+    path = asksaveasfilename(
             title='Save Passwords', 
-            filetypes=[('Text Document','*.txt'), ('All Files', '*.*')], 
+            filetypes=[
+                ('Text Document', '*.txt'),
+                ('NDJSON', '*.ndjson'),
+                ('CSV', '*.csv'),
+                ('Binary', '*.bin'),
+                ('All Files', '*.*'),
+            ], 
             defaultextension='.txt', 
         )
 
-    if file:
-        try:
-            file.write("\n".join(password_list))
-        finally:
-            file.close()
+    if path:
+        controller.save(path)
 
 
 def show_save_error_if_empty(password: str) -> bool:
@@ -345,6 +427,153 @@ def show_copy_message() -> None:
     window.after(2000, lambda: labels['label_guidance_text'].config(text=''))
 
 
+def open_audit_window() -> None:
+    """
+    Creates the audit results window, unless it is already open.
+
+    The Treeview only ever holds `AUDIT_PAGE_SIZE` items: scrolling asks the
+    audit for another page instead of inserting every row, so the view stays
+    small for files with millions of lines. Clicking a heading sorts by it.
+    """
+    if 'window' in audit_widgets and audit_widgets['window'].winfo_exists():
+        return
+    top = tk.Toplevel(window)
+    top.title('Password File Audit')
+    top.protocol('WM_DELETE_WINDOW', close_audit_window)
+
+    tree = ttk.Treeview(top, columns=('line', 'entropy', 'label', 'password'), show='headings',
+                        height=AUDIT_PAGE_SIZE)
+    for column, heading, width in (('line', 'Line', 80), ('entropy', 'Entropy', 90),
+                                   ('label', 'Strength', 120), ('password', 'Password', 300)):
+        tree.heading(column, text=heading, command=lambda column=column: sort_audit_rows(column))
+        tree.column(column, width=width, anchor='w')
+    for level in STRENGTH_LEVELS:
+        tree.tag_configure(level['label'], foreground=level['color'])
+    tree.grid(row=0, column=0, sticky='NSEW')
+    tree.bind('<MouseWheel>', lambda event: scroll_audit_rows('scroll', -event.delta // 120, 'units'))
+    tree.bind('<Button-4>', lambda event: scroll_audit_rows('scroll', -1, 'units'))
+    tree.bind('<Button-5>', lambda event: scroll_audit_rows('scroll', 1, 'units'))
+
+    scrollbar = ttk.Scrollbar(top, orient='vertical', command=scroll_audit_rows)
+    scrollbar.grid(row=0, column=1, sticky='NS')
+    progressbar = ttk.Progressbar(top, maximum=100)
+    progressbar.grid(row=1, column=0, columnspan=2, sticky='EW', padx=5, pady=5)
+    status = tk.Label(top, font=FONT_SMALL, anchor='w')
+    status.grid(row=2, column=0, columnspan=2, sticky='EW', padx=5, pady=(0, 5))
+    top.columnconfigure(0, weight=1)
+    top.rowconfigure(0, weight=1)
+    audit_widgets.update(window=top, tree=tree, scrollbar=scrollbar, progressbar=progressbar, status=status)
+
+
+def refresh_audit_rows() -> None:
+    """Shows the page of audited rows starting at `audit_state['first']`."""
+    audit = audit_state['audit']
+    tree = audit_widgets['tree']
+    tree.delete(*tree.get_children())
+    for row in audit.page(audit_state['first']):
+        tree.insert('', 'end', values=(row['line'], f"{row['entropy']:.2f}", row['label'], row['password']),
+                    tags=(row['label'],))
+    rows = max(len(audit), 1)
+    audit_widgets['scrollbar'].set(audit_state['first'] / rows,
+                                   min(audit_state['first'] + AUDIT_PAGE_SIZE, rows) / rows)
+
+
+def scroll_audit_rows(*args) -> None:
+    """
+    Scrollbar and mouse wheel handler: moves the page of shown rows.
+
+    Args:
+        *args: The scrollbar protocol, ('moveto', fraction) or
+            ('scroll', amount, 'units' | 'pages').
+    """
+    audit = audit_state['audit']
+    if audit is None:
+        return
+    if args[0] == 'moveto':
+        first = int(float(args[1]) * len(audit))
+    else:
+        step = AUDIT_PAGE_SIZE if args[2] == 'pages' else 1
+        first = audit_state['first'] + int(args[1]) * step
+    audit_state['first'] = max(0, min(first, len(audit) - AUDIT_PAGE_SIZE))
+    refresh_audit_rows()
+
+
+def sort_audit_rows(key: str) -> None:
+    """Heading click handler: sorts by the column, reversing on a second click."""
+    audit = audit_state['audit']
+    if audit is None or key == 'password':
+        return
+    audit.sort(key, descending=audit.sort_key == key and not audit.descending)
+    audit_state['first'] = 0
+    refresh_audit_rows()
+
+
+def run_audit_step() -> None:
+    """
+    Scores the next time slice of the audited file, then yields to the Tk loop.
+
+    Side Effects:
+        - Updates the progress bar, the counts and the shown rows
+        - Schedules the next step until the file is done
+    """
+    audit = audit_state['audit']
+    finished = audit.step()
+    summary = audit.summary()
+    weak = summary[STRENGTH_LEVELS[0]['label']] + summary[STRENGTH_LEVELS[1]['label']]
+    audit_widgets['progressbar'].config(value=audit.progress())
+    audit_widgets['status'].config(
+        text=f"{'Done' if finished else 'Auditing'}: {summary['total']:,} passwords, {weak:,} weak or very weak"
+    )
+    refresh_audit_rows()
+    audit_state['job'] = None if finished else window.after(1, run_audit_step)
+
+
+def stop_audit() -> None:
+    """Cancels a running audit and releases its file."""
+    if audit_state['job'] is not None:
+        window.after_cancel(audit_state['job'])
+        audit_state['job'] = None
+    if audit_state['audit'] is not None:
+        audit_state['audit'].close()
+        audit_state['audit'] = None
+
+
+def close_audit_window() -> None:
+    """Stops the audit and closes its results window."""
+    stop_audit()
+    audit_widgets.pop('window').destroy()
+
+
+def audit_file() -> None:
+    """
+    Handles the 'Audit File' button: scores every password of a chosen file.
+
+    The file is streamed and scored in short slices scheduled with
+    `window.after`, so the window stays responsive while it runs.
+
+    Handles:
+        - OSError and ValueError (unreadable file) by showing an error message.
+    """
+    path = askopenfilename(
+        title='Audit Password File',
+        filetypes=[
+            ('Password Files', '*.txt *.ndjson *.jsonl *.csv *.bin'),
+            ('All Files', '*.*'),
+        ],
+    )
+    if not path:
+        return
+    stop_audit()
+    try:
+        audit_state['audit'] = PasswordFileAudit(path)
+    except (OSError, ValueError) as error:
+        messagebox.showinfo('Error', f'Cannot audit this file: {error}')
+        return
+    audit_state['first'] = 0
+    open_audit_window()
+    audit_state['job'] = window.after(0, run_audit_step)
+
+
 def copy_to_clipboard() -> None:
     """
     Copies the generated password to clipboard.
@@ -365,7 +594,8 @@ def copy_to_clipboard() -> None:
     
     labelframes['labelframe_generated_password'].clipboard_clear()
     labelframes['labelframe_generated_password'].clipboard_append(generated_password)
-    
+    controller.record('copy')
+
     show_copy_message()
 
 
@@ -374,7 +604,7 @@ def reset_password_ui() -> None:
     Resets all password-related GUI elements to their default empty state.
 
     Side Effects:
-        - Clears the global `password_list`
+        - Clears the controller's in-memory passwords
         - Resets the password combobox (current selection and dropdown values)
         - Clears the entropy value display
         - Resets the strength indicator text
@@ -383,8 +613,7 @@ def reset_password_ui() -> None:
     Returns:
         None
     """
-    global password_list
-    password_list.clear()
+    controller.clear()
     combobox_generated_password.set('')
     combobox_generated_password.config(values=())
     labels['label_entropy_value'].config(text='')
@@ -411,9 +640,23 @@ def close_app() -> None:
     Displays a confirmation dialog and closes the application if user confirms.
     """
     if messagebox.askokcancel("Quit", "Do you want to quit?"):
+        stop_audit()
+        controller.close()
         window.destroy()
 
 
+def check_memory_growth() -> None:
+    """
+    Runs a memory watchdog check and schedules the next one.
+
+    Side Effects:
+        - Snapshots allocations when `RPG_MEMORY_REPORT` enabled the watchdog
+        - Logs a warning with the top allocation sites if growth passes the threshold
+    """
+    controller.watchdog.check()
+    window.after(int(DEFAULT_CHECK_INTERVAL * 1000), check_memory_growth)
+
+
 def _create_widget(
     widget_type: Type[tk.Widget],
     widget_config_list: List[Dict[str, Any]],
@@ -456,7 +699,7 @@ def _create_widget(
 window = tk.Tk()
 window.title('Random Password Generator App')
 window.config(bg=SOFTWARE_COLOR_BACKGROUND)
-window.geometry('700x840')
+window.geometry('700x960')
 window.resizable(width=False, height=False)
 
 
@@ -531,6 +774,19 @@ label_configs = [
         'font': FONT_SMALL,
         'grid': {'row':0, 'column':2, 'padx':(0, 80), 'pady':(30, 30), 'sticky':'w'},
     },
+    {
+        'name': 'label_target_bits',
+        'master': labelframes['labelframe_settings'],
+        'text': 'Target entropy in bits (0 = off): ',
+        'font': FONT_SMALL,
+        'grid': {'row':1, 'column':0, 'padx':(30, 0), 'pady':(0, 20), 'sticky':'w'},
+    },
+    {
+        'name': 'label_strength_preview',
+        'master': labelframes['labelframe_settings'],
+        'font': FONT_SMALL,
+        'grid': {'row':7, 'column':0, 'columnspan':3, 'padx':(30, 0), 'pady':(0, 15), 'sticky':'w'},
+    },
     {
         'name': 'label_random_password',
         'master': labelframes['labelframe_generated_password'],
@@ -622,6 +878,13 @@ button_configs = [
         'command': close_app,
         'grid': {'row':0, 'column':4, 'ipadx':25, 'ipady':10}
     },
+    {
+        'name': 'button_audit_file',
+        'master': labelframes['labelframe_buttons'],
+        'text': 'Audit File',
+        'command': audit_file,
+        'grid': {'row':1, 'column':0, 'columnspan':5, 'pady':(5, 0), 'ipady':5, 'sticky':'EW'}
+    },
 ]
 
 
@@ -633,7 +896,7 @@ checkbox_text = [
     'Minus (-)',
     'Underline (_)',
     'Space ( )',
-    """Symbol (!?@#$%&*^~/|\:;.,\'\')""",
+    f'Symbol ({SYMBOLS})',
     'Bracket ([, ], {, }, (, ), <, >)',
 ]
 
@@ -642,6 +905,7 @@ checkbox_base_config = {
     'master': labelframes['labelframe_settings'],
     'font': FONT_SMALL,
     'variable': tk.BooleanVar,
+    'command': on_settings_change,
     'grid': {'sticky': 'w', 'padx': 20, 'pady': 5}
 }
 
@@ -671,13 +935,35 @@ combobox_generated_password = ttk.Combobox(
     master=labelframes['labelframe_generated_password'],
     width=28,
     font=FONT_MEDIUM,
-    values=password_list,
+    values=controller.list_passwords(),
     textvariable=var,
+    postcommand=load_combobox_history_page,
 )
 combobox_generated_password.grid(row=0, column=1, padx=5)
 combobox_generated_password.bind("<<ComboboxSelected>>", update_password_strength_display)
 
 
+# History pages, offered when a persistent history is enabled (RPG_HISTORY_DB)
+if controller.history is not None:
+    frame_history_pages = tk.Frame(labelframes['labelframe_generated_password'])
+    frame_history_pages.grid(row=0, column=2, padx=(0, 10))
+    button_older_page = tk.Button(
+        master=frame_history_pages,
+        text='◀ Older',
+        font=FONT_SMALL,
+        command=lambda: on_history_page_click(1),
+    )
+    button_older_page.grid(row=0, column=0)
+    button_newer_page = tk.Button(
+        master=frame_history_pages,
+        text='Newer ▶',
+        font=FONT_SMALL,
+        command=lambda: on_history_page_click(-1),
+    )
+    button_newer_page.grid(row=0, column=1)
+    update_history_page_buttons()
+
+
 # Spinbox
 spinbox_password_length = tk.Spinbox(
     master=labelframes['labelframe_settings'], 
@@ -687,6 +973,32 @@ spinbox_password_length = tk.Spinbox(
     relief='sunken',
 )
 spinbox_password_length.grid(row=0, column=1, pady=(30, 30), ipadx=10, ipady=5, sticky='w')
+spinbox_password_length.config(command=update_strength_preview)
+spinbox_password_length.bind('<KeyRelease>', update_strength_preview)
+
+spinbox_target_bits = tk.Spinbox(
+    master=labelframes['labelframe_settings'],
+    from_=0,
+    to=MAX_TARGET_BITS,
+    width=20,
+    relief='sunken',
+    command=on_settings_change,
+)
+spinbox_target_bits.grid(row=1, column=1, pady=(0, 20), ipadx=10, ipady=5, sticky='w')
+spinbox_target_bits.bind('<KeyRelease>', on_settings_change)
+
+
+# Pronounceable mode, offered when a model is loaded (RPG_PRONOUNCEABLE_MODEL)
+pronounceable_variable = tk.BooleanVar()
+if controller.pronounceable is not None:
+    checkbox_pronounceable = tk.Checkbutton(
+        master=labelframes['labelframe_settings'],
+        text='Pronounceable (Markov model)',
+        font=FONT_SMALL,
+        variable=pronounceable_variable,
+        command=on_pronounceable_toggle,
+    )
+    checkbox_pronounceable.grid(row=6, column=0, sticky='w', padx=20, pady=5)
 
 
 # ProgressBar
@@ -701,6 +1013,10 @@ progressbar_generated_password.grid(row=1, column=1, padx=5, pady=10, sticky='SN
 _create_widget(tk.Label, label_configs, labels)
 _create_widget(tk.Button, button_configs, buttons)
 _create_widget(tk.Checkbutton, checkbox_configs, checkboxes)
+update_strength_preview()
+
+if controller.watchdog is not None:
+    window.after(int(DEFAULT_CHECK_INTERVAL * 1000), check_memory_growth)
 
 
 window.mainloop()
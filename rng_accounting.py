@@ -0,0 +1,183 @@
+import math
+import time
+import random
+import argparse
+from typing import Any, Sequence, TypedDict
+from utils import *
+from seeded_streams import CounterRandom
+
+
+# ----------------------------- Constants ----------------------------- #
+
+# Bits `random()` turns into a float
+FLOAT_BITS = 53
+
+# Source class -> bytes it consumes for getrandbits(k), and for one random()
+#   random.Random    : Mersenne Twister, 32-bit words
+#   SystemRandom     : os.urandom, whole bytes
+#   CounterRandom    : SplitMix64 counter stream, 64-bit words
+SOURCE_COSTS = {
+    random.SystemRandom: (lambda k: (k + 7) // 8, 7),
+    CounterRandom: (lambda k: 8 * ((k + 63) // 64), 8),
+    random.Random: (lambda k: 4 * ((k + 31) // 32), 8),
+}
+
+
+class RngReport(TypedDict):
+    """
+    Represents the random bits consumed by a generator, against the entropy delivered.
+
+    Attributes:
+        draws (int): choice() and choices() picks.
+        bits_requested (int): Bits asked from the source (getrandbits widths, 53 per random()).
+        source_bytes (int): Bytes the source actually produced for them.
+        bits_wasted (int): Requested bits of draws rejected by `choice()`'s rejection sampling.
+        entropy_bits (float): Information delivered: log2(n) per uniform pick of n
+            items, the Shannon entropy of the weights per weighted pick.
+        efficiency (float): entropy_bits / (8 * source_bytes).
+    """
+
+    draws: int
+    bits_requested: int
+    source_bytes: int
+    bits_wasted: int
+    entropy_bits: float
+    efficiency: float
+
+
+def get_source_costs(source: random.Random) -> tuple[Any, int]:
+    """Returns the getrandbits byte cost function and the random() byte cost of a source."""
+    for source_type, costs in SOURCE_COSTS.items():
+        if isinstance(source, source_type):
+            return costs
+    return SOURCE_COSTS[random.Random]
+
+
+class CountingRandom(random.Random):
+    """
+    Wrapper around a random generator that accounts for every bit drawn.
+
+    `random()` and `getrandbits()` forward to the source and are counted;
+    `choice()` and `choices()` additionally book the entropy they deliver
+    and, for `choice()`, the draws thrown away by rejection sampling
+    (CPython draws `n.bit_length()` bits and retries while the value is at
+    least `n`). Any code taking an `rng` can be given a `CountingRandom`,
+    and the draws, hence the output, are the same as with the bare source.
+
+    Args:
+        source (random.Random | None, optional): The generator to draw from;
+            the calling thread's generator by default.
+    """
+
+    def __init__(self, source: random.Random | None = None) -> None:
+        self.source = source or get_thread_rng()
+        self.bits_cost, self.float_cost = get_source_costs(self.source)
+        self.reset()
+        super().__init__()
+
+    def seed(self, a: Any = None, version: int = 2) -> None:
+        """Seeding is left to the source."""
+        self.gauss_next = None
+
+    def reset(self) -> None:
+        """Zero every counter."""
+        self.draws = 0
+        self.bits_requested = 0
+        self.source_bytes = 0
+        self.bits_wasted = 0
+        self.entropy_bits = 0.0
+
+    def random(self) -> float:
+        """Return the source's next float, counting 53 bits."""
+        self.bits_requested += FLOAT_BITS
+        self.source_bytes += self.float_cost
+        return self.source.random()
+
+    def getrandbits(self, k: int) -> int:
+        """Return `k` bits of the source, counting them."""
+        self.bits_requested += k
+        self.source_bytes += self.bits_cost(k)
+        return self.source.getrandbits(k)
+
+    def choice(self, seq: Sequence) -> Any:
+        """Pick one item, booking log2(len) bits delivered and the rejected bits."""
+        requested = self.bits_requested
+        item = super().choice(seq)
+        size = len(seq)
+        self.draws += 1
+        self.bits_wasted += self.bits_requested - requested - size.bit_length()
+        self.entropy_bits += math.log2(size)
+        return item
+
+    def choices(self, population: Sequence, weights: Sequence[float] | None = None, *,
+                cum_weights: Sequence[float] | None = None, k: int = 1) -> list:
+        """Pick `k` items with replacement, booking the entropy of every pick."""
+        picks = super().choices(population, weights, cum_weights=cum_weights, k=k)
+        if cum_weights is not None:
+            weights = [high - low for low, high in zip([0.0, *cum_weights], cum_weights)]
+        if weights is None:
+            per_pick = math.log2(len(population))
+        else:
+            total = sum(weights)
+            per_pick = -sum(weight / total * math.log2(weight / total) for weight in weights if weight > 0)
+        self.draws += k
+        self.entropy_bits += per_pick * k
+        return picks
+
+    def report(self) -> RngReport:
+        """Returns the counters, with the delivered entropy per source bit."""
+        return {
+            'draws': self.draws,
+            'bits_requested': self.bits_requested,
+            'source_bytes': self.source_bytes,
+            'bits_wasted': self.bits_wasted,
+            'entropy_bits': self.entropy_bits,
+            'efficiency': self.entropy_bits / (8 * self.source_bytes) if self.source_bytes else 0.0,
+        }
+
+
+def format_rng_report(report: RngReport, passwords: int | None = None) -> str:
+    """Formats a report on one line, per password when the password count is given."""
+    scale = 1 / passwords if passwords else 1
+    unit = ' per password' if passwords else ''
+    return (f"{report['source_bytes'] * 8 * scale:,.1f} source bits ({report['bits_requested'] * scale:,.1f} requested, "
+            f"{report['bits_wasted'] * scale:,.1f} rejected) for {report['entropy_bits'] * scale:,.1f} bits{unit}, "
+            f"{report['efficiency']:.0%} efficient")
+
+
+def measure_rng_consumption(settings: PasswordSettings, count: int, source: random.Random,
+                            sampling: str = DEFAULT_SAMPLING_MODE) -> RngReport:
+    """
+    Generate `count` passwords through a `CountingRandom` and report its counters.
+
+    Args:
+        settings (PasswordSettings): The settings used for every password.
+        count (int): Number of passwords.
+        source (random.Random): The generator being measured.
+        sampling (str, optional): One of `SAMPLING_MODES`.
+
+    Returns:
+        RngReport: Consumption over the whole run.
+    """
+    rng = CountingRandom(source)
+    for _ in range(count):
+        random_password_generator(settings, rng, sampling)
+    return rng.report()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Random bits consumed per password, by sampling mode and source')
+    parser.add_argument('--count', type=int, default=20_000)
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    arguments = parser.parse_args()
+
+    settings: PasswordSettings = {'password_length': arguments.length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    sources = {'Random': random.Random(), 'SystemRandom': random.SystemRandom(), 'CounterRandom': CounterRandom(1)}
+    for sampling in SAMPLING_MODES:
+        for name, source in sources.items():
+            start = time.perf_counter()
+            report = measure_rng_consumption(settings, arguments.count, source, sampling)
+            rate = arguments.count / (time.perf_counter() - start)
+            print(f'{sampling:<12}{name:<14}{rate:>10,.0f}/sec  {format_rng_report(report, arguments.count)}')
@@ -0,0 +1,193 @@
+import math
+import time
+import argparse
+import numpy as np
+from typing import Sequence
+from utils import *
+
+
+# ----------------------------- Constants ----------------------------- #
+DEFAULT_SAMPLE_CHARS = 10_000_000
+SAMPLE_CHUNK_PASSWORDS = 20_000
+
+
+def theoretical_entropy_per_char(
+    settings: PasswordSettings,
+    sampling: str,
+    class_weights: dict[str, float] | None = None,
+) -> float:
+    """
+    Computes the exact Shannon entropy per character of a sampling mode.
+
+    Args:
+        settings (PasswordSettings): The settings selecting the enabled classes.
+        sampling (str): One of `SAMPLING_MODES`.
+        class_weights (dict[str, float] | None, optional): Weights for 'weighted'.
+
+    Returns:
+        float: Bits of entropy per generated character.
+    """
+    probabilities = get_character_weights(settings, sampling, class_weights).values()
+    return -sum(p * math.log2(p) for p in probabilities if p > 0)
+
+
+def sample_characters(
+    settings: PasswordSettings,
+    sampling: str,
+    total_chars: int,
+    class_weights: dict[str, float] | None = None,
+) -> np.ndarray:
+    """
+    Generates passwords until `total_chars` characters have been drawn.
+
+    Args:
+        settings (PasswordSettings): The settings used for every password.
+        sampling (str): One of `SAMPLING_MODES`.
+        total_chars (int): Number of characters to collect (rounded down to
+            whole passwords).
+        class_weights (dict[str, float] | None, optional): Weights for 'weighted'.
+
+    Returns:
+        np.ndarray: A (passwords, password_length) uint8 array of ASCII codes.
+    """
+    password_length = settings['password_length']
+    remaining = total_chars // password_length
+    chunks = []
+    while remaining > 0:
+        size = min(SAMPLE_CHUNK_PASSWORDS, remaining)
+        text = ''.join(
+            random_password_generator(settings, sampling=sampling, class_weights=class_weights)
+            for _ in range(size)
+        )
+        chunks.append(np.frombuffer(text.encode('ascii'), dtype=np.uint8).reshape(size, password_length))
+        remaining -= size
+    return np.concatenate(chunks)
+
+
+def chi_square_test(counts: np.ndarray, probabilities: np.ndarray) -> tuple[float, int, float]:
+    """
+    Chi-square goodness-of-fit of observed counts against the intended distribution.
+
+    Args:
+        counts (np.ndarray): Observed count of every alphabet character.
+        probabilities (np.ndarray): Intended probability of every alphabet character.
+
+    Returns:
+        tuple[float, int, float]: The statistic, the degrees of freedom and the
+            normal-approximation z-score ((chi2 - dof) / sqrt(2 * dof)).
+    """
+    expected = counts.sum() * probabilities
+    statistic = float(((counts - expected) ** 2 / expected).sum())
+    dof = counts.size - 1
+    z_score = (statistic - dof) / math.sqrt(2 * dof) if dof else 0.0
+    return statistic, dof, z_score
+
+
+def analyze_sample(sample: np.ndarray, alphabet: np.ndarray, probabilities: np.ndarray) -> dict:
+    """
+    Runs the frequency tests over a sample of generated characters.
+
+    Args:
+        sample (np.ndarray): (passwords, password_length) uint8 array.
+        alphabet (np.ndarray): ASCII codes of the union alphabet.
+        probabilities (np.ndarray): Intended probability of every alphabet
+            character under the sampled mode.
+
+    Returns:
+        dict: Measured entropy per character, the overall chi-square test and
+            the worst per-position chi-square z-score.
+    """
+    counts = np.bincount(sample.ravel(), minlength=256)[alphabet].astype(np.float64)
+    frequencies = counts / counts.sum()
+    nonzero = frequencies[frequencies > 0]
+    measured_entropy = float(-(nonzero * np.log2(nonzero)).sum())
+
+    statistic, dof, z_score = chi_square_test(counts, probabilities)
+
+    # Per-position counts: one bincount over (position * 256 + byte)
+    positions = np.arange(sample.shape[1], dtype=np.int64) * 256
+    position_counts = np.bincount(
+        (sample.astype(np.int64) + positions).ravel(), minlength=256 * sample.shape[1]
+    ).reshape(sample.shape[1], 256)[:, alphabet].astype(np.float64)
+    position_z_scores = [chi_square_test(row, probabilities)[2] for row in position_counts]
+
+    return {
+        'characters': int(sample.size),
+        'measured_entropy': measured_entropy,
+        'chi_square': statistic,
+        'dof': dof,
+        'z_score': z_score,
+        'max_position_z_score': max(position_z_scores),
+    }
+
+
+def run_quality_report(
+    settings: PasswordSettings,
+    total_chars: int = DEFAULT_SAMPLE_CHARS,
+    modes: Sequence[str] = SAMPLING_MODES,
+    class_weights: dict[str, float] | None = None,
+) -> list[dict]:
+    """
+    Measures every sampling mode and compares it with the reported entropy.
+
+    Every mode is tested against its own distribution from
+    `get_character_weights()`; chi-square z-scores far above ~3 mean the
+    generator does not draw what the mode intends.
+
+    Args:
+        settings (PasswordSettings): The settings used for every password.
+        total_chars (int, optional): Characters sampled per mode.
+        modes (Sequence[str], optional): The sampling modes to test.
+        class_weights (dict[str, float] | None, optional): Weights for 'weighted'.
+
+    Returns:
+        list[dict]: One result dictionary per mode.
+    """
+    alphabet = np.frombuffer(
+        ''.join(get_character_weights(settings, 'uniform')).encode('ascii'), dtype=np.uint8
+    )
+    results = []
+    for mode in modes:
+        start = time.perf_counter()
+        sample = sample_characters(settings, mode, total_chars, class_weights)
+        weights = get_character_weights(settings, mode, class_weights)
+        probabilities = np.array([weights[chr(code)] for code in alphabet])
+        result = analyze_sample(sample, alphabet, probabilities)
+        result.update({
+            'mode': mode,
+            'theoretical_entropy': theoretical_entropy_per_char(settings, mode, class_weights),
+            'reported_entropy': math.log2(alphabet.size),
+            'seconds': time.perf_counter() - start,
+        })
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Statistical quality of the sampling modes')
+    parser.add_argument('--chars', type=int, default=DEFAULT_SAMPLE_CHARS,
+                        help='characters sampled per mode')
+    parser.add_argument('--length', type=int, default=MAX_PASSWORD_LENGTH)
+    parser.add_argument('--modes', nargs='+', choices=SAMPLING_MODES, default=list(SAMPLING_MODES))
+    parser.add_argument('--class-weights', metavar='CLASS=WEIGHT,...',
+                        help="per-class weights of the 'weighted' mode, e.g. 'uppercase=3,symbol=0.5'")
+    arguments = parser.parse_args()
+    class_weights = None
+    if arguments.class_weights is not None:
+        try:
+            class_weights = parse_class_weights(arguments.class_weights)
+        except ValueError as error:
+            parser.error(f'--class-weights: {error}')
+
+    settings: PasswordSettings = {'password_length': arguments.length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    for result in run_quality_report(settings, arguments.chars, arguments.modes, class_weights):
+        print(
+            f"{result['mode']:<12} chars={result['characters']:,} "
+            f"measured={result['measured_entropy']:.4f} "
+            f"theoretical={result['theoretical_entropy']:.4f} "
+            f"reported={result['reported_entropy']:.4f} bits/char  "
+            f"chi2={result['chi_square']:.1f} (dof {result['dof']}, z={result['z_score']:.1f}, "
+            f"worst position z={result['max_position_z_score']:.1f})  {result['seconds']:.1f}s"
+        )
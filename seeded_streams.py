@@ -0,0 +1,236 @@
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator
+from utils import *
+from alphabets import Alphabet
+from password_policy import generate_filtered_password
+
+
+# ----------------------------- Constants ----------------------------- #
+MASK_64 = (1 << 64) - 1
+SPLITMIX_GAMMA = 0x9E3779B97F4A7C15
+
+# Every password owns a block of 2**32 counters, so password `i` can be
+# generated without producing any of the passwords before it.
+DRAWS_PER_PASSWORD_BITS = 32
+
+
+def splitmix64(value: int) -> int:
+    """
+    Apply the SplitMix64 finalizer to a 64-bit integer.
+
+    Args:
+        value (int): The input word.
+
+    Returns:
+        int: A well-mixed 64-bit output word.
+    """
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & MASK_64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & MASK_64
+    return value ^ (value >> 31)
+
+
+class CounterRandom(random.Random):
+    """
+    Counter-based pseudo-random generator with O(1) jump-ahead.
+
+    Output word `n` is `splitmix64(key + n * GAMMA)`, so the state is just a
+    key and a counter: any position of the stream can be reached by setting
+    the counter, without producing the words before it. All the usual
+    `random.Random` methods (`choice`, `randrange`, `shuffle`, ...) work on top
+    of it because `random()` and `getrandbits()` are overridden.
+
+    Not suitable for secrets: it exists for reproducible load tests and fixtures.
+
+    Args:
+        seed (int): The stream seed.
+        counter (int, optional): The starting position in the stream.
+    """
+
+    def __init__(self, seed: int = 0, counter: int = 0) -> None:
+        super().__init__(seed)
+        self.counter = counter
+
+    def seed(self, a: int = 0, version: int = 2) -> None:
+        """Derive the stream key from an integer seed and rewind to position 0."""
+        self.key = splitmix64(int(a) & MASK_64)
+        self.counter = 0
+        self.gauss_next = None
+
+    def getstate(self) -> tuple[int, int]:
+        """Return the (key, counter) pair describing the stream position."""
+        return self.key, self.counter
+
+    def setstate(self, state: tuple[int, int]) -> None:
+        """Restore a position previously returned by `getstate()`."""
+        self.key, self.counter = state
+
+    def jump(self, steps: int) -> None:
+        """Skip `steps` output words in O(1)."""
+        self.counter += steps
+
+    def seek(self, position: int) -> None:
+        """Move to an absolute position of the stream in O(1)."""
+        self.counter = position
+
+    def next_word(self) -> int:
+        """Return the next 64-bit output word and advance the counter."""
+        word = splitmix64((self.key + self.counter * SPLITMIX_GAMMA) & MASK_64)
+        self.counter += 1
+        return word
+
+    def random(self) -> float:
+        """Return the next float in [0.0, 1.0) built from 53 random bits."""
+        return (self.next_word() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k: int) -> int:
+        """Return a non-negative integer with `k` random bits."""
+        if k < 0:
+            raise ValueError('number of bits must be non-negative')
+        value = 0
+        produced = 0
+        while produced < k:
+            value |= self.next_word() << produced
+            produced += 64
+        return value & ((1 << k) - 1)
+
+
+class SeededPasswordStream:
+    """
+    Reproducible, randomly addressable sequence of passwords.
+
+    Password `i` is always drawn from its own block of the counter stream,
+    so the sequence is the same whether one worker produces it all or many
+    workers produce disjoint slices of it.
+
+    Args:
+        seed (int): The stream seed.
+        settings (PasswordSettings): The settings used for every password.
+        sampling (str, optional): One of `SAMPLING_MODES`.
+        alphabet (Alphabet | None, optional): Custom alphabet to draw from.
+        class_weights (dict[str, float] | None, optional): Weights for 'weighted'.
+    """
+
+    def __init__(self, seed: int, settings: PasswordSettings,
+                 sampling: str = DEFAULT_SAMPLING_MODE, alphabet: Alphabet | None = None,
+                 class_weights: dict[str, float] | None = None) -> None:
+        self.seed = seed
+        self.settings = settings
+        self.sampling = sampling
+        self.alphabet = alphabet
+        self.class_weights = class_weights
+        self.rng = CounterRandom(seed)
+
+    def _draw(self) -> str:
+        """Draw the next candidate from the current stream position."""
+        if self.alphabet is not None:
+            return self.alphabet.generate_password(self.settings, self.rng, self.sampling)
+        return random_password_generator(self.settings, self.rng, self.sampling, self.class_weights)
+
+    def password_at(self, index: int, accept: Callable[[str], bool] | None = None) -> str:
+        """
+        Generate the password at a given position of the sequence.
+
+        Args:
+            index (int): The zero-based position.
+            accept (Callable[[str], bool] | None, optional): Filter stage; rejected
+                candidates are redrawn from the same position's block, so
+                filtered sequences stay reproducible too.
+
+        Returns:
+            str: The password, identical on every run for the same seed and settings.
+        """
+        self.rng.seek(index << DRAWS_PER_PASSWORD_BITS)
+        if accept is None:
+            return self._draw()
+        return generate_filtered_password(self._draw, accept)
+
+    def generate(
+        self,
+        start: int,
+        count: int,
+        accept: Callable[[str], bool] | None = None,
+    ) -> Iterator[str]:
+        """
+        Generate `count` consecutive passwords starting at position `start`.
+
+        Args:
+            start (int): The first position.
+            count (int): Number of passwords.
+            accept (Callable[[str], bool] | None, optional): Filter stage.
+
+        Yields:
+            str: The passwords of the slice, in order.
+        """
+        for index in range(start, start + count):
+            yield self.password_at(index, accept)
+
+
+def worker_slice(worker: int, workers: int, total: int) -> tuple[int, int]:
+    """
+    Split `total` items into contiguous, non-overlapping worker slices.
+
+    Args:
+        worker (int): Zero-based worker index.
+        workers (int): Number of workers.
+        total (int): Total number of items.
+
+    Returns:
+        tuple[int, int]: The (start, count) of the worker's slice.
+    """
+    base, extra = divmod(total, workers)
+    start = worker * base + min(worker, extra)
+    return start, base + (1 if worker < extra else 0)
+
+
+def _generate_slice(seed: int, settings: PasswordSettings, start: int, count: int) -> list[str]:
+    """Process pool entry point: generate one slice of a seeded stream."""
+    return list(SeededPasswordStream(seed, settings).generate(start, count))
+
+
+def generate_seeded_passwords(
+    seed: int,
+    settings: PasswordSettings,
+    total: int,
+    workers: int = 1,
+) -> list[str]:
+    """
+    Generate the first `total` passwords of a seeded stream with a process pool.
+
+    Args:
+        seed (int): The stream seed.
+        settings (PasswordSettings): The settings used for every password.
+        total (int): Number of passwords.
+        workers (int, optional): Number of worker processes.
+
+    Returns:
+        list[str]: The passwords, identical for any number of workers.
+    """
+    if workers <= 1:
+        return _generate_slice(seed, settings, 0, total)
+
+    slices = [worker_slice(worker, workers, total) for worker in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_generate_slice, seed, settings, start, count)
+            for start, count in slices
+        ]
+        return [password for future in futures for password in future.result()]
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Check seeded streams are worker-independent')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--count', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    arguments = parser.parse_args()
+
+    settings: PasswordSettings = {'password_length': arguments.length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    single = generate_seeded_passwords(arguments.seed, settings, arguments.count, 1)
+    parallel = generate_seeded_passwords(arguments.seed, settings, arguments.count, arguments.workers)
+    print(f'first passwords : {single[:3]}')
+    print(f'1 vs {arguments.workers} workers identical: {single == parallel}')
@@ -0,0 +1,360 @@
+import os
+import bz2
+import gzip
+import json
+import lzma
+import time
+import queue
+import hashlib
+import argparse
+import threading
+from typing import Callable, Iterable, Sequence, TypedDict
+from utils import *
+from exporters import EXPORT_EXTENSIONS, EXPORT_FORMATS, PasswordRecord, generate_password_record_batches
+
+
+# ----------------------------- Constants ----------------------------- #
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+SHARD_QUEUE_DEPTH = 4
+
+# Codec name -> (file extension, compress(data, level), default level, level range)
+# Every batch is compressed on its own: gzip members, bz2 streams and xz
+# streams may be concatenated, and the standard library readers
+# (gzip.open, bz2.open, lzma.open) read such files back as one stream.
+COMPRESSION_CODECS: dict[str, tuple[str, Callable[[bytes, int], bytes], int, range]] = {
+    'gzip': ('.gz', lambda data, level: gzip.compress(data, compresslevel=level), 6, range(0, 10)),
+    'bz2': ('.bz2', lambda data, level: bz2.compress(data, compresslevel=level), 9, range(1, 10)),
+    'lzma': ('.xz', lambda data, level: lzma.compress(data, preset=level), 6, range(0, 10)),
+    'none': ('', lambda data, level: data, 0, range(0, 1)),
+}
+
+
+class ShardOptions(TypedDict):
+    """
+    Represents the layout of a sharded export.
+
+    Attributes:
+        shards (int): Number of shard files written in parallel.
+        codec (str): A key of `COMPRESSION_CODECS`.
+        level (int | None): Compression level, None for the codec default.
+        max_records (int | None): Rotate a shard file after this many records.
+        max_bytes (int | None): Rotate a shard file once it reaches this compressed size.
+    """
+
+    shards: int
+    codec: str
+    level: int | None
+    max_records: int | None
+    max_bytes: int | None
+
+
+def positive_int(text: str) -> int:
+    """Argparse type for shard counts and rotation limits: an integer of at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {text!r}") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+class _ShardLane:
+    """
+    One shard: a worker thread that encodes, compresses and writes the
+    batches queued for it, rotating its output file when a limit is hit.
+
+    The compressors release the GIL, so lanes compress in parallel with each
+    other and with the generating thread.
+    """
+
+    def __init__(self, writer: 'ShardedWriter', number: int) -> None:
+        self.writer = writer
+        self.number = number
+        self.part = 0
+        self.file = None
+        self.files: list[dict] = []
+        self.error: BaseException | None = None
+        self.queue: queue.Queue = queue.Queue(SHARD_QUEUE_DEPTH)
+        self.thread = threading.Thread(target=self._run, name=f'shard-{number}', daemon=True)
+        self.thread.start()
+
+    def _open(self) -> None:
+        """Start the next part file of this shard."""
+        writer = self.writer
+        name = f'{writer.prefix}-{self.number:03d}-{self.part:05d}{writer.extension}'
+        self.part += 1
+        self.file = open(os.path.join(writer.directory, name), 'wb')
+        self.files.append({'name': name, 'shard': self.number, 'records': 0, 'bytes': 0})
+        self.digest = hashlib.sha256()
+        if writer.header:
+            self._write(writer.compress(writer.header, writer.level))
+
+    def _write(self, data: bytes) -> None:
+        self.file.write(data)
+        self.digest.update(data)
+        self.files[-1]['bytes'] += len(data)
+
+    def _close(self) -> None:
+        """Finish the current part file and record its checksum."""
+        if self.file is not None:
+            self.file.close()
+            self.files[-1]['sha256'] = self.digest.hexdigest()
+            self.file = None
+
+    def _full(self) -> bool:
+        current = self.files[-1]
+        limits = self.writer
+        return ((limits.max_records is not None and current['records'] >= limits.max_records)
+                or (limits.max_bytes is not None and current['bytes'] >= limits.max_bytes))
+
+    def _run(self) -> None:
+        writer = self.writer
+        try:
+            while (records := self.queue.get()) is not None:
+                if self.error is not None:
+                    continue
+                start = 0
+                while start < len(records):
+                    if self.file is None or self._full():
+                        self._close()
+                        self._open()
+                    room = len(records) - start
+                    if writer.max_records is not None:
+                        room = min(room, writer.max_records - self.files[-1]['records'])
+                    chunk = records[start:start + room]
+                    self._write(writer.compress(writer.encode(chunk), writer.level))
+                    self.files[-1]['records'] += len(chunk)
+                    start += room
+        except BaseException as error:
+            self.error = error
+            while self.queue.get() is not None:
+                pass
+        finally:
+            self._close()
+
+
+class ShardedWriter:
+    """
+    Sink writing record batches across N compressed shard files.
+
+    Batches are dealt round-robin to the shards; every shard has its own
+    worker thread and a bounded queue, so generation only waits when all
+    compressors are busy, and end-to-end throughput is set by the slower of
+    the two stages. Closing the writer waits for the shards and writes a
+    manifest listing every file with its record count, size and SHA-256.
+    A run that failed (in the producer or in a shard) gets no manifest, so
+    `verify_manifest()` never accepts a truncated export.
+
+    Args:
+        directory (str): Output directory, created if needed.
+        export_format (str, optional): A key of `formats`.
+        options (ShardOptions | None, optional): Shard count, codec, level and rotation limits.
+        prefix (str, optional): File name prefix.
+        formats (dict, optional): Format name -> (header, batch encoder);
+            `EXPORT_FORMATS` by default, `CREDENTIAL_FORMATS` for hashed records.
+
+    Raises:
+        ValueError: If the format, codec or level is not supported, or a
+            rotation limit is not positive.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        export_format: str = 'text',
+        options: ShardOptions | None = None,
+        prefix: str = 'passwords',
+        formats: dict[str, tuple[bytes, Callable[[Sequence[dict]], bytes]]] = EXPORT_FORMATS,
+    ) -> None:
+        options = options or {'shards': os.cpu_count() or 1, 'codec': 'gzip', 'level': None,
+                              'max_records': None, 'max_bytes': None}
+        if export_format not in formats:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        for limit in ('max_records', 'max_bytes'):
+            if options[limit] is not None and options[limit] < 1:
+                raise ValueError(f"{limit} must be a positive integer, got {options[limit]}")
+        if options['codec'] not in COMPRESSION_CODECS:
+            raise ValueError(f"Unsupported compression codec: {options['codec']}")
+        codec_extension, self.compress, default_level, levels = COMPRESSION_CODECS[options['codec']]
+        self.level = default_level if options['level'] is None else options['level']
+        if self.level not in levels:
+            raise ValueError(f"Compression level of {options['codec']} must be in {levels.start}-{levels.stop - 1}")
+
+        format_extension = next(
+            (extension for extension, name in EXPORT_EXTENSIONS.items() if name == export_format), ''
+        )
+        self.directory = directory
+        self.prefix = prefix
+        self.export_format = export_format
+        self.options = options
+        self.extension = format_extension + codec_extension
+        self.header, self.encode = formats[export_format]
+        self.max_records = options['max_records']
+        self.max_bytes = options['max_bytes']
+        os.makedirs(directory, exist_ok=True)
+
+        self.batches = 0
+        self.closed = False
+        self.lanes = [_ShardLane(self, number) for number in range(max(1, options['shards']))]
+
+    def __enter__(self) -> 'ShardedWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close(complete=exc_info[0] is None)
+
+    def write_batch(self, records: Sequence[PasswordRecord | dict]) -> None:
+        """
+        Queue one batch for the next shard, blocking while its queue is full.
+
+        Raises:
+            Exception: The error of a failed shard worker, re-raised here.
+        """
+        lane = self.lanes[self.batches % len(self.lanes)]
+        if lane.error is not None:
+            raise lane.error
+        lane.queue.put(records)
+        self.batches += 1
+
+    def write_batches(self, batches: Iterable[Sequence[PasswordRecord | dict]]) -> int:
+        """
+        Queue every batch, then close the writer.
+
+        Returns:
+            int: The number of records written.
+        """
+        with self:
+            for batch in batches:
+                self.write_batch(batch)
+        return self.manifest['records']
+
+    def close(self, complete: bool = True) -> None:
+        """
+        Wait for the shard workers, then write the manifest atomically.
+
+        Args:
+            complete (bool, optional): False when the producer failed; the
+                manifest is then left out, as it is when a shard failed.
+
+        Raises:
+            Exception: The error of a failed shard worker, re-raised here.
+        """
+        if not self.closed:
+            self.closed = True
+            for lane in self.lanes:
+                lane.queue.put(None)
+            for lane in self.lanes:
+                lane.thread.join()
+            manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+            if not complete or any(lane.error is not None for lane in self.lanes):
+                # A manifest left by an earlier run must not vouch for these files
+                if os.path.exists(manifest_path):
+                    os.remove(manifest_path)
+            else:
+                files = sorted((file for lane in self.lanes for file in lane.files), key=lambda file: file['name'])
+                self.manifest = {
+                    'version': MANIFEST_VERSION,
+                    'format': self.export_format,
+                    'codec': self.options['codec'],
+                    'level': self.level,
+                    'records': sum(file['records'] for file in files),
+                    'bytes': sum(file['bytes'] for file in files),
+                    'files': files,
+                }
+                with open(f'{manifest_path}.tmp', 'w', encoding='utf-8') as file:
+                    json.dump(self.manifest, file, indent=2)
+                os.replace(f'{manifest_path}.tmp', manifest_path)
+        for lane in self.lanes:
+            if lane.error is not None:
+                raise lane.error
+
+
+def verify_manifest(directory: str) -> list[str]:
+    """
+    Check every shard file against the manifest.
+
+    Args:
+        directory (str): The output directory of a `ShardedWriter`.
+
+    Raises:
+        OSError: If there is no manifest, e.g. because the export failed.
+
+    Returns:
+        list[str]: The names of missing or corrupted files (empty if all match).
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as file:
+        manifest = json.load(file)
+    bad = []
+    for entry in manifest['files']:
+        digest = hashlib.sha256()
+        try:
+            with open(os.path.join(directory, entry['name']), 'rb') as file:
+                while chunk := file.read(1 << 20):
+                    digest.update(chunk)
+        except OSError:
+            bad.append(entry['name'])
+            continue
+        if digest.hexdigest() != entry['sha256']:
+            bad.append(entry['name'])
+    return bad
+
+
+def benchmark_sharded_writer(directory: str, count: int, options: ShardOptions, password_length: int) -> dict:
+    """
+    Time generation alone, compression alone and the overlapped pipeline.
+
+    Args:
+        directory (str): Scratch output directory.
+        count (int): Number of passwords.
+        options (ShardOptions): Shard layout and codec.
+        password_length (int): Length of the generated passwords.
+
+    Returns:
+        dict: Passwords/sec of every stage and of the pipeline, and the compressed size.
+    """
+    settings: PasswordSettings = {'password_length': password_length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+
+    start = time.perf_counter()
+    batches = list(generate_password_record_batches(settings, count))
+    generate_rate = count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    ShardedWriter(directory, options=options).write_batches(batches)
+    compress_rate = count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    writer = ShardedWriter(directory, options=options)
+    writer.write_batches(generate_password_record_batches(settings, count))
+    pipeline_rate = count / (time.perf_counter() - start)
+
+    return {
+        'generate_per_second': generate_rate,
+        'compress_per_second': compress_rate,
+        'pipeline_per_second': pipeline_rate,
+        'bytes': writer.manifest['bytes'],
+        'files': len(writer.manifest['files']),
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Sharded compressed writer benchmark')
+    parser.add_argument('directory', help='scratch output directory')
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    parser.add_argument('--shards', type=positive_int, default=os.cpu_count() or 1)
+    parser.add_argument('--codec', choices=sorted(COMPRESSION_CODECS), default='gzip')
+    parser.add_argument('--level', type=int)
+    parser.add_argument('--max-records', type=positive_int)
+    arguments = parser.parse_args()
+
+    options: ShardOptions = {'shards': arguments.shards, 'codec': arguments.codec, 'level': arguments.level,
+                             'max_records': arguments.max_records, 'max_bytes': None}
+    report = benchmark_sharded_writer(arguments.directory, arguments.count, options, arguments.length)
+    print(f"generate only : {report['generate_per_second']:>12,.0f} passwords/sec")
+    print(f"write only    : {report['compress_per_second']:>12,.0f} passwords/sec")
+    print(f"pipelined     : {report['pipeline_per_second']:>12,.0f} passwords/sec")
+    print(f"output        : {report['bytes']:,} bytes in {report['files']} files")
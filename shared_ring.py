@@ -0,0 +1,285 @@
+import time
+import struct
+import argparse
+import statistics
+import multiprocessing
+from typing import Sequence
+from multiprocessing import shared_memory
+from utils import *
+from password_buffers import generate_password_into, wipe_buffer
+
+
+# ----------------------------- Constants ----------------------------- #
+DEFAULT_RING_CAPACITY = 4096
+DEFAULT_SLOT_WIDTH = 64
+PRODUCER_POLL_SECONDS = 0.1
+
+# Shared header: next sequence number to write (producer only), then the
+# next sequence number to read (consumers, under the read lock)
+RING_COUNTER = struct.Struct('<Q')
+RING_HEAD_OFFSET = 0
+RING_TAIL_OFFSET = RING_COUNTER.size
+RING_HEADER_SIZE = 2 * RING_COUNTER.size
+
+# Every slot is a one-byte password length followed by `slot_width` bytes
+SLOT_LENGTH_BYTES = 1
+
+
+class SharedPasswordRing:
+    """
+    Ring buffer of fixed-width password slots in `multiprocessing.shared_memory`.
+
+    One producer process fills slots; any number of consumer processes claim
+    them. Two semaphores count filled and free slots, and a single lock is
+    held by a consumer only for the few microseconds it takes to copy one
+    slot out and wipe it, so a slot is never read twice or overwritten while
+    being read.
+
+    Create the ring in the parent process and hand it to the producer and
+    consumer processes as a `Process` argument (the synchronization
+    primitives are inherited, the shared memory is re-attached by name).
+
+    Args:
+        capacity (int, optional): Number of slots.
+        slot_width (int, optional): Maximum password length in bytes (< 256).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_RING_CAPACITY, slot_width: int = DEFAULT_SLOT_WIDTH) -> None:
+        if not 0 < slot_width < 256:
+            raise ValueError('slot_width must be between 1 and 255 bytes')
+        self.capacity = capacity
+        self.slot_width = slot_width
+        self.slot_size = SLOT_LENGTH_BYTES + slot_width
+        self.memory = shared_memory.SharedMemory(
+            create=True, size=RING_HEADER_SIZE + capacity * self.slot_size
+        )
+        self.name = self.memory.name
+        self.owner = True
+        RING_COUNTER.pack_into(self.memory.buf, RING_HEAD_OFFSET, 0)
+        RING_COUNTER.pack_into(self.memory.buf, RING_TAIL_OFFSET, 0)
+
+        self.filled = multiprocessing.Semaphore(0)
+        self.free = multiprocessing.Semaphore(capacity)
+        self.read_lock = multiprocessing.Lock()
+        self.stop_event = multiprocessing.Event()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['memory']
+        state['owner'] = False
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.memory = shared_memory.SharedMemory(name=self.name)
+
+    def _slot(self, sequence: int) -> memoryview:
+        """Return the shared memory view of the slot holding `sequence`."""
+        start = RING_HEADER_SIZE + (sequence % self.capacity) * self.slot_size
+        return self.memory.buf[start:start + self.slot_size]
+
+    def produce(self, settings: PasswordSettings, timeout: float | None = None) -> bool:
+        """
+        Generate one password straight into the next free slot.
+
+        Only one process may produce.
+
+        Args:
+            settings (PasswordSettings): The settings of the password.
+            timeout (float | None, optional): Seconds to wait for a free slot.
+
+        Raises:
+            ValueError: If the password length exceeds the slot width.
+
+        Returns:
+            bool: False if no slot became free in time.
+        """
+        if settings['password_length'] > self.slot_width:
+            raise ValueError(f"Password length exceeds the slot width of {self.slot_width}")
+        if not self.free.acquire(timeout=timeout):
+            return False
+
+        head, = RING_COUNTER.unpack_from(self.memory.buf, RING_HEAD_OFFSET)
+        slot = self._slot(head)
+        slot[0] = settings['password_length']
+        generate_password_into(settings, slot, SLOT_LENGTH_BYTES)
+        slot.release()
+        RING_COUNTER.pack_into(self.memory.buf, RING_HEAD_OFFSET, head + 1)
+        self.filled.release()
+        return True
+
+    def claim_into(self, buffer: bytearray, timeout: float | None = None) -> int:
+        """
+        Copy the oldest password into a caller buffer and wipe its slot.
+
+        Args:
+            buffer (bytearray): Destination, at least `slot_width` bytes long.
+            timeout (float | None, optional): Seconds to wait for a password.
+
+        Returns:
+            int: The password length, or -1 if none arrived in time.
+        """
+        if not self.filled.acquire(timeout=timeout):
+            return -1
+
+        with self.read_lock:
+            tail, = RING_COUNTER.unpack_from(self.memory.buf, RING_TAIL_OFFSET)
+            slot = self._slot(tail)
+            length = slot[0]
+            buffer[:length] = slot[SLOT_LENGTH_BYTES:SLOT_LENGTH_BYTES + length]
+            wipe_buffer(slot)
+            slot.release()
+            RING_COUNTER.pack_into(self.memory.buf, RING_TAIL_OFFSET, tail + 1)
+        self.free.release()
+        return length
+
+    def claim(self, timeout: float | None = None) -> bytearray | None:
+        """
+        Claim the oldest password as a new `bytearray` (wipe it after use).
+
+        Args:
+            timeout (float | None, optional): Seconds to wait for a password.
+
+        Returns:
+            bytearray | None: The password bytes, or None on timeout.
+        """
+        buffer = bytearray(self.slot_width)
+        length = self.claim_into(buffer, timeout)
+        if length < 0:
+            return None
+        del buffer[length:]
+        return buffer
+
+    def available(self) -> int:
+        """Return the number of filled slots (a snapshot, for monitoring)."""
+        head, = RING_COUNTER.unpack_from(self.memory.buf, RING_HEAD_OFFSET)
+        tail, = RING_COUNTER.unpack_from(self.memory.buf, RING_TAIL_OFFSET)
+        return head - tail
+
+    def stop(self) -> None:
+        """Ask the producer to stop."""
+        self.stop_event.set()
+
+    def close(self) -> None:
+        """Detach from the shared memory, and free it if this is the creating process."""
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def run_producer(ring: SharedPasswordRing, settings: PasswordSettings) -> None:
+    """
+    Producer loop: keep the ring full until `ring.stop()` is called.
+
+    Args:
+        ring (SharedPasswordRing): The ring to fill.
+        settings (PasswordSettings): The settings of every password.
+    """
+    try:
+        while not ring.stop_event.is_set():
+            ring.produce(settings, timeout=PRODUCER_POLL_SECONDS)
+    finally:
+        ring.memory.close()
+
+
+def start_producer(ring: SharedPasswordRing, settings: PasswordSettings) -> multiprocessing.Process:
+    """
+    Start the producer as a daemon process.
+
+    Args:
+        ring (SharedPasswordRing): The ring to fill.
+        settings (PasswordSettings): The settings of every password.
+
+    Returns:
+        multiprocessing.Process: The running producer.
+    """
+    process = multiprocessing.Process(target=run_producer, args=(ring, settings), daemon=True)
+    process.start()
+    return process
+
+
+def _benchmark_consumer(ring: SharedPasswordRing, count: int, results: multiprocessing.Queue) -> None:
+    """Consumer process of the benchmark: claim `count` passwords, report latencies."""
+    buffer = bytearray(ring.slot_width)
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        ring.claim_into(buffer)
+        latencies.append(time.perf_counter() - start)
+    wipe_buffer(buffer)
+    ring.memory.close()
+    results.put(latencies)
+
+
+def benchmark_ring(
+    settings: PasswordSettings,
+    consumer_counts: Sequence[int],
+    passwords_per_consumer: int,
+    capacity: int = DEFAULT_RING_CAPACITY,
+) -> list[dict]:
+    """
+    Measure consumer throughput and claim latency with 1..N consumers.
+
+    The ring is pre-filled before the consumers start, so the numbers show
+    the consumer side cost; once drained, throughput is bounded by the
+    single producer.
+
+    Args:
+        settings (PasswordSettings): The settings of every password.
+        consumer_counts (Sequence[int]): Consumer process counts to measure.
+        passwords_per_consumer (int): Passwords claimed by every consumer.
+        capacity (int, optional): Ring capacity.
+
+    Returns:
+        list[dict]: Per run: consumers, passwords/sec and p50/p99 latency (µs).
+    """
+    reports = []
+    for consumer_count in consumer_counts:
+        ring = SharedPasswordRing(capacity)
+        producer = start_producer(ring, settings)
+        while ring.available() < capacity:
+            time.sleep(0.01)
+
+        results = multiprocessing.Queue()
+        consumers = [
+            multiprocessing.Process(target=_benchmark_consumer, args=(ring, passwords_per_consumer, results))
+            for _ in range(consumer_count)
+        ]
+        start = time.perf_counter()
+        for consumer in consumers:
+            consumer.start()
+        latencies = [latency for _ in consumers for latency in results.get()]
+        elapsed = time.perf_counter() - start
+        for consumer in consumers:
+            consumer.join()
+
+        ring.stop()
+        producer.join()
+        ring.close()
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        reports.append({
+            'consumers': consumer_count,
+            'passwords_per_second': len(latencies) / elapsed,
+            'p50_us': quantiles[49] * 1e6,
+            'p99_us': quantiles[98] * 1e6,
+        })
+    return reports
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Shared-memory password ring benchmark')
+    parser.add_argument('--consumers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--count', type=int, default=20_000, help='passwords per consumer')
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    parser.add_argument('--capacity', type=int, default=DEFAULT_RING_CAPACITY)
+    arguments = parser.parse_args()
+
+    settings: PasswordSettings = {'password_length': arguments.length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    for report in benchmark_ring(settings, arguments.consumers, arguments.count, arguments.capacity):
+        print(
+            f"{report['consumers']:>3} consumers: {report['passwords_per_second']:>10,.0f} passwords/sec  "
+            f"p50 {report['p50_us']:.1f} µs  p99 {report['p99_us']:.1f} µs"
+        )
@@ -0,0 +1,317 @@
+import sys
+import time
+import zlib
+import array
+import random
+import argparse
+import statistics
+from typing import Iterable
+from utils import *
+
+
+# ----------------------------- Constants ----------------------------- #
+DEFAULT_NGRAM_SIZE = 3
+DEFAULT_BANDS = 8
+DEFAULT_ROWS = 4
+DEFAULT_EXPECTED_ENTRIES = 1024
+DEFAULT_MAX_SIMILARITY = 0.6
+
+# Universal hashing (a * x + b) mod p, one (a, b) pair per MinHash function.
+# The seed is fixed so signatures stay comparable between runs.
+MINHASH_PRIME = (1 << 61) - 1
+MINHASH_SEED = 0x5EED
+SIGNATURE_MASK = 0xFFFFFFFF
+
+
+def password_ngrams(password: str, size: int = DEFAULT_NGRAM_SIZE) -> set[str]:
+    """
+    Returns the set of character n-grams of a password.
+
+    A password shorter than `size` is its own single n-gram.
+    """
+    if len(password) <= size:
+        return {password}
+    return {password[index:index + size] for index in range(len(password) - size + 1)}
+
+
+def jaccard_similarity(first: str, second: str, size: int = DEFAULT_NGRAM_SIZE) -> float:
+    """Returns the exact Jaccard similarity of the n-gram sets of two passwords."""
+    first_ngrams, second_ngrams = password_ngrams(first, size), password_ngrams(second, size)
+    return len(first_ngrams & second_ngrams) / len(first_ngrams | second_ngrams)
+
+
+class SimilarityIndex:
+    """
+    MinHash / LSH index answering "is this password close to one seen before?".
+
+    Every password is reduced to a MinHash signature of `bands * rows` values
+    over its character n-grams. The signature is cut into bands; two passwords
+    sharing any whole band become candidates, and only candidates have their
+    signatures compared. With Jaccard similarity s the chance of becoming a
+    candidate is 1 - (1 - s**rows)**bands, so the lookup cost depends on the
+    number of near matches, not on the history size.
+
+    Passwords themselves are not stored: only their signatures (4 bytes per
+    hash function) and, per band, a chained hash table kept in flat arrays
+    (a bucket head per bucket, a band key and a chain link per entry).
+    The tables start with a bucket per expected entry and double once the
+    entries outnumber the buckets, so chains stay short at any size.
+
+    Args:
+        bands (int, optional): Number of LSH bands.
+        rows (int, optional): Signature values per band.
+        ngram_size (int, optional): Character n-gram length.
+        expected_entries (int, optional): Entries the index is sized for.
+        threshold (float, optional): Similarity from which a password counts
+            as a near-duplicate.
+    """
+
+    def __init__(
+        self,
+        bands: int = DEFAULT_BANDS,
+        rows: int = DEFAULT_ROWS,
+        ngram_size: int = DEFAULT_NGRAM_SIZE,
+        expected_entries: int = DEFAULT_EXPECTED_ENTRIES,
+        threshold: float = DEFAULT_MAX_SIMILARITY,
+    ) -> None:
+        self.bands = bands
+        self.rows = rows
+        self.ngram_size = ngram_size
+        self.buckets = 1 << max(expected_entries - 1, 1).bit_length()
+        self.threshold = threshold
+        self.num_hashes = bands * rows
+        seeded = random.Random(MINHASH_SEED)
+        self.coefficients = [
+            (seeded.randrange(1, MINHASH_PRIME), seeded.randrange(MINHASH_PRIME))
+            for _ in range(self.num_hashes)
+        ]
+        self.signatures = array.array('I')
+        self.heads = [array.array('i', [-1]) * self.buckets for _ in range(bands)]
+        self.links = [array.array('i') for _ in range(bands)]
+        self.band_keys = [array.array('I') for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self.signatures) // self.num_hashes
+
+    def signature(self, password: str) -> list[int]:
+        """
+        Compute the MinHash signature of a password.
+
+        Args:
+            password (str): The password.
+
+        Returns:
+            list[int]: `bands * rows` 32-bit minimum hash values.
+        """
+        hashes = [zlib.crc32(ngram.encode('utf-8')) for ngram in password_ngrams(password, self.ngram_size)]
+        prime = MINHASH_PRIME
+        return [
+            min((a * value + b) % prime for value in hashes) & SIGNATURE_MASK
+            for a, b in self.coefficients
+        ]
+
+    def _band_keys(self, signature: list[int]) -> list[int]:
+        """Hash every band of a signature to a 32-bit key."""
+        rows = self.rows
+        return [
+            hash(tuple(signature[band * rows:(band + 1) * rows])) & SIGNATURE_MASK
+            for band in range(self.bands)
+        ]
+
+    def _estimate(self, signature: list[int], entry: int) -> float:
+        """Estimate the Jaccard similarity with an indexed entry from their signatures."""
+        start = entry * self.num_hashes
+        stored = self.signatures[start:start + self.num_hashes]
+        return sum(1 for mine, theirs in zip(signature, stored) if mine == theirs) / self.num_hashes
+
+    def _grow(self) -> None:
+        """Double the buckets of every band and rechain the entries, oldest first."""
+        self.buckets *= 2
+        buckets = self.buckets
+        for band in range(self.bands):
+            heads = array.array('i', [-1]) * buckets
+            links = self.links[band]
+            for entry, key in enumerate(self.band_keys[band]):
+                bucket = key % buckets
+                links[entry] = heads[bucket]
+                heads[bucket] = entry
+            self.heads[band] = heads
+
+    def add_signature(self, signature: list[int]) -> int:
+        """
+        Index a precomputed signature.
+
+        Returns:
+            int: The entry number.
+        """
+        entry = len(self)
+        if entry >= self.buckets:
+            self._grow()
+        self.signatures.extend(signature)
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = key % self.buckets
+            self.links[band].append(self.heads[band][bucket])
+            self.band_keys[band].append(key)
+            self.heads[band][bucket] = entry
+        return entry
+
+    def add(self, password: str) -> int:
+        """
+        Index a password.
+
+        Args:
+            password (str): The password.
+
+        Returns:
+            int: The entry number.
+        """
+        return self.add_signature(self.signature(password))
+
+    def add_many(self, passwords: Iterable[str]) -> int:
+        """
+        Index every password of an iterable.
+
+        Returns:
+            int: The number of indexed passwords.
+        """
+        count = 0
+        for password in passwords:
+            self.add(password)
+            count += 1
+        return count
+
+    def nearest(self, signature: list[int]) -> tuple[int, float] | None:
+        """
+        Find the most similar indexed entry among the LSH candidates.
+
+        Args:
+            signature (list[int]): The signature to look up.
+
+        Returns:
+            tuple[int, float] | None: The entry number and estimated Jaccard
+                similarity, or None if no entry shares a band.
+        """
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            entry = self.heads[band][key % self.buckets]
+            links, band_keys = self.links[band], self.band_keys[band]
+            while entry != -1:
+                if band_keys[entry] == key:
+                    candidates.add(entry)
+                entry = links[entry]
+        if not candidates:
+            return None
+        return max(((entry, self._estimate(signature, entry)) for entry in candidates), key=lambda item: item[1])
+
+    def is_near_duplicate(self, password: str) -> bool:
+        """Return True if an indexed password is at least `threshold` similar."""
+        match = self.nearest(self.signature(password))
+        return match is not None and match[1] >= self.threshold
+
+    def accept_new(self, password: str) -> bool:
+        """
+        Filter stage for `generate_filtered_password()`: reject near-duplicates,
+        index and accept anything else.
+
+        Args:
+            password (str): The candidate password.
+
+        Returns:
+            bool: True if the password was accepted (and indexed).
+        """
+        signature = self.signature(password)
+        match = self.nearest(signature)
+        if match is not None and match[1] >= self.threshold:
+            return False
+        self.add_signature(signature)
+        return True
+
+    def memory_bytes(self) -> int:
+        """Return the memory held by the index arrays."""
+        tables = [self.signatures, *self.heads, *self.links, *self.band_keys]
+        return sum(sys.getsizeof(table) for table in tables)
+
+
+def benchmark_similarity_index(
+    sizes: list[int],
+    password_length: int,
+    queries: int = 1000,
+) -> list[dict]:
+    """
+    Measure index memory and query latency for growing history sizes.
+
+    Entries are random signatures (building real ones costs the same per
+    entry as a query, which is timed separately), so large sizes are quick
+    to set up, plus the real signatures of `queries` generated passwords.
+    Every query is one of those passwords with one character replaced, so
+    lookups walk real candidate chains instead of empty buckets.
+
+    Args:
+        sizes (list[int]): History sizes to measure, ascending.
+        password_length (int): Length of the query passwords.
+        queries (int, optional): Number of timed lookups per size.
+
+    Returns:
+        list[dict]: Per size: entries, MiB, bytes per entry, p50/p99 query
+            latency (µs), share of queries flagged as near-duplicates and
+            signatures per second.
+    """
+    settings: PasswordSettings = {'password_length': password_length,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    originals = [random_password_generator(settings) for _ in range(queries)]
+    rng = random.Random(MINHASH_SEED)
+    passwords = []
+    for password in originals:
+        position = rng.randrange(len(password))
+        replacement = random_password_generator({**settings, 'password_length': 1})
+        passwords.append(password[:position] + replacement + password[position + 1:])
+    reports = []
+    for size in sizes:
+        index = SimilarityIndex(expected_entries=size + queries)
+        original_signatures = [index.signature(password) for password in originals]
+        for _ in range(size):
+            index.add_signature([rng.getrandbits(32) for _ in range(index.num_hashes)])
+        for signature in original_signatures:
+            index.add_signature(signature)
+
+        start = time.perf_counter()
+        signatures = [index.signature(password) for password in passwords]
+        signature_rate = queries / (time.perf_counter() - start)
+
+        latencies = []
+        flagged = 0
+        for signature in signatures:
+            start = time.perf_counter()
+            match = index.nearest(signature)
+            latencies.append(time.perf_counter() - start)
+            flagged += match is not None and match[1] >= index.threshold
+        quantiles = statistics.quantiles(latencies, n=100)
+        memory = index.memory_bytes()
+        reports.append({
+            'entries': len(index),
+            'memory_mib': memory / (1 << 20),
+            'bytes_per_entry': memory / len(index),
+            'p50_us': quantiles[49] * 1e6,
+            'p99_us': quantiles[98] * 1e6,
+            'flagged': flagged / queries,
+            'signatures_per_second': signature_rate,
+        })
+    return reports
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Near-duplicate index memory and latency benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--length', type=int, default=DEFAULT_PASSWORD_LENGTH)
+    parser.add_argument('--queries', type=int, default=1000)
+    arguments = parser.parse_args()
+
+    for report in benchmark_similarity_index(arguments.sizes, arguments.length, arguments.queries):
+        print(
+            f"{report['entries']:>11,} entries: {report['memory_mib']:>9.1f} MiB "
+            f"({report['bytes_per_entry']:.0f} B/entry)  "
+            f"query p50 {report['p50_us']:.1f} µs  p99 {report['p99_us']:.1f} µs  "
+            f"{report['flagged']:.0%} flagged  "
+            f"{report['signatures_per_second']:,.0f} signatures/sec"
+        )
@@ -0,0 +1,254 @@
+import math
+import time
+import argparse
+import functools
+from array import array
+from typing import TypedDict
+from utils import *
+
+
+# ----------------------------- Constants ----------------------------- #
+TABLE_LENGTHS = range(MIN_PASSWORD_LENGTH, MAX_PASSWORD_LENGTH + 1)
+CLASS_MASK_COUNT = 1 << len(PASSWORD_OPTIONS)
+
+# Highest target the table answers: a maximum-length password over every class
+MAX_TARGET_BITS = math.ceil(MAX_PASSWORD_LENGTH * math.log2(sum(PASSWORD_OPTION_RANGE_SIZE.values())))
+
+# Marks a target no table length reaches
+UNREACHABLE = 0
+
+
+class StrengthPreview(TypedDict):
+    """
+    Represents the expected strength of a configuration, before generating.
+
+    Attributes:
+        length (int): Password length.
+        class_mask (int): Enabled classes, bit i for `PASSWORD_OPTIONS[i]`.
+        expected_entropy (float): Mean `calculate_password_entropy()` of the
+            passwords the sampler draws, in bits.
+        full_entropy (float): Entropy when every enabled class is drawn.
+        bucket_probabilities (tuple[float, ...]): Probability of every
+            `STRENGTH_LEVELS` bucket.
+        label (str): Label of the most likely bucket.
+        color (str): Color of the most likely bucket.
+    """
+
+    length: int
+    class_mask: int
+    expected_entropy: float
+    full_entropy: float
+    bucket_probabilities: tuple[float, ...]
+    label: str
+    color: str
+
+
+def get_class_probabilities(class_mask: int, sampling: str = DEFAULT_SAMPLING_MODE,
+                            class_weights: dict[str, float] | None = None) -> list[float]:
+    """
+    Computes the probability that one drawn character belongs to each class.
+
+    Derived from `get_character_weights()`, so the table follows the sampler.
+
+    Args:
+        class_mask (int): Enabled classes.
+        sampling (str, optional): One of `SAMPLING_MODES`.
+        class_weights (dict[str, float] | None, optional): Weights of the 'weighted' mode.
+
+    Returns:
+        list[float]: Per enabled class, in `PASSWORD_OPTIONS` order.
+    """
+    weights = get_character_weights(settings_from_mask(MIN_PASSWORD_LENGTH, class_mask), sampling, class_weights)
+    return [sum(weights[char] for char in CHARACTER_CLASSES[option])
+            for bit, option in enumerate(PASSWORD_OPTIONS) if class_mask >> bit & 1]
+
+
+class StrengthTable:
+    """
+    Expected strength of every class mask and length, precomputed once.
+
+    A password of length L drawn with classes S enabled is scored from the
+    subset of S it actually contains, so its entropy is a random variable.
+    The probability that exactly the classes T appear is found by inclusion-
+    exclusion over the per-character class probabilities q:
+
+        P(exactly T) = sum over U subset of T of (-1)^|T - U| * q(U)^L
+
+    computed for all T at once with a Moebius transform. From it the table
+    stores the expected entropy and the probability of every strength
+    bucket, and, per class mask and whole number of bits, the shortest length
+    whose expected entropy reaches it. Every lookup is an array index.
+
+    Args:
+        sampling (str, optional): One of `SAMPLING_MODES`.
+        class_weights (dict[str, float] | None, optional): Weights of the 'weighted' mode.
+    """
+
+    def __init__(self, sampling: str = DEFAULT_SAMPLING_MODE,
+                 class_weights: dict[str, float] | None = None) -> None:
+        self.sampling = sampling
+        levels = len(STRENGTH_LEVELS)
+        lengths = len(TABLE_LENGTHS)
+        self.expected = array('d', bytes(8 * CLASS_MASK_COUNT * lengths))
+        self.full = array('d', bytes(8 * CLASS_MASK_COUNT * lengths))
+        self.buckets = array('d', bytes(8 * CLASS_MASK_COUNT * lengths * levels))
+        self.min_lengths = array('B', bytes(CLASS_MASK_COUNT * (MAX_TARGET_BITS + 1)))
+
+        for class_mask in range(1, CLASS_MASK_COUNT):
+            probabilities = get_class_probabilities(class_mask, sampling, class_weights)
+            sizes = [PASSWORD_OPTION_RANGE_SIZE[option]
+                     for bit, option in enumerate(PASSWORD_OPTIONS) if class_mask >> bit & 1]
+            classes = len(sizes)
+            subsets = range(1, 1 << classes)
+            subset_probability = [0.0] * (1 << classes)
+            subset_bits = [0.0] * (1 << classes)
+            for subset in subsets:
+                low = subset & -subset
+                rest = subset ^ low
+                subset_probability[subset] = subset_probability[rest] + probabilities[low.bit_length() - 1]
+                pool = sum(sizes[index] for index in range(classes) if subset >> index & 1)
+                subset_bits[subset] = math.log2(pool)
+
+            for length_index, length in enumerate(TABLE_LENGTHS):
+                exact = [probability ** length for probability in subset_probability]
+                for index in range(classes):
+                    bit = 1 << index
+                    for subset in subsets:
+                        if subset & bit:
+                            exact[subset] -= exact[subset ^ bit]
+
+                cell = class_mask * lengths + length_index
+                expected = 0.0
+                for subset in subsets:
+                    probability = exact[subset]
+                    if probability <= 0.0:
+                        continue
+                    entropy = length * subset_bits[subset]
+                    expected += probability * entropy
+                    self.buckets[cell * levels + get_strength_level_index(entropy)] += probability
+                self.expected[cell] = expected
+                self.full[cell] = length * subset_bits[-1]
+
+            row = class_mask * (MAX_TARGET_BITS + 1)
+            length_index = 0
+            for bits in range(MAX_TARGET_BITS + 1):
+                while length_index < lengths and self.expected[class_mask * lengths + length_index] < bits:
+                    length_index += 1
+                if length_index == lengths:
+                    break
+                self.min_lengths[row + bits] = TABLE_LENGTHS[length_index]
+
+    def _cell(self, class_mask: int, length: int) -> int:
+        if not 0 < class_mask < CLASS_MASK_COUNT:
+            raise IndexError('No character class enabled')
+        if length not in TABLE_LENGTHS:
+            raise ValueError(f'Password length must be between {MIN_PASSWORD_LENGTH} and {MAX_PASSWORD_LENGTH}')
+        return class_mask * len(TABLE_LENGTHS) + length - MIN_PASSWORD_LENGTH
+
+    def expected_entropy(self, class_mask: int, length: int) -> float:
+        """Returns the expected entropy in bits of a class mask and length."""
+        return self.expected[self._cell(class_mask, length)]
+
+    def bucket_probabilities(self, class_mask: int, length: int) -> tuple[float, ...]:
+        """Returns the probability of every `STRENGTH_LEVELS` bucket."""
+        levels = len(STRENGTH_LEVELS)
+        start = self._cell(class_mask, length) * levels
+        return tuple(self.buckets[start:start + levels])
+
+    def minimum_length(self, class_mask: int, target_bits: float) -> int | None:
+        """
+        Finds the shortest length whose expected entropy reaches `target_bits`.
+
+        Raises:
+            IndexError: If no character class is enabled.
+
+        Returns:
+            int | None: The length, or None if no allowed length reaches the target.
+        """
+        if not 0 < class_mask < CLASS_MASK_COUNT:
+            raise IndexError('No character class enabled')
+        bits = max(0, math.ceil(target_bits))
+        if bits > MAX_TARGET_BITS:
+            return None
+        length = self.min_lengths[class_mask * (MAX_TARGET_BITS + 1) + bits]
+        return None if length == UNREACHABLE else length
+
+    def preview(self, settings: PasswordSettings) -> StrengthPreview:
+        """
+        Looks up the expected strength of a settings dict.
+
+        Raises:
+            IndexError: If no character class is enabled.
+            ValueError: If the length is outside the allowed range.
+
+        Returns:
+            StrengthPreview: Expected entropy, bucket probabilities and the likeliest label.
+        """
+        class_mask = settings_class_mask(settings)
+        length = settings['password_length']
+        cell = self._cell(class_mask, length)
+        buckets = self.bucket_probabilities(class_mask, length)
+        level = STRENGTH_LEVELS[max(range(len(buckets)), key=buckets.__getitem__)]
+        return {
+            'length': length,
+            'class_mask': class_mask,
+            'expected_entropy': self.expected[cell],
+            'full_entropy': self.full[cell],
+            'bucket_probabilities': buckets,
+            'label': level['label'],
+            'color': level['color'],
+        }
+
+
+def get_strength_table(sampling: str = DEFAULT_SAMPLING_MODE,
+                       class_weights: dict[str, float] | None = None) -> StrengthTable:
+    """Returns the strength table of a sampling mode (and class weights), built on first use."""
+    return _get_strength_table(sampling, tuple(sorted(class_weights.items())) if class_weights else None)
+
+
+@functools.cache
+def _get_strength_table(sampling: str, class_weights: tuple[tuple[str, float], ...] | None) -> StrengthTable:
+    return StrengthTable(sampling, dict(class_weights) if class_weights else None)
+
+
+def format_strength_preview(preview: StrengthPreview) -> str:
+    """
+    Formats a preview on one line, e.g. 'expected 47.0 bits (up to 52.4): 🟡 Fair 98%, 🟠 Weak 2%'.
+    """
+    buckets = ', '.join(
+        f"{level['label']} {probability:.0%}"
+        for level, probability in sorted(zip(STRENGTH_LEVELS, preview['bucket_probabilities']),
+                                         key=lambda item: -item[1])
+        if probability >= 0.005
+    )
+    return (f"expected {preview['expected_entropy']:.1f} bits "
+            f"(up to {preview['full_entropy']:.1f}): {buckets}")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Expected strength table: build time, lookup cost and a check')
+    parser.add_argument('--sampling', choices=SAMPLING_MODES, default=DEFAULT_SAMPLING_MODE)
+    parser.add_argument('--samples', type=int, default=20_000, help='passwords drawn per checked configuration')
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    table = StrengthTable(arguments.sampling)
+    print(f'build       : {(time.perf_counter() - start) * 1e3:.1f} ms')
+
+    settings: PasswordSettings = {'password_length': DEFAULT_PASSWORD_LENGTH,
+                                  **{option: True for option in PASSWORD_OPTIONS}}
+    lookups = 100_000
+    start = time.perf_counter()
+    for _ in range(lookups):
+        table.preview(settings)
+    print(f'preview     : {(time.perf_counter() - start) / lookups * 1e6:.2f} µs')
+
+    for length in (MIN_PASSWORD_LENGTH, 12, 20):
+        settings['password_length'] = length
+        preview = table.preview(settings)
+        rng = random.Random(length)
+        entropies = [calculate_password_entropy(random_password_generator(settings, rng, arguments.sampling))
+                     for _ in range(arguments.samples)]
+        print(f'length {length:>2}   : table {format_strength_preview(preview)}')
+        print(f'             sampled mean {sum(entropies) / len(entropies):.1f} bits')
@@ -3,29 +3,52 @@ import re
 import math
 import random
 import string
+import threading
 from typing import Sequence, TypedDict
 
 
 # ----------------------------- Constants ----------------------------- #
 DIGITS = '0123456789'
-SYMBOLS = """!?@#$%&*^~/\|+=:;.,"'"""
+SYMBOLS = r"""!?@#$%&*^~/\|+=:;.,"'"""
 BRACKETS = '[]{}()<>'
 MIN_PASSWORD_LENGTH = 8
 MAX_PASSWORD_LENGTH = 30
 DEFAULT_PASSWORD_LENGTH = 8
 
-# Password option ranges
-PASSWORD_OPTION_RANGE_SIZE = {    
-    'uppercase': 26, 
-    'lowercase': 26, 
-    'digit': 10, 
-    'minus': 1, 
-    'underline': 1, 
-    'space': 1, 
-    'symbol': 19, 
-    'bracket': 8, 
+# Password options, in the order used for class bit masks
+PASSWORD_OPTIONS = (
+    'uppercase',
+    'lowercase',
+    'space',
+    'minus',
+    'underline',
+    'digit',
+    'symbol',
+    'bracket',
+)
+
+# Characters of every password option
+CHARACTER_CLASSES = {
+    'uppercase': string.ascii_uppercase,
+    'lowercase': string.ascii_lowercase,
+    'space': ' ',
+    'minus': '-',
+    'underline': '_',
+    'digit': DIGITS,
+    'symbol': SYMBOLS,
+    'bracket': BRACKETS,
 }
 
+# Password option ranges, derived from the classes so they can never drift apart
+PASSWORD_OPTION_RANGE_SIZE = {option: len(chars) for option, chars in CHARACTER_CLASSES.items()}
+
+# Sampling modes of `random_password_generator()`:
+#   class_first : pick an enabled class uniformly, then a character of it
+#   uniform     : pick uniformly from the union of the enabled classes
+#   weighted    : pick from the union with per-class weights
+SAMPLING_MODES = ('class_first', 'uniform', 'weighted')
+DEFAULT_SAMPLING_MODE = 'class_first'
+
 # Colors
 STRENGTH_COLORS = {
     'very_weak': "#f01010",
@@ -35,6 +58,15 @@ STRENGTH_COLORS = {
     'perfect': "#06be06"
 }
 
+# Strength buckets, ordered by their exclusive upper entropy bound (bits)
+STRENGTH_LEVELS = (
+    {'max_entropy': 28, 'score': 10, 'label': '🔴 Very Weak', 'color': STRENGTH_COLORS['very_weak']},
+    {'max_entropy': 36, 'score': 30, 'label': '🟠 Weak', 'color': STRENGTH_COLORS['weak']},
+    {'max_entropy': 60, 'score': 55, 'label': '🟡 Fair', 'color': STRENGTH_COLORS['fair']},
+    {'max_entropy': 128, 'score': 80, 'label': '🟣 Strong', 'color': STRENGTH_COLORS['strong']},
+    {'max_entropy': math.inf, 'score': 100, 'label': '🟢 Perfect', 'color': STRENGTH_COLORS['perfect']},
+)
+
 
 class PasswordSettings(TypedDict):
     """
@@ -76,32 +108,68 @@ def clear_screen() -> None:
         print('\n' * 100)
 
 
-def generate_upper_case_char() -> str:
+_thread_state = threading.local()
+
+
+def _reset_thread_state() -> None:
+    """Drop every per-thread generator, so forked children never reuse the parent's state."""
+    global _thread_state
+    _thread_state = threading.local()
+
+
+# Windows has no fork(), and no os.register_at_fork()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_thread_state)
+
+
+def get_thread_rng() -> random.Random:
+    """
+    Return the calling thread's own random generator.
+
+    Used by every helper when no explicit `rng` is passed. Each thread gets an
+    independent, OS-seeded `random.Random`, so concurrent callers never share
+    (and never contend on) mutable generator state.
+    """
+    rng = getattr(_thread_state, 'rng', None)
+    if rng is None:
+        rng = _thread_state.rng = random.Random()
+    return rng
+
+
+def set_thread_rng(rng: random.Random | None) -> None:
+    """
+    Replace the calling thread's random generator, e.g. with an accounting
+    wrapper around it; None gives the thread a fresh generator on next use.
+    """
+    _thread_state.rng = rng
+
+
+def generate_upper_case_char(rng: random.Random | None = None) -> str:
     """Return a random uppercase ASCII letter."""
-    return random.choice(string.ascii_uppercase)
+    return (rng or get_thread_rng()).choice(string.ascii_uppercase)
 
 
-def generate_lower_case_char() -> str:
+def generate_lower_case_char(rng: random.Random | None = None) -> str:
     """Return a random lowercase ASCII letter."""
-    return random.choice(string.ascii_lowercase)
+    return (rng or get_thread_rng()).choice(string.ascii_lowercase)
 
 
-def generate_digit() -> str:
+def generate_digit(rng: random.Random | None = None) -> str:
     """Return a random digit character from the DIGITS string."""
-    return random.choice(DIGITS)
+    return (rng or get_thread_rng()).choice(DIGITS)
 
 
-def generate_symbol() -> str:
+def generate_symbol(rng: random.Random | None = None) -> str:
     """Return a random symbol character from the SYMBOLS string."""
-    return random.choice(SYMBOLS)
+    return (rng or get_thread_rng()).choice(SYMBOLS)
 
 
-def generate_bracket() -> str:
+def generate_bracket(rng: random.Random | None = None) -> str:
     """Return a random bracket character from the BRACKET string."""
-    return random.choice(BRACKETS)
+    return (rng or get_thread_rng()).choice(BRACKETS)
 
 
-def generated_password_char(settings: Sequence[str]) -> str:
+def generated_password_char(settings: Sequence[str], rng: random.Random | None = None) -> str:
 
     """
     Generate a random character based on enabled password settings.
@@ -113,6 +181,8 @@ def generated_password_char(settings: Sequence[str]) -> str:
     Args:
         settings (Sequence[str]): 
             A sequence of enabled character types to choose from.
+        rng (random.Random | None, optional):
+            The random generator to draw from. Defaults to the thread's own generator.
 
     Returns:
         str: A randomly generated character from the selected character type.
@@ -120,7 +190,7 @@ def generated_password_char(settings: Sequence[str]) -> str:
     Raises:
         ValueError: If an unsupported character type is encountered.
     """
-    char_type = random.choice(settings)
+    char_type = (rng or get_thread_rng()).choice(settings)
 
     generators = {
         'uppercase': generate_upper_case_char,
@@ -128,41 +198,140 @@ def generated_password_char(settings: Sequence[str]) -> str:
         'bracket': generate_bracket,
         'symbol': generate_symbol,
         'digit': generate_digit,
-        'space': lambda: ' ',
-        'minus': lambda: '-',
-        'underline': lambda: '_'
+        'space': lambda rng: ' ',
+        'minus': lambda rng: '-',
+        'underline': lambda rng: '_'
     }
 
     generator_func = generators.get(char_type)
     if not generator_func:
         raise ValueError(f"Unsupported character type: {char_type}")
-    return generator_func()
+    return generator_func(rng)
 
 
-def random_password_generator(settings: PasswordSettings) -> str:
+def get_character_weights(
+    settings: PasswordSettings,
+    sampling: str = DEFAULT_SAMPLING_MODE,
+    class_weights: dict[str, float] | None = None,
+) -> dict[str, float]:
+    """
+    Computes the probability of drawing each character under a sampling mode.
+
+    Args:
+        settings (PasswordSettings): The settings selecting the enabled classes.
+        sampling (str, optional): One of `SAMPLING_MODES`.
+        class_weights (dict[str, float] | None, optional): Relative weight of
+            each class for the 'weighted' mode. The weight of a class is spread
+            evenly over its characters; missing classes weigh 1.
+
+    Raises:
+        ValueError: If the sampling mode is not supported.
+
+    Returns:
+        dict[str, float]: Character -> probability, summing to 1.
+    """
+    if sampling not in SAMPLING_MODES:
+        raise ValueError(f"Unsupported sampling mode: {sampling}")
+
+    enabled = [option for option in PASSWORD_OPTIONS if settings.get(option)]
+    alphabet_size = sum(len(CHARACTER_CLASSES[option]) for option in enabled)
+    if sampling == 'weighted':
+        class_weights = class_weights or {}
+        total_weight = sum(class_weights.get(option, 1.0) for option in enabled)
+
+    probabilities = {}
+    for option in enabled:
+        characters = CHARACTER_CLASSES[option]
+        if sampling == 'class_first':
+            probability = 1 / (len(enabled) * len(characters))
+        elif sampling == 'uniform':
+            probability = 1 / alphabet_size
+        else:
+            probability = class_weights.get(option, 1.0) / (total_weight * len(characters))
+        for char in characters:
+            probabilities[char] = probabilities.get(char, 0.0) + probability
+    return probabilities
+
+
+def parse_class_weights(text: str) -> dict[str, float]:
+    """
+    Parses class weights for the 'weighted' mode, e.g. 'uppercase=2,digit=3,symbol=0.5'.
+
+    Args:
+        text (str): Comma-separated `class=weight` pairs; classes left out weigh 1.
+
+    Raises:
+        ValueError: If a class is unknown or a weight is not a positive number.
+
+    Returns:
+        dict[str, float]: Class name -> weight.
+    """
+    class_weights = {}
+    for item in text.split(','):
+        option, separator, weight = item.partition('=')
+        option = option.strip().lower()
+        if option not in PASSWORD_OPTIONS or not separator:
+            raise ValueError(f"Expected class=weight with a class of {', '.join(PASSWORD_OPTIONS)}, got {item!r}")
+        try:
+            value = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for {option}: {weight!r}") from None
+        if not 0 < value < math.inf:
+            raise ValueError(f"Weight of {option} must be a positive number, got {weight!r}")
+        class_weights[option] = value
+    return class_weights
+
+
+def random_password_generator(
+    settings: PasswordSettings,
+    rng: random.Random | None = None,
+    sampling: str = DEFAULT_SAMPLING_MODE,
+    class_weights: dict[str, float] | None = None,
+) -> str:
     """
     Generates a random password based on the given settings.
 
     Args:
         settings (dict): A dictionary containing user preferences for
                          character types and password length.
+        rng (random.Random | None, optional): The random generator to draw from.
+                         Pass a seeded generator for reproducible output.
+        sampling (str, optional): One of `SAMPLING_MODES`. The default
+                         'class_first' mode makes characters of small classes
+                         (e.g. '-') far more likely than letters; 'uniform'
+                         delivers the full log2(pool size) bits per character.
+        class_weights (dict[str, float] | None, optional): Class weights for
+                         the 'weighted' mode, see `get_character_weights()`.
+
+    Raises:
+        IndexError: If no character class is enabled.
+        ValueError: If the sampling mode is not supported.
 
     Returns:
         str: A randomly generated password.
     """
 
     password_length = settings['password_length']
+    rng = rng or get_thread_rng()
     
+    if sampling != 'class_first':
+        weights = get_character_weights(settings, sampling, class_weights)
+        if not weights:
+            raise IndexError('No character class enabled')
+        characters = list(weights)
+        if sampling == 'uniform':
+            return ''.join(rng.choices(characters, k=password_length))
+        return ''.join(rng.choices(characters, list(weights.values()), k=password_length))
+
     enabled_char_types = []
-    all_options = ['uppercase', 'lowercase', 'space', 'minus', 'underline', 'digit', 'symbol', 'bracket']
     
-    for option in all_options:
+    for option in PASSWORD_OPTIONS:
         if settings.get(option):
             enabled_char_types.append(option)
 
     password_chars = []
     for _ in range(password_length):
-        password_chars.append(generated_password_char(enabled_char_types))
+        password_chars.append(generated_password_char(enabled_char_types, rng))
 
     return ''.join(password_chars)
 
@@ -221,8 +390,8 @@ def analyze_selected_password(password: str) -> dict:
         'minus': bool(re.search(r"-", password)),
         'underline': bool(re.search(r"_", password)),
         'space': bool(re.search(r"\s", password)),
-        'symbol': bool(re.search(r"[!?@#$%&*^~/|:;.,'\"']", password)),
-        'bracket': bool(re.search(r"[{}\[\]()<>]", password)),
+        'symbol': bool(re.search(f"[{re.escape(SYMBOLS)}]", password)),
+        'bracket': bool(re.search(f"[{re.escape(BRACKETS)}]", password)),
     }
 
 
@@ -251,6 +420,38 @@ def calculate_password_range(password: str) -> int:
     return password_range
 
 
+def calculate_password_class_mask(password: str) -> int:
+    """
+    Encodes the character groups present in a password as a bit mask.
+
+    Bit `i` is set when the group `PASSWORD_OPTIONS[i]` occurs in the password,
+    so the mask is a compact form of `analyze_selected_password()`.
+
+    Args:
+        password (str): The password to evaluate.
+
+    Returns:
+        int: The class bit mask (0-255).
+    """
+    password_features = analyze_selected_password(password)
+    class_mask = 0
+    for bit, option in enumerate(PASSWORD_OPTIONS):
+        if password_features[option]:
+            class_mask |= 1 << bit
+    return class_mask
+
+
+def settings_class_mask(settings: PasswordSettings) -> int:
+    """Encodes the enabled classes of a settings dict as a bit mask."""
+    return sum(1 << bit for bit, option in enumerate(PASSWORD_OPTIONS) if settings.get(option))
+
+
+def settings_from_mask(length: int, class_mask: int) -> PasswordSettings:
+    """Rebuilds a settings dict from a length and a class bit mask."""
+    return {'password_length': length,
+            **{option: bool(class_mask >> bit & 1) for bit, option in enumerate(PASSWORD_OPTIONS)}}
+
+
 def calculate_password_entropy(password: str) -> float:
     """
     Calculates the entropy of a password based on its length and character diversity.
@@ -275,6 +476,22 @@ def calculate_password_entropy(password: str) -> float:
     return entropy
 
 
+def get_strength_level_index(password_entropy: float) -> int:
+    """
+    Finds the strength bucket a given entropy falls into.
+
+    Args:
+        `password_entropy` (float): The entropy value of the password.
+
+    Returns:
+        int: Index into `STRENGTH_LEVELS` (0 = very weak, 4 = perfect).
+    """
+    for index, level in enumerate(STRENGTH_LEVELS):
+        if password_entropy < level['max_entropy']:
+            return index
+    return len(STRENGTH_LEVELS) - 1
+
+
 def evaluate_password_strength(password_entropy: float) -> dict:
     """
     Evaluates the strength of a password based on its entropy.
@@ -285,16 +502,8 @@ def evaluate_password_strength(password_entropy: float) -> dict:
     Returns:
         dict: A dictionary containing the score, label and color representing the strength.
     """
-    if password_entropy < 28:
-        return {'score': 10, 'label': '🔴 Very Weak', 'color': STRENGTH_COLORS['very_weak']}
-    elif password_entropy < 36:
-        return {'score': 30, 'label': '🟠 Weak', 'color': STRENGTH_COLORS['weak']}
-    elif password_entropy < 60:
-        return {'score': 55, 'label': '🟡 Fair', 'color': STRENGTH_COLORS['fair']}
-    elif password_entropy < 128:
-        return {'score': 80, 'label': '🟣 Strong', 'color': STRENGTH_COLORS['strong']}
-    else:
-        return {'score': 100, 'label': '🟢 Perfect', 'color': STRENGTH_COLORS['perfect']}
+    level = STRENGTH_LEVELS[get_strength_level_index(password_entropy)]
+    return {'score': level['score'], 'label': level['label'], 'color': level['color']}
 
 
 def calculate_password_strength(password: str) -> tuple[int, str, str]:
@@ -0,0 +1,188 @@
+import json
+import time
+import argparse
+import statistics
+from typing import Iterable, Iterator, TypedDict
+from utils import *
+
+
+# ----------------------------- Constants ----------------------------- #
+TRACE_VERSION = 1
+TRACE_ACTIONS = ('generate', 'regenerate', 'select', 'save', 'copy', 'clear')
+
+# Actions replayed against `utils`; the others only shape the trace timeline
+REPLAYED_ACTIONS = ('generate', 'regenerate', 'select')
+
+
+class TraceEvent(TypedDict):
+    """
+    Represents one recorded user action. Passwords are never recorded.
+
+    Attributes:
+        t (float): Seconds since the recording started.
+        source (str): 'cli' or 'gui'.
+        action (str): One of `TRACE_ACTIONS`.
+        length (int): Password length setting.
+        class_mask (int): Enabled classes, bit i for `PASSWORD_OPTIONS[i]`.
+        duration_us (float): Time spent handling the action, in microseconds.
+    """
+
+    t: float
+    source: str
+    action: str
+    length: int
+    class_mask: int
+    duration_us: float
+
+
+class TraceRecorder:
+    """
+    Opt-in recorder appending anonymized user actions to an NDJSON trace.
+
+    Only the action, the settings (length and class mask) and the timing are
+    written, never a password. Every event is flushed, so a trace survives
+    the application being killed.
+
+    Args:
+        path (str): The trace file; events are appended to an existing trace.
+        source (str): Tag of the recording front end, 'cli' or 'gui'.
+    """
+
+    def __init__(self, path: str, source: str) -> None:
+        self.source = source
+        self.file = open(path, 'a', encoding='utf-8')
+        self.start = time.perf_counter()
+
+    def __enter__(self) -> 'TraceRecorder':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(self, action: str, settings: PasswordSettings, duration: float = 0.0) -> None:
+        """
+        Append one event.
+
+        Args:
+            action (str): One of `TRACE_ACTIONS`.
+            settings (PasswordSettings): The settings in effect.
+            duration (float, optional): Handling time in seconds.
+        """
+        event: TraceEvent = {
+            't': round(time.perf_counter() - self.start, 6),
+            'source': self.source,
+            'action': action,
+            'length': settings['password_length'],
+            'class_mask': settings_class_mask(settings),
+            'duration_us': round(duration * 1e6, 3),
+        }
+        self.file.write(json.dumps(event) + '\n')
+        self.file.flush()
+
+    def close(self) -> None:
+        """Close the trace file."""
+        self.file.close()
+
+
+def read_trace(paths: Iterable[str]) -> Iterator[TraceEvent]:
+    """Yield the events of one or more trace files, skipping truncated lines."""
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def replay_trace(events: list[TraceEvent], repeat: int = 1) -> dict:
+    """
+    Replays a trace against `utils` at full speed, ignoring think time.
+
+    'generate' and 'regenerate' generate and score a password with the
+    recorded settings, 'select' re-scores the last password generated with
+    them, like picking it from the combobox. A 'select' with no earlier
+    password for its settings (e.g. one picked from a persistent history)
+    has nothing to re-score and is counted apart. Other actions are counted
+    only.
+
+    Args:
+        events (list[TraceEvent]): The recorded events.
+        repeat (int, optional): Number of passes over the trace.
+
+    Returns:
+        dict: 'total' and per-action reports: operations, operations/sec and
+            p50/p95/p99/max latency (µs); plus the skipped event count and
+            the unmatched 'select' count.
+    """
+    latencies: dict[str, list[float]] = {action: [] for action in REPLAYED_ACTIONS}
+    last_password: dict[tuple[int, int], str] = {}
+    skipped = 0
+    unmatched_selects = 0
+
+    for _ in range(repeat):
+        for event in events:
+            action = event['action']
+            if action not in latencies or not event['class_mask']:
+                skipped += 1
+                continue
+            key = (event['length'], event['class_mask'])
+            if action == 'select':
+                if key not in last_password:
+                    unmatched_selects += 1
+                    continue
+                start = time.perf_counter()
+                calculate_password_strength(last_password[key])
+                latencies[action].append(time.perf_counter() - start)
+                continue
+            settings = settings_from_mask(*key)
+            start = time.perf_counter()
+            password = random_password_generator(settings)
+            calculate_password_strength(password)
+            latencies[action].append(time.perf_counter() - start)
+            last_password[key] = password
+
+    def summarize(values: list[float]) -> dict:
+        if len(values) < 2:
+            return {'operations': len(values)}
+        quantiles = statistics.quantiles(values, n=100, method='inclusive')
+        return {
+            'operations': len(values),
+            'per_second': len(values) / sum(values),
+            'p50_us': quantiles[49] * 1e6,
+            'p95_us': quantiles[94] * 1e6,
+            'p99_us': quantiles[98] * 1e6,
+            'max_us': max(values) * 1e6,
+        }
+
+    report = {action: summarize(values) for action, values in latencies.items() if values}
+    report['total'] = summarize([value for values in latencies.values() for value in values])
+    report['skipped'] = skipped
+    report['unmatched_selects'] = unmatched_selects
+    return report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Replay recorded workload traces at full speed')
+    parser.add_argument('traces', nargs='+', help='NDJSON trace files')
+    parser.add_argument('--repeat', type=int, default=1, help='passes over the traces')
+    arguments = parser.parse_args()
+
+    events = list(read_trace(arguments.traces))
+    mix: dict[str, int] = {}
+    for event in events:
+        mix[event['action']] = mix.get(event['action'], 0) + 1
+    print(f'{len(events)} events: ' + ', '.join(f'{action} {count}' for action, count in sorted(mix.items())))
+
+    report = replay_trace(events, arguments.repeat)
+    for action, stats in report.items():
+        if action in ('skipped', 'unmatched_selects') or 'per_second' not in stats:
+            continue
+        print(
+            f"{action:<10}: {stats['operations']:>8} ops  {stats['per_second']:>10,.0f} ops/sec  "
+            f"p50 {stats['p50_us']:.1f} µs  p95 {stats['p95_us']:.1f} µs  "
+            f"p99 {stats['p99_us']:.1f} µs  max {stats['max_us']:.1f} µs"
+        )
+    print(f"skipped   : {report['skipped']} events (not replayed against utils)")
+    print(f"unmatched : {report['unmatched_selects']} select events (no earlier password with their settings)")